@@ -3,11 +3,13 @@ import uuid
 import threading
 import queue
 import json
+import click
+import time
 from dotenv import load_dotenv
 from sqlalchemy import func, desc
-from sqlalchemy.orm import joinedload
+from sqlalchemy.orm import joinedload, defer
 from datetime import datetime, timedelta
-from flask import Flask, request, render_template, redirect, url_for, jsonify, Response, make_response, current_app
+from flask import Blueprint, Flask, abort, request, render_template, redirect, url_for, jsonify, Response, make_response, current_app
 from flask_sqlalchemy import SQLAlchemy
 from werkzeug.utils import secure_filename
 from flask_migrate import Migrate
@@ -16,10 +18,14 @@ from functools import wraps
 
 load_dotenv()
 from extensions import db  # Importa l'istanza db da extensions.py
-from models import Match, Article, Team, PlayerStat, Player
-from utils.excel_parser import ExcelParser
-from utils.perplexity_client import PerplexityClient
-from utils.fantacalcio_utils import points_to_goals
+from models import Match, Article, Team, PlayerStat, Player, Standing, StandingSnapshot, GameweekRollup, HeadToHead, TeamRating, TeamForm, PlayerForm
+from utils.article_generator import generate_articles as generate_match_articles
+from utils import data_version, elo, gameweek_rollup, keyset, recent_form, season_simulator, standings_store, standings_history, static_export, team_directory
+from utils import assets, compression
+from utils.http_cache import conditional
+from utils.fragment_cache import FragmentCacheExtension, fragment_cache
+from utils.response_cache import ResponseCache
+from utils.versioned_cache import VersionedCache
 
 ROLE_MAP = {
     'Por': 'Portiere',
@@ -37,39 +43,81 @@ ROLE_MAP = {
 }
 
 # ===== INIZIALIZZAZIONE APP =====
-app = Flask(__name__)
+# Route e comandi CLI stanno nel blueprint "main", registrato da create_app()
+main = Blueprint('main', __name__, cli_group=None)
+migrate = Migrate()
 
-# ✅ Configurazione da .env (come da tua specifica)
-app.config['SECRET_KEY'] = os.getenv('SECRET_KEY', 'your-secret-key')
-app.config['SQLALCHEMY_DATABASE_URI'] = os.getenv('DATABASE_URL', 'sqlite:///fantacalcio.db')
-app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
-app.config['UPLOAD_FOLDER'] = os.getenv('UPLOAD_FOLDER', 'static/uploads')
-app.config['MATCHES_PER_PAGE'] = int(os.getenv('MATCHES_PER_PAGE', 10))
-app.config['ARTICLES_PER_PAGE'] = int(os.getenv('ARTICLES_PER_PAGE', 6))
-app.config['PERPLEXITY_API_KEY'] = os.getenv('PERPLEXITY_API_KEY')
-app.config['PERPLEXITY_BASE_URL'] = os.getenv('PERPLEXITY_BASE_URL', 'https://api.perplexity.ai/chat/completions')
-app.config['ADMIN_USERNAME'] = os.getenv('ADMIN_USERNAME', 'admin')
-app.config['ADMIN_PASSWORD'] = os.getenv('ADMIN_PASSWORD', 'password')
 
-db.init_app(app)
-migrate = Migrate(app, db)
-os.makedirs(app.config['UPLOAD_FOLDER'], exist_ok=True)
-
-
-
-# ✅ Crea tabelle (come da tua specifica)
-with app.app_context():
-    db.create_all()
+def create_app(config=None):
+    """
+    Crea e configura l'applicazione. Non tocca il database: lo schema si crea
+    con `flask init-db` (o `flask db upgrade`), così l'import è leggero e
+    sicuro con gunicorn --preload (il master carica il codice una volta, i
+    worker lo condividono).
+    """
+    app = Flask(__name__)
+
+    # ✅ Configurazione da .env (come da tua specifica)
+    app.config['SECRET_KEY'] = os.getenv('SECRET_KEY', 'your-secret-key')
+    app.config['SQLALCHEMY_DATABASE_URI'] = os.getenv('DATABASE_URL', 'sqlite:///fantacalcio.db')
+    app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
+    app.config['UPLOAD_FOLDER'] = os.getenv('UPLOAD_FOLDER', 'static/uploads')
+    app.config['MATCHES_PER_PAGE'] = int(os.getenv('MATCHES_PER_PAGE', 10))
+    app.config['ARTICLES_PER_PAGE'] = int(os.getenv('ARTICLES_PER_PAGE', 6))
+    app.config['PERPLEXITY_API_KEY'] = os.getenv('PERPLEXITY_API_KEY')
+    app.config['PERPLEXITY_BASE_URL'] = os.getenv('PERPLEXITY_BASE_URL', 'https://api.perplexity.ai/chat/completions')
+    app.config['PERPLEXITY_STREAM'] = os.getenv('PERPLEXITY_STREAM', 'True').lower() == 'true'
+    app.config['ARTICLE_WORKERS'] = int(os.getenv('ARTICLE_WORKERS', 3))
+    # Esportazione statica delle pagine pubbliche dopo ogni ingestione (utils/static_export)
+    app.config['STATIC_EXPORT'] = os.getenv('STATIC_EXPORT', 'False').lower() == 'true'
+    app.config['STATIC_EXPORT_DIR'] = os.getenv('STATIC_EXPORT_DIR', os.path.join(app.instance_path, 'export'))
+    app.config['ADMIN_USERNAME'] = os.getenv('ADMIN_USERNAME', 'admin')
+    app.config['ADMIN_PASSWORD'] = os.getenv('ADMIN_PASSWORD', 'password')
+    if config:
+        app.config.update(config)
+
+    db.init_app(app)
+    migrate.init_app(app, db)
+    # Tag {% cache %} per i blocchi di template condivisi tra più pagine
+    app.jinja_env.add_extension(FragmentCacheExtension)
+    # Gzip delle risposte e file statici precompressi (.gz)
+    compression.init_app(app)
+    # File statici con hash nel nome e varianti ridotte dei loghi (static/dist)
+    assets.init_app(app)
+    os.makedirs(app.config['UPLOAD_FOLDER'], exist_ok=True)
+
+    app.register_blueprint(main)
+
+    return app
 
 # ===== SISTEMA LOG STREAMING =====
-admin_log_queue = queue.Queue()
-active_admin_clients = set()
-
 class AdminLogger:
     """Logger personalizzato per l'admin page con streaming SSE"""
-    
-    @staticmethod
-    def log(level, message, extra=None):
+
+    def __init__(self):
+        self._pid = None
+        self._queue = None
+        self._clients = None
+
+    def _ensure_process(self):
+        # Coda e client sono creati nel processo che li usa: con gunicorn
+        # --preload il master non deve passarli ai worker dopo il fork
+        if self._pid != os.getpid():
+            self._pid = os.getpid()
+            self._queue = queue.Queue()
+            self._clients = set()
+
+    @property
+    def queue(self):
+        self._ensure_process()
+        return self._queue
+
+    @property
+    def clients(self):
+        self._ensure_process()
+        return self._clients
+
+    def log(self, level, message, extra=None):
         """Aggiunge un messaggio al log stream"""
         log_entry = {
             'timestamp': datetime.now().strftime('%H:%M:%S'),
@@ -80,8 +128,8 @@ class AdminLogger:
         
         # Aggiunge alla coda per tutti i client connessi
         try:
-            for _ in range(len(active_admin_clients)):
-                admin_log_queue.put_nowait(log_entry)
+            for _ in range(len(self.clients)):
+                self.queue.put_nowait(log_entry)
         except queue.Full:
             pass
         
@@ -91,6 +139,12 @@ class AdminLogger:
 # Instance globale del logger
 admin_logger = AdminLogger()
 
+# Cache delle pagine statistiche, invalidata dalla versione dei dati
+stats_cache = VersionedCache()
+simulation_cache = VersionedCache()
+# Pagine pubbliche già renderizzate, per URL e versione dei dati
+response_cache = ResponseCache.from_env()
+
 # ===== UTILITY FUNCTIONS =====
 def allowed_file(filename):
     """Controlla se il file è un Excel valido"""
@@ -106,7 +160,9 @@ def auth_required(f):
     return decorated
 # ===== ROUTES PRINCIPALI =====
 
-@app.route('/')
+@main.route('/')
+@conditional
+@response_cache.cached
 def index():
     """Homepage con statistiche"""
     try:
@@ -120,21 +176,23 @@ def index():
                              latest_gameweek=latest_gameweek)
     except Exception as e:
         print(f"Errore homepage: {e}")
+        db.session.rollback()
+        # 503: la pagina vuota non deve finire in cache, ETag o export statico
         return render_template('index.html',
                              total_matches=0,
                              total_articles=0,
-                             latest_gameweek=None)
+                             latest_gameweek=None), 503
 
 # Nel tuo file app.py
 
-@app.route('/matches')
+@main.route('/matches')
+@conditional
+@response_cache.cached
 def matches():
-    page = request.args.get('page', 1, type=int)
     gameweek = request.args.get('gameweek', type=int)
 
-    # Mappa squadre per loghi
-    teams = Team.query.all()
-    teams_map = {team.name: team for team in teams}
+    # Mappa squadre per loghi (anagrafica in memoria, ricaricata solo dopo un'ingestione)
+    teams_map = team_directory.teams_map()
 
     # Se l’utente seleziona una singola giornata: mostro SOLO quella (niente paginazione)
     if gameweek:
@@ -153,20 +211,16 @@ def matches():
             teams_map=teams_map
         )
 
-    # Altrimenti: pagino le GIORNATE (non le partite)
-    gameweeks_per_page = app.config.get('GAMEWEEKS_PER_PAGE', 4)
-
-    gw_query = (db.session.query(Match.gameweek)
-                .distinct()
-                .order_by(Match.gameweek.desc()))
-
-    gw_pagination = gw_query.paginate(page=page, per_page=gameweeks_per_page, error_out=False)
-
-    # Estrai lista giornate dalla paginazione
-    gws = []
-    for row in gw_pagination.items:
-        # row può essere tuple/Row: prendo il primo elemento
-        gws.append(row[0] if not isinstance(row, int) else row)
+    # Altrimenti: pagino le GIORNATE (non le partite) con un cursore sulla giornata
+    gw_pagination = keyset.paginate(
+        db.session.query(Match.gameweek).distinct(),
+        [Match.gameweek],
+        per_page=current_app.config.get('GAMEWEEKS_PER_PAGE', 4),
+        after=request.args.get('after'),
+        before=request.args.get('before'),
+        total=keyset.approximate_count(Match),
+    )
+    gws = [row.gameweek for row in gw_pagination.items]
 
     # Prendo tutte le partite di quelle giornate
     matches_list = (Match.query
@@ -189,14 +243,16 @@ def matches():
         teams_map=teams_map
     )
 
-@app.route('/matches/<int:match_id>')
+@main.route('/matches/<int:match_id>')
+@conditional
+@response_cache.cached
 def match_detail(match_id):
     """Dettaglio singola partita"""
     match = Match.query.get_or_404(match_id)
     article = Article.query.filter_by(match_id=match_id).first()
 
     # ✅ Mappa squadre per loghi (usata dal template)
-    teams_map = {t.name: t for t in Team.query.all()}
+    teams_map = team_directory.teams_map()
 
     return render_template(
         'match_detail.html',
@@ -206,22 +262,29 @@ def match_detail(match_id):
     )
 
 
-@app.route('/articles')
+@main.route('/articles')
+@conditional
+@response_cache.cached
 def articles():
     """Lista articoli con paginazione"""
-    page = request.args.get('page', 1, type=int)
-    
-    pagination = Article.query.order_by(Article.created_at.desc()).paginate(
-        page=page, 
-        per_page=app.config['ARTICLES_PER_PAGE'], 
-        error_out=False
+    # Il contenuto completo non serve in lista: titolo ed estratto bastano.
+    # Cursore su (created_at, id): nessun OFFSET né COUNT per pagina
+    pagination = keyset.paginate(
+        Article.query.options(defer(Article.content)),
+        [Article.created_at, Article.id],
+        per_page=current_app.config['ARTICLES_PER_PAGE'],
+        after=request.args.get('after'),
+        before=request.args.get('before'),
+        total=keyset.approximate_count(Article),
     )
     
     return render_template('articles.html', 
                          articles=pagination.items, 
                          pagination=pagination)
 
-@app.route('/articles/<int:article_id>')
+@main.route('/articles/<int:article_id>')
+@conditional
+@response_cache.cached
 def article_detail(article_id):
     """Dettaglio singolo articolo"""
     article = Article.query.get_or_404(article_id)
@@ -230,14 +293,20 @@ def article_detail(article_id):
         match = Match.query.get(article.match_id)
     
     # Altri articoli per sidebar
-    articles_list = Article.query.order_by(Article.created_at.desc()).limit(10).all()
+    articles_list = (Article.query
+                     .options(defer(Article.content))
+                     .order_by(Article.created_at.desc())
+                     .limit(10)
+                     .all())
     
     return render_template('article_detail.html',
                          article=article,
                          match=match,
                          articles_list=articles_list)
 
-@app.route('/teams')
+@main.route('/teams')
+@conditional
+@response_cache.cached
 def teams():
     all_teams = Team.query.options(joinedload(Team.players)).all()
     
@@ -257,7 +326,9 @@ def teams():
         
     return render_template('teams.html', teams=all_teams)
 
-@app.route('/teams/<int:team_id>')
+@main.route('/teams/<int:team_id>')
+@conditional
+@response_cache.cached
 def team_roster(team_id):
     """
     Mostra la rosa e le statistiche di una squadra specifica,
@@ -279,120 +350,185 @@ def team_roster(team_id):
         players_by_role[role].sort(key=lambda p: p.name)
     
     team.players_by_role = players_by_role
+    # Andamento in classifica giornata per giornata (una query sulle fotografie)
+    trajectory = standings_history.get_team_trajectory(team.name)
+    # Rating Elo salvato giornata per giornata in ingestione
+    ratings = elo.get_rating_history(team.name)
+    # Forma recente di squadra e giocatori, già calcolata in ingestione
+    form = recent_form.get_team_form(team.name)
+    player_forms = recent_form.get_player_forms([player.id for player in team.players])
     # ✅ Restituisce il template con i dati della squadra e la rosa raggruppata
-    return render_template('team_roster.html', team=team, players_by_role=players_by_role)
+    return render_template('team_roster.html', team=team, players_by_role=players_by_role,
+                           trajectory=trajectory, ratings=ratings, form=form, player_forms=player_forms)
 
-@app.route('/standings')
+@main.route('/standings')
+@conditional
+@response_cache.cached
 def standings():
-    """Classifica del campionato"""
+    """Classifica del campionato (letta dalla tabella materializzata)"""
+    gameweek = request.args.get('gameweek', type=int)
     try:
-        from utils.calculate_standings import calculate_standings
-        data = calculate_standings()
+        latest_gameweek = standings_history.latest_snapshot_gameweek()
+        # ?gameweek=N → classifica alla giornata N dalle fotografie storiche
+        simulation = None
+        if gameweek:
+            data = standings_history.get_standings_at(gameweek)
+        else:
+            data = standings_store.get_standings()
+            simulation = get_season_simulation()
         
         return render_template('standings.html', 
                                standings=data['standings'],
                                best_attack=data['best_attack'],
                                best_defense=data['best_defense'],
-                               most_wins=data['most_wins'])
+                               most_wins=data['most_wins'],
+                               selected_gameweek=gameweek,
+                               gameweeks=range(1, (latest_gameweek or 0) + 1),
+                               simulation=simulation)
     except Exception as e:
         print(f"Errore classifica: {e}")
-        return render_template('standings.html', standings=[])
+        db.session.rollback()
+        # 503: la classifica vuota non deve finire in cache, ETag o export statico
+        return render_template('standings.html', standings=[], selected_gameweek=gameweek, gameweeks=[]), 503
+
+def get_season_simulation():
+    """Probabilità di fine stagione, ricalcolate una volta per versione dei dati."""
+    return simulation_cache.get_or_build('season', data_version.current_version(),
+                                         season_simulator.simulate_season)
+
+def warm_season_simulation(app, background=False):
+    """
+    Calcola la simulazione per la versione corrente dopo l'ultimo bump di
+    un'ingestione, così non la paga la prima visita a /standings. La cache
+    è del processo: va chiamata nel worker che serve le pagine.
+    """
+    def run():
+        with app.app_context():
+            try:
+                get_season_simulation()
+            except Exception as e:
+                print(f"Errore precalcolo simulazione: {e}")
+
+    if not background:
+        return run()
+    threading.Thread(target=run, name='warm-simulation', daemon=True).start()
+
+@main.route('/api/standings/simulation')
+@conditional
+@response_cache.cached
+def api_season_simulation():
+    """Probabilità di titolo, zona Champions e ultimo posto in JSON"""
+    simulation = get_season_simulation()
+    if simulation is None:
+        return jsonify({'error': 'Nessuna partita giocata'}), 404
+    return jsonify(simulation)
+
+@main.route('/api/standings/<int:gameweek>')
+@conditional
+@response_cache.cached
+def api_standings_at(gameweek):
+    """Classifica alla giornata N in JSON"""
+    return jsonify(standings_history.get_standings_at(gameweek)['standings'])
+
+@main.route('/api/teams/<int:team_id>/trajectory')
+@conditional
+@response_cache.cached
+def api_team_trajectory(team_id):
+    """Posizione in classifica di una squadra giornata per giornata"""
+    team = Team.query.get_or_404(team_id)
+    return jsonify({'team': team.name, 'trajectory': standings_history.get_team_trajectory(team.name)})
     
-@app.route('/stats')
+def _team_dict(team):
+    if team is None:
+        return None
+    return {
+        'id': team.id,
+        'name': team.name,
+        'points': team.points,
+        'matches_played': team.matches_played,
+        'goals_for': team.goals_for,
+        'goals_against': team.goals_against,
+    }
+
+def _player_dict(player):
+    return {
+        'id': player.id,
+        'name': player.name,
+        'goals': player.goals,
+        'assists': player.assists,
+        'clean_sheets': player.clean_sheets,
+        'team': {'id': player.team.id, 'name': player.team.name} if player.team else None,
+    }
+
+def build_stats_payload():
+    """
+    Calcola tutti i dati della pagina /stats come dizionari semplici
+    (niente oggetti ORM: il risultato resta in cache tra le richieste).
+    """
+    # Totali e statistiche per giornata dalla tabella GameweekRollup (una riga per giornata)
+    summary = gameweek_rollup.get_stats_summary()
+
+    # Partite “spettacolari”: ordinate per PUNTI totali (indice su espressione)
+    spectacular_matches = [{
+        "home_team": m.home_team,
+        "away_team": m.away_team,
+        "home_score": m.home_score,
+        "away_score": m.away_score,
+        "gameweek": m.gameweek,
+        "id": m.id
+    } for m in gameweek_rollup.top_scoring_matches(5)]
+
+    teams = [_team_dict(t) for t in Team.query.order_by(Team.points.desc()).all()]
+    top_scorer_team = Team.query.order_by(Team.goals_for.desc()).first()
+    best_defense = Team.query.filter(Team.matches_played > 0).order_by(Team.goals_against).first()
+
+    players = Player.query.options(joinedload(Player.team))
+    top_scorers = players.order_by(Player.goals.desc()).limit(10).all()
+    top_assisters = players.order_by(Player.assists.desc()).limit(10).all()
+    best_goalkeepers = players.filter(Player.is_goalkeeper.is_(True)).order_by(Player.clean_sheets.desc()).limit(5).all()
+
+    fantavoto = PlayerStat.query.options(joinedload(PlayerStat.player).joinedload(Player.team))
+    top_fantavoto_players = fantavoto.order_by(desc(PlayerStat.fanta_vote)).limit(5).all()
+    flop_fantavoto_players = fantavoto.order_by(PlayerStat.fanta_vote.asc()).limit(5).all()
+
+    def stat_dict(stat):
+        return {'fanta_vote': stat.fanta_vote, 'vote': stat.vote, 'player': _player_dict(stat.player)}
+
+    return {
+        'total_matches': summary['total_matches'],
+        'total_teams': Team.query.count(),
+        'avg_goals_per_match': summary['avg_goals_per_match'],
+        'avg_points_per_match': summary['avg_points_per_match'],
+        'gameweek_stats': summary['gameweek_stats'],
+        'teams': teams,
+        'top_team': teams[0] if teams else None,
+        'top_scorer_team': _team_dict(top_scorer_team),
+        'best_defense': _team_dict(best_defense),
+        'high_scoring_matches': spectacular_matches,
+        'top_scorers': [_player_dict(p) for p in top_scorers],
+        'top_assisters': [_player_dict(p) for p in top_assisters],
+        'best_goalkeepers': [_player_dict(p) for p in best_goalkeepers],
+        'top_fantavoto_players': [stat_dict(st) for st in top_fantavoto_players],
+        'flop_fantavoto_players': [stat_dict(st) for st in flop_fantavoto_players],
+    }
+
+@main.route('/stats')
+@conditional
+@response_cache.cached
 def stats():
     try:
-        total_matches = Match.query.count()
-        total_teams = Team.query.count()
-        all_matches = Match.query.all()
-
-        # ✅ PUNTI fantacalcio (sono home_score/away_score)
-        total_points_sum = sum((m.home_score or 0) + (m.away_score or 0) for m in all_matches)
-
-        # ✅ GOL ricavati dai punti
-        total_goals_sum = sum(
-            points_to_goals(m.home_score or 0) + points_to_goals(m.away_score or 0)
-            for m in all_matches
-        )
-
-        avg_points_per_match = (total_points_sum / total_matches) if total_matches else 0.0
-        avg_goals_per_match  = (total_goals_sum / total_matches) if total_matches else 0.0
-
-        # ✅ Stats per giornata (in python, perché points_to_goals non puoi farlo in SQL facilmente)
-        gameweek_stats = {}
-        for m in all_matches:
-            gw = m.gameweek
-            pts = (m.home_score or 0) + (m.away_score or 0)
-            goals = points_to_goals(m.home_score or 0) + points_to_goals(m.away_score or 0)
-
-            if gw not in gameweek_stats:
-                gameweek_stats[gw] = {"matches": 0, "total_points": 0.0, "total_goals": 0.0}
-
-            gameweek_stats[gw]["matches"] += 1
-            gameweek_stats[gw]["total_points"] += float(pts)
-            gameweek_stats[gw]["total_goals"] += float(goals)
-
-        for gw, st in gameweek_stats.items():
-            st["avg_points"] = st["total_points"] / st["matches"] if st["matches"] else 0.0
-            st["avg_goals"]  = st["total_goals"] / st["matches"] if st["matches"] else 0.0
-
-        # Partite “spettacolari”: decidi se per PUNTI o per GOL.
-        # Qui le ordino per PUNTI (coerente col tuo DB)
-        high_scoring_matches = sorted(
-            all_matches, key=lambda m: (m.home_score or 0) + (m.away_score or 0), reverse=True
-        )[:5]
-
-        spectacular_matches = [{
-            "home_team": m.home_team,
-            "away_team": m.away_team,
-            "home_score": m.home_score,
-            "away_score": m.away_score,
-            "gameweek": m.gameweek,
-            "id": m.id
-        } for m in high_scoring_matches]
-
-        # --- il resto della tua route può rimanere uguale ---
-        teams = Team.query.order_by(Team.points.desc()).all()
-        top_team = teams[0] if teams else None
-        top_scorer_team = Team.query.order_by(Team.goals_for.desc()).first()
-        best_defense = Team.query.filter(Team.matches_played > 0).order_by(Team.goals_against).first()
-
-        top_scorers = Player.query.order_by(Player.goals.desc()).limit(10).all()
-        top_assisters = Player.query.order_by(Player.assists.desc()).limit(10).all()
-        best_goalkeepers = Player.query.filter_by(is_goalkeeper=True).order_by(Player.clean_sheets.desc()).limit(5).all()
-
-        top_fantavoto_players = PlayerStat.query.options(
-            joinedload(PlayerStat.player).joinedload(Player.team)
-        ).order_by(desc(PlayerStat.fanta_vote)).limit(5).all()
-
-        flop_fantavoto_players = PlayerStat.query.options(
-            joinedload(PlayerStat.player).joinedload(Player.team)
-        ).order_by(PlayerStat.fanta_vote.asc()).limit(5).all()
-
-        return render_template(
-            "stats.html",
-            total_matches=total_matches,
-            total_teams=total_teams,
-            avg_goals_per_match=avg_goals_per_match,
-            avg_points_per_match=avg_points_per_match,
-            gameweek_stats=gameweek_stats,
-            teams=teams,
-            top_team=top_team,
-            top_scorer_team=top_scorer_team,
-            best_defense=best_defense,
-            high_scoring_matches=spectacular_matches,
-            top_scorers=top_scorers,
-            top_assisters=top_assisters,
-            best_goalkeepers=best_goalkeepers,
-            top_fantavoto_players=top_fantavoto_players,
-            flop_fantavoto_players=flop_fantavoto_players
-        )
+        # Ricalcolato solo quando un'ingestione cambia la versione dei dati
+        payload = stats_cache.get_or_build('stats', data_version.current_version(), build_stats_payload)
+        return render_template("stats.html", **payload)
 
     except Exception as e:
         print(f"Errore nella route stats: {e}")
         return render_template("errors/500.html"), 500
 
 
-@app.route('/api/top-scorers')
+@main.route('/api/top-scorers')
+@conditional
+@response_cache.cached
 def api_top_scorers():
     """Restituisce i migliori marcatori in formato JSON."""
     top_players = db.session.query(Player, func.sum(PlayerStat.goals).label('total_goals')) \
@@ -411,7 +547,9 @@ def api_top_scorers():
         })
     return jsonify(results)
 
-@app.route('/api/top-assists')
+@main.route('/api/top-assists')
+@conditional
+@response_cache.cached
 def api_top_assists():
     """Restituisce i migliori assistman in formato JSON."""
     top_players = db.session.query(Player, func.sum(PlayerStat.assists).label('total_assists')) \
@@ -430,7 +568,9 @@ def api_top_assists():
         })
     return jsonify(results)
 
-@app.route('/player/<int:player_id>')
+@main.route('/player/<int:player_id>')
+@conditional
+@response_cache.cached
 def player_stats(player_id):
     """Renderizza la pagina delle statistiche del giocatore con i dati Jinja."""
     player = Player.query.options(joinedload(Player.team)).get_or_404(player_id)
@@ -461,12 +601,13 @@ def player_stats(player_id):
                            player=player, 
                            player_stats=player_stats_list,
                            fanta_votes=fanta_votes,
+                           form=recent_form.get_player_form(player_id),
                            total_goals=total_goals,
                            total_assists=total_assists,
                            bayesian_fanta_vote_average=bayesian_fanta_vote_average)
 
 # ===== ADMIN ROUTES =====
-@app.route('/admin')
+@main.route('/admin')
 @auth_required
 def admin():
     """Pannello amministrazione"""
@@ -494,19 +635,30 @@ def admin():
                              latest_gameweek=None,
                              suggested_gameweek=1)
 
-@app.route('/admin/logs/stream')
+@main.route('/admin/cache-stats')
+@auth_required
+def cache_stats():
+    """Contatori delle cache in memoria di questo worker."""
+    return jsonify({
+        'responses': response_cache.stats(),
+        'fragments': fragment_cache.stats(),
+        'stats': {'hits': stats_cache.hits, 'misses': stats_cache.misses},
+        'simulation': {'hits': simulation_cache.hits, 'misses': simulation_cache.misses},
+    })
+
+@main.route('/admin/logs/stream')
 def admin_log_stream():
     """SSE endpoint per streaming dei log admin"""
     def generate():
         # Registra questo client
         client_id = threading.current_thread().ident
-        active_admin_clients.add(client_id)
+        admin_logger.clients.add(client_id)
         
         try:
             while True:
                 try:
                     # Aspetta un nuovo log (timeout 30 secondi per heartbeat)
-                    log_entry = admin_log_queue.get(timeout=30)
+                    log_entry = admin_logger.queue.get(timeout=30)
                     
                     # Format SSE
                     data = json.dumps(log_entry)
@@ -518,7 +670,7 @@ def admin_log_stream():
                     
         except GeneratorExit:
             # Client disconnesso
-            active_admin_clients.discard(client_id)
+            admin_logger.clients.discard(client_id)
             print(f"Admin client {client_id} disconnesso")
     
     return Response(
@@ -531,7 +683,7 @@ def admin_log_stream():
         }
     )
 
-@app.route('/admin/process', methods=['POST'])
+@main.route('/admin/process', methods=['POST'])
 def admin_process():
     """Processa Excel con log streaming"""
     try:
@@ -556,14 +708,15 @@ def admin_process():
         generate_articles = 'generate_articles' in request.form
         update_standings = 'update_standings' in request.form
         overwrite_duplicates = 'overwrite_duplicates' in request.form
+        stream_articles = 'stream_articles' in request.form
         
-        admin_logger.log('info', f'📋 Parametri: Giornata {gameweek}, Articoli: {generate_articles}')
+        admin_logger.log('info', f'📋 Parametri: Giornata {gameweek}, Articoli: {generate_articles}, Streaming: {stream_articles}')
         
         # Salva file
         filename = secure_filename(file.filename)
         timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
         filename = f"{timestamp}_{filename}"
-        filepath = os.path.join(app.config['UPLOAD_FOLDER'], filename)
+        filepath = os.path.join(current_app.config['UPLOAD_FOLDER'], filename)
         file.save(filepath)
         
         admin_logger.log('success', f'📤 File salvato: {filename}')
@@ -573,7 +726,8 @@ def admin_process():
         
         thread = threading.Thread(
             target=process_matches_with_logging,
-            args=(filepath, gameweek, generate_articles, update_standings, overwrite_duplicates)
+            args=(current_app._get_current_object(), filepath, gameweek, generate_articles,
+                  update_standings, overwrite_duplicates, stream_articles)
         )
         thread.daemon = True
         thread.start()
@@ -587,7 +741,7 @@ def admin_process():
         admin_logger.log('error', f'💥 Errore server: {str(e)}')
         return jsonify({'success': False, 'message': f'Errore server: {str(e)}'})
 
-@app.route('/admin/clear-database', methods=['POST'])
+@main.route('/admin/clear-database', methods=['POST'])
 def clear_database():
     """Svuota il database (solo per admin)"""
     try:
@@ -597,6 +751,14 @@ def clear_database():
         Article.query.delete()
         Match.query.delete()
         Team.query.delete()
+        Standing.query.delete()
+        HeadToHead.query.delete()
+        StandingSnapshot.query.delete()
+        GameweekRollup.query.delete()
+        TeamRating.query.delete()
+        TeamForm.query.delete()
+        PlayerForm.query.delete()
+        data_version.bump()
         db.session.commit()
         
         admin_logger.log('success', '✅ Database svuotato completamente')
@@ -607,7 +769,7 @@ def clear_database():
         admin_logger.log('error', f'❌ Errore pulizia database: {str(e)}')
         return jsonify({'success': False, 'message': f'Errore: {str(e)}'})
 
-@app.route('/submit_match', methods=['POST'])
+@main.route('/submit_match', methods=['POST'])
 def submit_match():
     """
     Gestisce l'invio e l'elaborazione dei dati di una partita.
@@ -631,6 +793,13 @@ def submit_match():
         )
         db.session.add(new_match)
         db.session.flush()  # Ottiene l'ID del match prima del commit
+        standings_store.apply_match(new_match)
+        standings_store.refresh_positions_for([new_match])
+        standings_history.refresh_for_matches([new_match])
+        gameweek_rollup.refresh_for_matches([new_match])
+        elo.refresh_for_matches([new_match])
+        recent_form.refresh_teams_for([new_match])
+        data_version.bump()
 
         # Aggiorna le statistiche di squadra
         home_team.matches_played += 1
@@ -676,7 +845,10 @@ def submit_match():
                 if player.is_goalkeeper and player_data.get('clean_sheet', False):
                     player.clean_sheets += 1
         
+        recent_form.refresh_players_for([new_match])
         db.session.commit()
+        # In background: la risposta non aspetta la simulazione
+        warm_season_simulation(current_app._get_current_object(), background=True)
         return jsonify({'success': True, 'message': 'Partita elaborata con successo!'}), 200
 
     except Exception as e:
@@ -789,17 +961,22 @@ def process_player_stats(db_session, saved_matches_data):
     
     admin_logger.log('success', '📊 Statistiche giocatori salvate con successo.')
 
-def process_matches_with_logging(filepath, gameweek, generate_articles=True, update_standings=True, overwrite_duplicates=False):
+def process_matches_with_logging(app, filepath, gameweek, generate_articles=True, update_standings=True, overwrite_duplicates=False, stream_articles=None):
     """
     Processo background con log dettagliato
     Questa è la tua funzione originale, integrata e aggiornata.
     """
+    if stream_articles is None:
+        stream_articles = app.config['PERPLEXITY_STREAM']
+
     try:
         with app.app_context():
             
             # ===== STEP 1: PARSING =====
             admin_logger.log('info', '🔍 Iniziando parsing del file Excel...')
             
+            # Import ritardato: pandas serve solo in ingestione, non ai worker pubblici
+            from utils.excel_parser import ExcelParser
             parser = ExcelParser(filepath)
             matches_data = parser.parse_matches()
 
@@ -860,8 +1037,11 @@ def process_matches_with_logging(filepath, gameweek, generate_articles=True, upd
                 
                 if existing:
                     if overwrite_duplicates:
+                        previous = standings_store.snapshot(existing)
                         existing.home_score = match_data['home_total']
                         existing.away_score = match_data['away_total']
+                        standings_store.revert_match(previous)
+                        standings_store.apply_match(existing)
                         saved_matches.append((existing, match_data))
                         admin_logger.log('warning', f'🔄 Aggiornata partita esistente: {match_data["home_team"]} vs {match_data["away_team"]}')
                     else:
@@ -880,9 +1060,20 @@ def process_matches_with_logging(filepath, gameweek, generate_articles=True, upd
                     
                     db.session.add(match)
                     db.session.flush()
+                    standings_store.apply_match(match)
                     saved_matches.append((match, match_data))
                     admin_logger.log('success', f'✅ Salvata nuova partita (ID: {match.id})')
             
+            # Posizioni con classifica avulsa, fotografie di classifica (dalla giornata
+            # caricata in avanti), totali della giornata per /stats e rating Elo
+            if saved_matches:
+                standings_store.refresh_positions_for([match for match, _ in saved_matches])
+                standings_history.refresh_for_matches([match for match, _ in saved_matches])
+                gameweek_rollup.refresh_for_matches([match for match, _ in saved_matches])
+                elo.refresh_for_matches([match for match, _ in saved_matches])
+                recent_form.refresh_teams_for([match for match, _ in saved_matches])
+                data_version.bump()
+            
             db.session.commit()
             admin_logger.log('success', f'💾 Database aggiornato: {len(saved_matches)} partite salvate, {duplicate_count} duplicate')
             
@@ -890,6 +1081,8 @@ def process_matches_with_logging(filepath, gameweek, generate_articles=True, upd
             if saved_matches:
                 try:
                     process_player_stats(db.session, saved_matches)
+                    recent_form.refresh_players_for([match for match, _ in saved_matches])
+                    data_version.bump()
                     db.session.commit()
                 except Exception as e:
                     db.session.rollback()
@@ -901,32 +1094,18 @@ def process_matches_with_logging(filepath, gameweek, generate_articles=True, upd
                 admin_logger.log('info', '🤖 Iniziando generazione articoli AI...')
                 
                 try:
+                    from utils.perplexity_client import PerplexityClient
                     perplexity = PerplexityClient()
 
-                    for i, (match, match_data) in enumerate(saved_matches):
-                        try:
-                            article_content = perplexity.generate_article(match_data)
-                            article = Article(
-                                match_id=match.id,
-                                title=f"{match.home_team} vs {match.away_team}: Cronaca e Analisi",
-                                content=article_content
-                            )
-                            db.session.add(article)
-                            articles_generated += 1
-                            admin_logger.log('success', f'✅ Articolo generato per {match.home_team} vs {match.away_team}')
-                            
-                        except Exception as e:
-                            admin_logger.log('warning', f'⚠️ Errore generazione articolo per {match.home_team} vs {match.away_team}: {str(e)}')
-                            
-                            # Fallback article
-                            fallback = Article(
-                                match_id=match.id,
-                                title=f"{match.home_team} vs {match.away_team}: Resoconto",
-                                content=f"<p>Partita conclusa {match.home_score:.1f} - {match.away_score:.1f}.</p>"
-                            )
-                            db.session.add(fallback)
-                            articles_generated += 1
+                    articles_generated = generate_match_articles(
+                        app, perplexity, saved_matches,
+                        max_workers=app.config['ARTICLE_WORKERS'],
+                        stream=stream_articles,
+                        log=admin_logger.log
+                    )
                     
+                    # Nuovi articoli: le pagine pubbliche cambiano
+                    data_version.bump()
                     db.session.commit()
                     admin_logger.log('success', f'📰 Generazione articoli completata: {articles_generated} articoli creati')
                     
@@ -936,17 +1115,36 @@ def process_matches_with_logging(filepath, gameweek, generate_articles=True, upd
                 admin_logger.log('info', '📰 Generazione articoli saltata')
             
             # ===== STEP 6: CLASSIFICA =====
+            # La classifica materializzata è già aggiornata partita per partita (step 3)
             if update_standings:
-                admin_logger.log('info', '📊 Aggiornando classifica...')
-                
                 try:
-                    from utils.calculate_standings import calculate_standings
-                    calculate_standings()
-                    admin_logger.log('success', '📊 Classifica aggiornata con successo')
+                    leader = next(iter(standings_store.get_standings()['standings']), None)
+                    if leader:
+                        admin_logger.log('success', f'📊 Classifica aggiornata: in testa {leader["name"]} con {leader["points"]} punti')
+                    else:
+                        admin_logger.log('success', '📊 Classifica aggiornata con successo')
                 except Exception as e:
-                    admin_logger.log('error', f'⚠️ Errore aggiornamento classifica: {str(e)}')
+                    admin_logger.log('error', f'⚠️ Errore lettura classifica: {str(e)}')
             else:
-                admin_logger.log('info', '📊 Aggiornamento classifica saltato')
+                admin_logger.log('info', '📊 Riepilogo classifica saltato')
+            
+            # ===== STEP 7: SIMULAZIONE STAGIONE =====
+            # Dopo l'ultimo bump: la prima visita a /standings trova già il risultato
+            if saved_matches:
+                start = time.perf_counter()
+                warm_season_simulation(app)
+                admin_logger.log('info', f'🎲 Simulazione stagione precalcolata in {time.perf_counter() - start:.1f}s')
+
+            # ===== STEP 8: ESPORTAZIONE STATICA =====
+            if app.config['STATIC_EXPORT'] and saved_matches:
+                try:
+                    written, failed = static_export.export_matches(
+                        app, [match.id for match, _ in saved_matches],
+                        log=lambda message: admin_logger.log('warning', message)
+                    )
+                    admin_logger.log('success', f'🗂️ Esportazione statica: {written} pagine aggiornate, {failed} errori')
+                except Exception as e:
+                    admin_logger.log('error', f'⚠️ Errore esportazione statica: {str(e)}')
             
             # ===== COMPLETAMENTO =====
             admin_logger.log('success', '🎉 ELABORAZIONE COMPLETATA CON SUCCESSO!')
@@ -962,28 +1160,247 @@ def process_matches_with_logging(filepath, gameweek, generate_articles=True, upd
             admin_logger.log('info', f'🗑️ File temporaneo {filepath} cancellato.')
 
 # ===== ERROR HANDLERS =====
-@app.errorhandler(404)
+@main.app_errorhandler(404)
 def not_found_error(error):
     return render_template('errors/404.html'), 404
 
-@app.errorhandler(500)
+@main.app_errorhandler(500)
 def internal_error(error):
     db.session.rollback()
     return render_template('errors/500.html'), 500
 
 # ===== DEBUG ROUTES (solo in development) =====
-if app.debug:
-    @app.route('/debug/routes')
-    def debug_routes():
-        """Mostra tutte le route disponibili"""
-        routes = []
-        for rule in app.url_map.iter_rules():
-            routes.append({
-                'endpoint': rule.endpoint,
-                'methods': list(rule.methods),
-                'url': str(rule)
-            })
-        return jsonify(routes)
+@main.route('/debug/routes')
+def debug_routes():
+    """Mostra tutte le route disponibili"""
+    # Il debug si attiva anche dopo create_app (app.run(debug=True)): si controlla a ogni richiesta
+    if not current_app.debug:
+        abort(404)
+    routes = []
+    for rule in current_app.url_map.iter_rules():
+        routes.append({
+            'endpoint': rule.endpoint,
+            'methods': list(rule.methods),
+            'url': str(rule)
+        })
+    return jsonify(routes)
+
+# ===== CLI COMMANDS =====
+def _rebuild_standings():
+    rows = standings_store.rebuild_standings()
+    # Le righe di Standing sono nuove: va ricopiato anche il rating Elo
+    elo.rebuild_ratings()
+    return rows
+
+# Tabelle derivate da Match: (descrizione, model da controllare, ricostruzione).
+# Le migrazioni le creano vuote: init-db le popola se ci sono già partite
+DERIVED_TABLES = [
+    ('classifica e scontri diretti', (Standing, HeadToHead), _rebuild_standings),
+    ('classifiche per giornata', (StandingSnapshot,), standings_history.rebuild_snapshots),
+    ('totali per giornata', (GameweekRollup,), gameweek_rollup.rebuild_rollups),
+    ('rating Elo', (TeamRating,), elo.rebuild_ratings),
+    ('forma recente', (TeamForm,), recent_form.rebuild_forms),
+]
+
+
+def backfill_derived_tables(log=print):
+    """Ricostruisce dalle partite le tabelle derivate rimaste vuote. Restituisce le descrizioni."""
+    if db.session.query(Match.id).first() is None:
+        return []
+
+    rebuilt = []
+    for label, models, rebuild in DERIVED_TABLES:
+        if any(db.session.query(model.id).first() is None for model in models):
+            rebuild()
+            log(f"🔧 {label}: tabella vuota, ricostruita dalle partite")
+            rebuilt.append(label)
+    if rebuilt:
+        data_version.bump()
+        db.session.commit()
+    return rebuilt
+
+@main.cli.command('init-db')
+def init_db_command():
+    """Crea o aggiorna lo schema del database (da eseguire prima di avviare i worker)."""
+    from flask_migrate import stamp, upgrade
+
+    tables = set(db.inspect(db.engine).get_table_names())
+    if 'alembic_version' in tables:
+        upgrade()
+        click.echo("✅ Schema aggiornato con le migrazioni")
+    else:
+        # La prima migrazione parte da tabelle già esistenti: su un database nuovo
+        # (o creato da create_all senza migrazioni) lo schema si crea dai model
+        # e si marca come allineato all'ultima revisione
+        db.create_all()
+        stamp()
+        click.echo("🆕 Schema creato dai model e marcato all'ultima migrazione" if not tables
+                   else "🏷️ Tabelle mancanti create e database marcato all'ultima migrazione")
+
+    backfill_derived_tables(log=click.echo)
+
+@main.cli.command('regenerate-articles')
+@click.option('--prompt-version', type=int, help='Solo articoli generati con questa versione del prompt')
+@click.option('--outdated', is_flag=True, help='Articoli senza versione o con prompt precedente a quello attuale')
+@click.option('--since', type=click.DateTime(formats=['%Y-%m-%d']), help='Creati da questa data (YYYY-MM-DD)')
+@click.option('--until', type=click.DateTime(formats=['%Y-%m-%d']), help='Creati prima di questa data (YYYY-MM-DD)')
+@click.option('--gameweek', type=int, help='Solo articoli di questa giornata')
+@click.option('--fallback', 'fallback_only', is_flag=True, help='Solo articoli di fallback (generazione AI fallita)')
+@click.option('--missing', is_flag=True, help='Crea gli articoli mancanti per le partite che non ne hanno')
+@click.option('--all', 'select_all', is_flag=True, help='Rigenera tutti gli articoli')
+@click.option('--workers', type=int, default=None, help='Richieste LLM in parallelo (default ARTICLE_WORKERS)')
+@click.option('--checkpoint', default=None, help='File di checkpoint per riprendere un run interrotto')
+@click.option('--restart', is_flag=True, help='Ignora il checkpoint esistente e riparte da capo')
+@click.option('--dry-run', is_flag=True, help='Mostra solo quanti articoli verrebbero rigenerati')
+def regenerate_articles_command(prompt_version, outdated, since, until, gameweek, fallback_only,
+                                missing, select_all, workers, checkpoint, restart, dry_run):
+    """Rigenera gli articoli selezionati dai dati Match/PlayerStat già salvati."""
+    from utils.regenerate_articles import Checkpoint, matches_without_article, regenerate_articles, select_articles
+    from utils.perplexity_client import PerplexityClient
+
+    filters = [prompt_version is not None, outdated, since, until, gameweek is not None, fallback_only]
+    if not any(filters) and not missing and not select_all:
+        raise click.UsageError('Specifica almeno un filtro, --missing oppure --all')
+
+    jobs = []
+    if any(filters) or select_all:
+        articles = select_articles(prompt_version=prompt_version, outdated=outdated, since=since,
+                                   until=until, gameweek=gameweek, fallback_only=fallback_only)
+        jobs += [(f"article:{a.id}", a.match_id, a.id) for a in articles]
+    if missing:
+        jobs += [(f"match:{m.id}", m.id, None) for m in matches_without_article(gameweek)]
+
+    if dry_run:
+        click.echo(f"🔎 {len(jobs)} articoli da rigenerare")
+        return
+
+    selection = {
+        'prompt_version': prompt_version, 'outdated': outdated,
+        'since': since.isoformat() if since else None, 'until': until.isoformat() if until else None,
+        'gameweek': gameweek, 'fallback': fallback_only, 'missing': missing, 'all': select_all,
+    }
+    checkpoint_path = checkpoint or os.path.join(current_app.instance_path, 'regenerate_articles.checkpoint.json')
+    os.makedirs(os.path.dirname(os.path.abspath(checkpoint_path)), exist_ok=True)
+    state = Checkpoint(checkpoint_path, selection)
+    if restart:
+        state.clear()
+    elif state.load():
+        click.echo(f"♻️ Ripresa dal checkpoint {checkpoint_path}")
+
+    regenerated, failed = regenerate_articles(
+        current_app._get_current_object(), PerplexityClient(), jobs, state,
+        max_workers=workers or current_app.config['ARTICLE_WORKERS'],
+        log=click.echo
+    )
+    if regenerated:
+        data_version.bump()
+        db.session.commit()
+
+    if failed:
+        click.echo(f"⚠️ {regenerated} rigenerati, {failed} falliti: rilancia lo stesso comando per riprendere")
+    else:
+        state.clear()
+        click.echo(f"🎉 Rigenerazione completata: {regenerated} articoli")
+
+@main.cli.command('rebuild-standings')
+@click.option('--check', is_flag=True, help='Verifica la coerenza senza modificare la tabella')
+def rebuild_standings_command(check):
+    """Ricostruisce (o verifica) la classifica materializzata da Match."""
+    if check:
+        differences = standings_store.check_standings()
+        if not differences:
+            click.echo('✅ Classifica materializzata coerente con le partite')
+            return
+        for (season_id, team_name), field, expected, actual in differences:
+            click.echo(f"❌ stagione {season_id} - {team_name}: {field} atteso {expected}, trovato {actual}")
+        raise SystemExit(1)
+
+    rows = standings_store.rebuild_standings()
+    click.echo(f"📊 Classifica ricostruita: {rows} righe")
+    snapshots = standings_history.rebuild_snapshots()
+    # Le righe di Standing sono nuove: va ricopiato anche il rating Elo
+    elo.rebuild_ratings()
+    data_version.bump()
+    db.session.commit()
+    click.echo(f"🗂️ Classifiche per giornata ricostruite: {snapshots} righe")
+
+@main.cli.command('rebuild-ratings')
+def rebuild_ratings_command():
+    """Ricalcola da zero i rating Elo di tutte le squadre."""
+    start = time.perf_counter()
+    matches = elo.rebuild_ratings()
+    data_version.bump()
+    db.session.commit()
+    click.echo(f"⚡ Rating Elo ricalcolati su {matches} partite in {time.perf_counter() - start:.2f}s")
+
+@main.cli.command('rebuild-rollups')
+def rebuild_rollups_command():
+    """Ricostruisce i totali per giornata usati dalla pagina /stats."""
+    gameweeks = gameweek_rollup.rebuild_rollups()
+    data_version.bump()
+    db.session.commit()
+    click.echo(f"📈 Totali ricostruiti per {gameweeks} giornate")
+
+@main.cli.command('rebuild-form')
+def rebuild_form_command():
+    """Ricalcola la forma recente (ultime partite) di squadre e giocatori."""
+    teams, players = recent_form.rebuild_forms()
+    data_version.bump()
+    db.session.commit()
+    click.echo(f"📋 Forma ricalcolata per {teams} squadre e {players} giocatori")
+
+@main.cli.command('export-site')
+@click.option('--gameweek', type=int, default=None, help='Solo le pagine toccate dalle partite di questa giornata')
+@click.option('--output', type=click.Path(), default=None, help='Cartella di destinazione (default STATIC_EXPORT_DIR)')
+def export_site_command(gameweek, output):
+    """Esporta le pagine pubbliche in HTML statico (con copie .gz) per nginx."""
+    app = current_app._get_current_object()
+    start = time.perf_counter()
+    if gameweek is not None:
+        match_ids = [id for (id,) in db.session.query(Match.id).filter(Match.gameweek == gameweek)]
+        written, failed = static_export.export_matches(app, match_ids, root=output, log=click.echo)
+    else:
+        written, failed = static_export.export_site(app, root=output, log=click.echo)
+    click.echo(f"🗂️ {written} pagine esportate in {output or app.config['STATIC_EXPORT_DIR']} "
+               f"({time.perf_counter() - start:.1f}s), {failed} errori")
+    if failed:
+        raise SystemExit(1)
+
+@main.cli.command('build-assets')
+def build_assets_command():
+    """Genera static/dist (file con hash, varianti dei loghi) e il manifest."""
+    manifest = assets.build_assets(current_app.static_folder, log=click.echo)
+    click.echo(f"📦 {len(manifest['files'])} file con hash, {len(manifest['logos'])} loghi ridimensionati")
+
+@main.cli.command('compress-static')
+def compress_static_command():
+    """Genera le copie .gz dei file statici testuali (CSS, JS, SVG...)."""
+    count = compression.compress_static(current_app.static_folder, log=click.echo)
+    click.echo(f"🗜️ {count} file statici compressi")
+
+@main.cli.command('simulate-season')
+@click.option('--simulations', type=int, default=season_simulator.DEFAULT_SIMULATIONS, show_default=True)
+@click.option('--seed', type=int, default=None)
+def simulate_season_command(simulations, seed):
+    """Simula il resto della stagione e stampa le probabilità (con il tempo impiegato)."""
+    start = time.perf_counter()
+    result = season_simulator.simulate_season(simulations=simulations, seed=seed)
+    elapsed = time.perf_counter() - start
+
+    if result is None:
+        click.echo('⚠️ Nessuna partita giocata: niente da simulare')
+        return
+
+    click.echo(f"🎲 {simulations} stagioni simulate in {elapsed:.2f}s "
+               f"({result['remaining_matches']} partite mancanti, giornata {result['played_gameweeks']}/{result['total_gameweeks']})")
+    click.echo(f"{'squadra':<24} {'titolo':>7} {'top ' + str(result['champions_spots']):>7} {'ultimo':>7} {'pos. media':>10}")
+    ranked = sorted(result['teams'].items(), key=lambda item: item[1]['expected_position'])
+    for name, team in ranked:
+        click.echo(f"{name:<24} {team['title']:>7.1%} {team['champions']:>7.1%} {team['last']:>7.1%} {team['expected_position']:>10.2f}")
+
+# Istanza usata da `flask --app app`, da gunicorn (app:app) e dagli script
+# che fanno `from app import app`
+app = create_app()
 
 # ===== RUN APP =====
 if __name__ == '__main__':
@@ -0,0 +1,103 @@
+# bench_article_generation.py
+"""
+Benchmark offline della fase di generazione articoli contro il server LLM finto.
+
+Esempio:
+    python bench_article_generation.py --matches 20 --concurrency 1,2,4,8 --latency-mean 1.5 --error-rate 0.1
+
+Usa un database SQLite temporaneo: non tocca i dati reali né la rete.
+"""
+import argparse
+import os
+import statistics
+import tempfile
+import time
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description='Benchmark generazione articoli (LLM finto)')
+    parser.add_argument('--matches', type=int, default=20)
+    parser.add_argument('--concurrency', default='1,2,4,8')
+    parser.add_argument('--stream', action='store_true', help='usa la modalità streaming')
+    parser.add_argument('--latency-mean', type=float, default=1.0)
+    parser.add_argument('--latency-sigma', type=float, default=0.5)
+    parser.add_argument('--error-rate', type=float, default=0.0)
+    parser.add_argument('--stall-rate', type=float, default=0.0)
+    parser.add_argument('--timeout', type=float, default=10.0, help='PERPLEXITY_TIMEOUT / stall timeout')
+    parser.add_argument('--retries', type=int, default=2)
+    parser.add_argument('--seed', type=int, default=42)
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+
+    from utils.fake_llm_server import FakeLLMConfig, start_fake_server
+    config = FakeLLMConfig(
+        latency_mean=args.latency_mean,
+        latency_sigma=args.latency_sigma,
+        error_rate=args.error_rate,
+        stall_rate=args.stall_rate,
+        seed=args.seed
+    )
+    server, url = start_fake_server(config=config)
+
+    db_dir = tempfile.mkdtemp(prefix='fantanews-bench-')
+    os.environ.update({
+        'DATABASE_URL': f"sqlite:///{os.path.join(db_dir, 'bench.db')}",
+        'PERPLEXITY_API_KEY': 'fake-key',
+        'PERPLEXITY_BASE_URL': url,
+        'PERPLEXITY_TIMEOUT': str(args.timeout),
+        'PERPLEXITY_STREAM_STALL_TIMEOUT': str(args.timeout),
+        'PERPLEXITY_MAX_RETRIES': str(args.retries),
+        'PERPLEXITY_RETRY_BACKOFF': '0.2',
+    })
+
+    # Import dopo aver impostato l'ambiente: app.py legge la configurazione all'import
+    from app import app
+    from extensions import db
+    from models import Article, Match
+    from utils.article_generator import generate_articles
+    from utils.perplexity_client import PerplexityClient
+
+    with app.app_context():
+        db.create_all()
+        matches = []
+        for i in range(args.matches):
+            match = Match(home_team=f"HOME {i}", away_team=f"AWAY {i}",
+                          home_score=60 + i % 20, away_score=70 - i % 15, gameweek=1)
+            db.session.add(match)
+            matches.append(match)
+        db.session.commit()
+
+        jobs = [(m, {'home_team': m.home_team, 'away_team': m.away_team,
+                     'home_score': 1, 'away_score': 0, 'gameweek': 1,
+                     'home_total': m.home_score, 'away_total': m.away_score}) for m in matches]
+
+        client = PerplexityClient()
+
+        print(f"\n📡 Fake LLM: {url} | stream={args.stream} | errori={args.error_rate:.0%} | stall={args.stall_rate:.0%}")
+        print(f"{'workers':>8} {'tot (s)':>9} {'art/s':>7} {'p50 (s)':>8} {'p95 (s)':>8} {'fallback':>9}")
+
+        for workers in [int(w) for w in args.concurrency.split(',')]:
+            Article.query.delete()
+            db.session.commit()
+
+            start = time.perf_counter()
+            generate_articles(app, client, jobs, max_workers=workers, stream=args.stream)
+            elapsed = time.perf_counter() - start
+
+            fallbacks = Article.query.filter(Article.content.contains('Articolo generato automaticamente')).count()
+            ordered = sorted(ms / 1000 for (ms,) in db.session.query(Article.generation_ms)
+                             .filter(Article.generation_ms.isnot(None)))
+            p95 = ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))] if ordered else 0.0
+
+            print(f"{workers:>8} {elapsed:>9.2f} {len(jobs) / elapsed:>7.2f} "
+                  f"{statistics.median(ordered) if ordered else 0.0:>8.2f} {p95:>8.2f} {fallbacks:>9}")
+
+    server.shutdown()
+    print(f"\nRichieste servite dal fake LLM: {config.requests} (errori simulati: {config.errors})")
+
+
+if __name__ == '__main__':
+    main()
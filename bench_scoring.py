@@ -0,0 +1,91 @@
+# bench_scoring.py
+"""
+Benchmark del kernel di punteggio: versione scalare (partita per partita)
+contro quella vettoriale NumPy di utils/scoring, con verifica di parità.
+
+Esempio:
+    python bench_scoring.py --matches 200000 --teams 20
+
+Non usa il database: i punteggi sono generati in memoria.
+"""
+import argparse
+import statistics
+import time
+import numpy as np
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description='Benchmark scoring scalare vs vettoriale')
+    parser.add_argument('--matches', type=int, default=100000)
+    parser.add_argument('--teams', type=int, default=20)
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--seed', type=int, default=42)
+    return parser.parse_args()
+
+
+def timed(fn, repeat):
+    samples = []
+    result = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn()
+        samples.append(time.perf_counter() - start)
+    return result, statistics.median(samples)
+
+
+def scalar_table(team_names, home_idx, away_idx, home_scores, away_scores):
+    """Classifica calcolata partita per partita con le funzioni scalari."""
+    from utils.scoring import WIN, LOSS, DRAW, outcome, outcome_points, points_to_goals
+
+    fields = ['points', 'matches_played', 'wins', 'draws', 'losses', 'goals_for', 'goals_against']
+    table = {name: {field: 0 for field in fields} for name in team_names}
+    for h, a, hs, as_ in zip(home_idx, away_idx, home_scores, away_scores):
+        home, away = table[team_names[h]], table[team_names[a]]
+        hg, ag = points_to_goals(hs), points_to_goals(as_)
+        result = outcome(hg, ag)
+        for row, gf, ga, res in ((home, hg, ag, result), (away, ag, hg, -result)):
+            row['matches_played'] += 1
+            row['goals_for'] += gf
+            row['goals_against'] += ga
+            row['points'] += outcome_points(res)
+            row['wins'] += res == WIN
+            row['draws'] += res == DRAW
+            row['losses'] += res == LOSS
+    for row in table.values():
+        row['goal_difference'] = row['goals_for'] - row['goals_against']
+    return table
+
+
+def main():
+    args = parse_args()
+    from utils.scoring import aggregate_table, goals_array, points_to_goals, score_matches
+
+    rng = np.random.default_rng(args.seed)
+    team_names = [f"TEAM {i:02d}" for i in range(args.teams)]
+    home_idx = rng.integers(0, args.teams, args.matches)
+    away_idx = (home_idx + rng.integers(1, args.teams, args.matches)) % args.teams
+    # Punteggi a multipli di 0,5 attorno alle soglie dei gol
+    home_scores = np.round(rng.normal(70, 7, args.matches) * 2) / 2
+    away_scores = np.round(rng.normal(70, 7, args.matches) * 2) / 2
+    home_list, away_list = home_scores.tolist(), away_scores.tolist()
+
+    print(f"\n🧮 {args.matches} partite | {args.teams} squadre")
+    print(f"{'operazione':<22} {'scalare (ms)':>13} {'numpy (ms)':>11} {'speedup':>8}")
+
+    scalar_goals, t_scalar = timed(lambda: [points_to_goals(p) for p in home_list], args.repeat)
+    vector_goals, t_vector = timed(lambda: goals_array(home_scores), args.repeat)
+    print(f"{'punti → gol':<22} {t_scalar * 1000:>13.1f} {t_vector * 1000:>11.1f} {t_scalar / t_vector:>7.1f}x")
+    assert scalar_goals == vector_goals.tolist(), 'conversione gol diversa'
+
+    scalar, t_scalar = timed(lambda: scalar_table(team_names, home_idx.tolist(), away_idx.tolist(),
+                                                  home_list, away_list), args.repeat)
+    vector, t_vector = timed(lambda: aggregate_table(team_names, home_idx, away_idx,
+                                                     score_matches(home_scores, away_scores)), args.repeat)
+    print(f"{'classifica completa':<22} {t_scalar * 1000:>13.1f} {t_vector * 1000:>11.1f} {t_scalar / t_vector:>7.1f}x")
+    assert scalar == vector, 'classifica diversa'
+
+    print('✅ Parità verificata tra versione scalare e vettoriale')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,105 @@
+# bench_startup.py
+"""
+Benchmark di avvio dei worker: tempo di import dell'applicazione e memoria
+residente (RSS) di un processo appena avviato, come un worker gunicorn
+subito dopo il caricamento dell'app.
+
+Ogni misura gira in un processo Python nuovo, così la cache dei moduli
+non falsa i tempi. Oltre a tempo e RSS riporta quali dipendenze pesanti
+(pandas, requests, ...) risultano già caricate: quelle usate solo
+dall'ingestione non devono comparire.
+
+Esempio:
+    DATABASE_URL=sqlite:////tmp/bench.db python bench_startup.py --runs 5
+    python bench_startup.py --max-import-seconds 1.5 --max-rss-mb 150
+
+Con le soglie impostate esce con codice 1 se la mediana le supera.
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+HEAVY_MODULES = ['pandas', 'requests', 'numpy', 'PIL', 'alembic', 'flask_migrate']
+
+# Eseguito nel processo figlio: importa il modulo e stampa una riga JSON
+CHILD = r'''
+import json, sys, time
+start = time.perf_counter()
+__import__({module!r})
+elapsed = time.perf_counter() - start
+
+def rss_mb():
+    try:
+        with open('/proc/self/status') as f:
+            for line in f:
+                if line.startswith('VmRSS:'):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    import resource
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss è in KB su Linux e in byte su macOS
+    return peak / (1024 * 1024) if sys.platform == 'darwin' else peak / 1024
+
+print(json.dumps({{
+    'seconds': elapsed,
+    'rss_mb': rss_mb(),
+    'loaded': [m for m in {heavy!r} if m in sys.modules],
+}}))
+'''
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description='Benchmark tempo di import e RSS dei worker')
+    parser.add_argument('--module', default='app', help="Modulo da importare (default: app)")
+    parser.add_argument('--runs', type=int, default=5)
+    parser.add_argument('--max-import-seconds', type=float, default=None)
+    parser.add_argument('--max-rss-mb', type=float, default=None)
+    return parser.parse_args()
+
+
+def measure(module):
+    code = CHILD.format(module=module, heavy=HEAVY_MODULES)
+    result = subprocess.run(
+        [sys.executable, '-c', code],
+        cwd=os.path.dirname(os.path.abspath(__file__)),
+        capture_output=True, text=True,
+    )
+    if result.returncode != 0:
+        raise RuntimeError(f"Import di {module} fallito:\n{result.stderr}")
+    # L'app può stampare log all'import: il JSON è l'ultima riga
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+def main():
+    args = parse_args()
+
+    samples = [measure(args.module) for _ in range(args.runs)]
+    seconds = statistics.median(s['seconds'] for s in samples)
+    rss = statistics.median(s['rss_mb'] for s in samples)
+    loaded = samples[-1]['loaded']
+
+    print(f"📦 Modulo: {args.module} ({args.runs} processi)")
+    print(f"⏱️  Import:  mediana {seconds * 1000:.0f} ms "
+          f"(min {min(s['seconds'] for s in samples) * 1000:.0f} ms, "
+          f"max {max(s['seconds'] for s in samples) * 1000:.0f} ms)")
+    print(f"🧠 RSS:     mediana {rss:.1f} MB per worker")
+    for module in HEAVY_MODULES:
+        print(f"   {'⚠️ caricato ' if module in loaded else '✅ assente  '} {module}")
+
+    failed = False
+    if args.max_import_seconds is not None and seconds > args.max_import_seconds:
+        print(f"❌ Import oltre la soglia di {args.max_import_seconds:.2f} s")
+        failed = True
+    if args.max_rss_mb is not None and rss > args.max_rss_mb:
+        print(f"❌ RSS oltre la soglia di {args.max_rss_mb:.0f} MB")
+        failed = True
+    if failed:
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
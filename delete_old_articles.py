@@ -11,4 +11,4 @@ with app.app_context():
     db.session.commit()
     
     print(f"✅ Cancellati {articles_count} articoli obsoleti")
-    print("💡 Ora ricarica i tabellini per generare nuovi articoli con Perplexity")
+    print("💡 Ora lancia 'flask --app app regenerate-articles --missing' per rigenerarli dai dati salvati")
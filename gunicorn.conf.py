@@ -0,0 +1,50 @@
+# gunicorn.conf.py
+"""
+Configurazione gunicorn per la produzione.
+
+Il master importa l'app una volta sola (preload_app) e i worker nascono
+con fork, condividendo in copy-on-write codice, template compilati e
+moduli già caricati: avvio dei worker più rapido e meno RSS per worker.
+Lo schema del database non viene toccato all'avvio: va creato/aggiornato
+prima con `flask --app app init-db`.
+
+Limite: il log in tempo reale dell'admin (coda di AdminLogger, client SSE
+di /admin/logs/stream e thread di ingestione) vive dentro un solo processo.
+Con più worker lo stream e il POST /admin/process finiscono di solito su
+worker diversi e l'admin non vede nessun log: per questo il default è un
+solo worker e la concorrenza si aumenta con GUNICORN_THREADS. Alzare
+WEB_CONCURRENCY solo se il pannello admin è servito da un'istanza a parte.
+
+Variabili d'ambiente:
+    GUNICORN_BIND=0.0.0.0:8000
+    WEB_CONCURRENCY=1               numero di worker (vedi il limite sopra)
+    GUNICORN_THREADS=8              thread per worker
+    GUNICORN_TIMEOUT=60
+"""
+import gc
+import os
+
+bind = os.getenv('GUNICORN_BIND', '0.0.0.0:8000')
+workers = int(os.getenv('WEB_CONCURRENCY', 1))
+threads = int(os.getenv('GUNICORN_THREADS', 8))
+timeout = int(os.getenv('GUNICORN_TIMEOUT', 60))
+graceful_timeout = 30
+preload_app = True
+wsgi_app = 'app:app'
+
+
+def when_ready(server):
+    # Gli oggetti creati dal preload non vengono più visitati dal GC: senza
+    # questo ogni raccolta nei worker li tocca e ne copia le pagine di memoria
+    gc.freeze()
+    server.log.info('🚀 App precaricata, %s oggetti congelati per il copy-on-write', gc.get_freeze_count())
+
+
+def post_fork(server, worker):
+    # Ogni worker apre le proprie connessioni: quelle eventualmente aperte dal
+    # master non vanno condivise tra processi (close=False le lascia al master)
+    from app import app
+    from extensions import db
+
+    with app.app_context():
+        db.engine.dispose(close=False)
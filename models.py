@@ -1,6 +1,8 @@
 from flask_sqlalchemy import SQLAlchemy
 from datetime import datetime
-from utils.fantacalcio_utils import points_to_goals
+from sqlalchemy import event, inspect
+from utils.scoring import get_rules, points_to_goals
+from utils.article_summary import summarize_html
 from extensions import db  # Importa l'istanza db da extensions.py
 
 class Season(db.Model):
@@ -60,11 +62,11 @@ class Match(db.Model):
     # Proprietà calcolate per i gol
     @property
     def home_goals(self):
-        return points_to_goals(self.home_score)
+        return points_to_goals(self.home_score, get_rules(self.season_id))
     
     @property
     def away_goals(self):
-        return points_to_goals(self.away_score)
+        return points_to_goals(self.away_score, get_rules(self.season_id))
     
     @property
     def result_description(self):
@@ -80,6 +82,131 @@ class Match(db.Model):
         """Partita con molti gol (6+ gol totali)"""
         return (self.home_goals + self.away_goals) >= 6
 
+    __table_args__ = (
+        db.Index('ix_match_season_gameweek', 'season_id', 'gameweek'),
+        # Paginazione a cursore della lista partite (utils/keyset)
+        db.Index('ix_match_gameweek_id', 'gameweek', 'id'),
+    )
+
+# Indice su espressione per le "partite più spettacolari" (ORDER BY punteggio totale)
+db.Index('ix_match_total_score', Match.home_score + Match.away_score)
+
+class Standing(db.Model):
+    """Classifica materializzata: una riga per squadra per stagione, aggiornata a ogni partita salvata."""
+    id = db.Column(db.Integer, primary_key=True)
+    season_id = db.Column(db.Integer, db.ForeignKey('season.id'), nullable=True)
+    team_name = db.Column(db.String(100), nullable=False)
+    points = db.Column(db.Integer, default=0, nullable=False)
+    matches_played = db.Column(db.Integer, default=0, nullable=False)
+    wins = db.Column(db.Integer, default=0, nullable=False)
+    draws = db.Column(db.Integer, default=0, nullable=False)
+    losses = db.Column(db.Integer, default=0, nullable=False)
+    goals_for = db.Column(db.Integer, default=0, nullable=False)
+    goals_against = db.Column(db.Integer, default=0, nullable=False)
+    goal_difference = db.Column(db.Integer, default=0, nullable=False)
+    points_for = db.Column(db.Float, default=0.0, nullable=False)
+    points_against = db.Column(db.Float, default=0.0, nullable=False)
+    position = db.Column(db.Integer, nullable=True)  # Posizione con classifica avulsa
+    elo = db.Column(db.Float, nullable=True)  # Rating Elo attuale (utils/elo.py)
+
+    __table_args__ = (
+        db.UniqueConstraint('season_id', 'team_name', name='uq_standing_season_team'),
+        db.Index('ix_standing_season_rank', 'season_id', 'points', 'goal_difference', 'goals_for'),
+    )
+
+class HeadToHead(db.Model):
+    """Scontri diretti: totali di team_name contro opponent_name nella stagione."""
+    id = db.Column(db.Integer, primary_key=True)
+    season_id = db.Column(db.Integer, db.ForeignKey('season.id'), nullable=True)
+    team_name = db.Column(db.String(100), nullable=False)
+    opponent_name = db.Column(db.String(100), nullable=False)
+    matches_played = db.Column(db.Integer, default=0, nullable=False)
+    points = db.Column(db.Integer, default=0, nullable=False)
+    goals_for = db.Column(db.Integer, default=0, nullable=False)
+    goals_against = db.Column(db.Integer, default=0, nullable=False)
+    points_for = db.Column(db.Float, default=0.0, nullable=False)
+    points_against = db.Column(db.Float, default=0.0, nullable=False)
+
+    __table_args__ = (
+        db.UniqueConstraint('season_id', 'team_name', 'opponent_name', name='uq_h2h_season_team_opponent'),
+    )
+
+class TeamRating(db.Model):
+    """Rating Elo di una squadra al termine di ogni giornata giocata."""
+    id = db.Column(db.Integer, primary_key=True)
+    season_id = db.Column(db.Integer, db.ForeignKey('season.id'), nullable=True)
+    gameweek = db.Column(db.Integer, nullable=False)
+    team_name = db.Column(db.String(100), nullable=False)
+    rating = db.Column(db.Float, nullable=False)
+    change = db.Column(db.Float, default=0.0, nullable=False)
+
+    __table_args__ = (
+        db.UniqueConstraint('season_id', 'team_name', 'gameweek', name='uq_rating_season_team_gw'),
+    )
+
+class StandingSnapshot(db.Model):
+    """Classifica cumulativa di ogni squadra al termine di ogni giornata."""
+    id = db.Column(db.Integer, primary_key=True)
+    season_id = db.Column(db.Integer, db.ForeignKey('season.id'), nullable=True)
+    gameweek = db.Column(db.Integer, nullable=False)
+    team_name = db.Column(db.String(100), nullable=False)
+    position = db.Column(db.Integer, nullable=False)
+    points = db.Column(db.Integer, default=0, nullable=False)
+    matches_played = db.Column(db.Integer, default=0, nullable=False)
+    wins = db.Column(db.Integer, default=0, nullable=False)
+    draws = db.Column(db.Integer, default=0, nullable=False)
+    losses = db.Column(db.Integer, default=0, nullable=False)
+    goals_for = db.Column(db.Integer, default=0, nullable=False)
+    goals_against = db.Column(db.Integer, default=0, nullable=False)
+    goal_difference = db.Column(db.Integer, default=0, nullable=False)
+    points_for = db.Column(db.Float, default=0.0, nullable=False)
+    points_against = db.Column(db.Float, default=0.0, nullable=False)
+
+    __table_args__ = (
+        db.UniqueConstraint('season_id', 'gameweek', 'team_name', name='uq_snapshot_season_gw_team'),
+        db.Index('ix_snapshot_season_gw_position', 'season_id', 'gameweek', 'position'),
+        db.Index('ix_snapshot_season_team_gw', 'season_id', 'team_name', 'gameweek'),
+    )
+
+class DataVersion(db.Model):
+    """Contatore globale dei dati: incrementato a ogni ingestione, invalida le cache."""
+    id = db.Column(db.Integer, primary_key=True)
+    version = db.Column(db.Integer, default=0, nullable=False)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, nullable=False)
+
+class GameweekRollup(db.Model):
+    """Totali di ogni giornata per la pagina /stats, aggiornati in ingestione."""
+    id = db.Column(db.Integer, primary_key=True)
+    season_id = db.Column(db.Integer, db.ForeignKey('season.id'), nullable=True)
+    gameweek = db.Column(db.Integer, nullable=False)
+    matches = db.Column(db.Integer, default=0, nullable=False)
+    points_sum = db.Column(db.Float, default=0.0, nullable=False)
+    goals_sum = db.Column(db.Integer, default=0, nullable=False)
+    max_points = db.Column(db.Float, nullable=True)
+    max_match_id = db.Column(db.Integer, db.ForeignKey('match.id', ondelete='SET NULL'), nullable=True)
+
+    max_match = db.relationship('Match', lazy='joined')
+
+    __table_args__ = (
+        db.UniqueConstraint('season_id', 'gameweek', name='uq_rollup_season_gameweek'),
+    )
+
+class TeamForm(db.Model):
+    """Forma recente di una squadra (ultime FORM_WINDOW partite), aggiornata in ingestione."""
+    id = db.Column(db.Integer, primary_key=True)
+    season_id = db.Column(db.Integer, db.ForeignKey('season.id'), nullable=True)
+    team_name = db.Column(db.String(100), nullable=False)
+    matches = db.Column(db.Integer, default=0, nullable=False)
+    results = db.Column(db.String(20), default='', nullable=False)  # es. "VNPVV", dalla più vecchia
+    avg_points = db.Column(db.Float, default=0.0, nullable=False)  # Media punteggio fantacalcio
+    goals_for = db.Column(db.Integer, default=0, nullable=False)
+    goals_against = db.Column(db.Integer, default=0, nullable=False)
+    trend = db.Column(db.Float, default=0.0, nullable=False)  # Media recente meno media stagionale
+
+    __table_args__ = (
+        db.UniqueConstraint('season_id', 'team_name', name='uq_form_season_team'),
+    )
+
 class Article(db.Model):
     id = db.Column(db.Integer, primary_key=True)
     match_id = db.Column(db.Integer, db.ForeignKey('match.id'))
@@ -87,6 +214,35 @@ class Article(db.Model):
     content = db.Column(db.Text, nullable=False)
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
 
+    # Metriche di generazione (prompt e latenza della risposta LLM)
+    prompt_version = db.Column(db.Integer, nullable=True)
+    prompt_tokens = db.Column(db.Integer, nullable=True)
+    prompt_chars = db.Column(db.Integer, nullable=True)
+    generation_ms = db.Column(db.Integer, nullable=True)
+
+    # Calcolati alla scrittura: le liste non devono caricare tutto il contenuto
+    excerpt = db.Column(db.String(255), nullable=True)
+    text_length = db.Column(db.Integer, nullable=True)
+    reading_time = db.Column(db.Integer, nullable=True)  # minuti
+
+    # Paginazione a cursore della lista articoli (utils/keyset)
+    __table_args__ = (
+        db.Index('ix_article_created_at_id', 'created_at', 'id'),
+    )
+
+    def refresh_summary(self):
+        """Ricalcola estratto, lunghezza e tempo di lettura dal contenuto."""
+        self.excerpt, self.text_length, self.reading_time = summarize_html(self.content)
+
+@event.listens_for(Article, 'before_insert')
+def _article_before_insert(mapper, connection, article):
+    article.refresh_summary()
+
+@event.listens_for(Article, 'before_update')
+def _article_before_update(mapper, connection, article):
+    if inspect(article).attrs.content.history.has_changes():
+        article.refresh_summary()
+
 class Player(db.Model):
     id = db.Column(db.Integer, primary_key=True)
     name = db.Column(db.String(100), nullable=False)
@@ -97,6 +253,13 @@ class Player(db.Model):
     is_goalkeeper = db.Column(db.Boolean, default=False)
     role = db.Column(db.String(50), default='Unknown')
 
+    # Classifiche marcatori/assist/portieri della pagina /stats
+    __table_args__ = (
+        db.Index('ix_player_goals', 'goals'),
+        db.Index('ix_player_assists', 'assists'),
+        db.Index('ix_player_goalkeeper_clean_sheets', 'is_goalkeeper', 'clean_sheets'),
+    )
+
 class PlayerStat(db.Model):
     id = db.Column(db.Integer, primary_key=True)
     player_id = db.Column(db.Integer, db.ForeignKey('player.id', ondelete='CASCADE'))
@@ -111,6 +274,23 @@ class PlayerStat(db.Model):
     # Relazioni con i modelli Player e Match
     player = db.relationship('Player', backref=db.backref('stats', lazy=True))
     match = db.relationship('Match', backref=db.backref('player_stats', lazy=True))
+
+    # Top/flop fantavoto della pagina /stats
+    __table_args__ = (
+        db.Index('ix_player_stat_fanta_vote', 'fanta_vote'),
+    )
     
     def __repr__(self):
         return f"<PlayerStat {self.player.name} - Match: {self.match.gameweek} - Fantavoto: {self.fantavote}>"
+
+class PlayerForm(db.Model):
+    """Forma recente di un giocatore (ultime FORM_WINDOW presenze con voto)."""
+    id = db.Column(db.Integer, primary_key=True)
+    player_id = db.Column(db.Integer, db.ForeignKey('player.id', ondelete='CASCADE'), nullable=False, unique=True)
+    matches = db.Column(db.Integer, default=0, nullable=False)
+    avg_vote = db.Column(db.Float, default=0.0, nullable=False)
+    avg_fanta_vote = db.Column(db.Float, default=0.0, nullable=False)
+    goals = db.Column(db.Integer, default=0, nullable=False)
+    assists = db.Column(db.Integer, default=0, nullable=False)
+    fanta_votes = db.Column(db.String(100), default='', nullable=False)  # es. "6.5;7;5.5", dalla più vecchia
+    trend = db.Column(db.Float, default=0.0, nullable=False)  # Fantamedia recente meno fantamedia complessiva
@@ -0,0 +1,148 @@
+# utils/article_generator.py
+import time
+from concurrent.futures import ThreadPoolExecutor
+from extensions import db
+from models import Article, Match
+
+# Contenuto mostrato mentre l'articolo è ancora in generazione
+PLACEHOLDER_CONTENT = "<p><em>Articolo in elaborazione...</em></p>"
+
+
+class ArticleGenerationError(Exception):
+    """Il provider ha fallito e l'articolo esistente è stato lasciato com'era."""
+
+
+def generate_match_article(client, match, match_data, stream=False, log=None, progress_interval=1.0, article=None,
+                           save_fallback=True):
+    """
+    Genera l'articolo di una partita e lo salva nella tabella Article.
+    Se viene passato un article esistente, la riga viene riscritta invece
+    di crearne una nuova (rigenerazione).
+
+    In modalità stream la riga Article viene creata subito e il contenuto
+    parziale viene salvato (e segnalato via log) al massimo ogni
+    progress_interval secondi, così l'admin vede l'avanzamento dopo il primo
+    frammento invece di attendere l'intera risposta.
+
+    Se in stream mode qualcosa fallisce dopo aver creato la riga, l'eccezione
+    porta article_id con l'id della riga nuova.
+
+    Se il client restituisce il testo di fallback (errore API) un articolo
+    esistente non viene sovrascritto: contenuto e metriche restano quelli
+    precedenti e viene sollevata ArticleGenerationError. Per un articolo
+    nuovo il fallback viene salvato, a meno di save_fallback=False.
+    """
+    log = log or (lambda level, message, extra=None: None)
+    title = f"{match.home_team} vs {match.away_team}: Cronaca e Analisi"
+
+    if not stream:
+        result = client.generate_article_with_metrics(match_data)
+        if result.get('is_fallback') and (article is not None or not save_fallback):
+            raise ArticleGenerationError(result.get('error') or 'fallback del provider')
+        if article is None:
+            article = Article(match_id=match.id)
+            db.session.add(article)
+        article.title = title
+        article.content = result['content']
+        _apply_metrics(article, result)
+        return article
+
+    # Contenuto precedente, da ripristinare se la rigenerazione fallisce
+    previous = None if article is None else (article.title, article.content)
+    if article is None:
+        article = Article(match_id=match.id, content=PLACEHOLDER_CONTENT)
+        db.session.add(article)
+    article.title = title
+    db.session.commit()
+
+    state = {'last_flush': 0.0, 'first': True}
+
+    def on_delta(partial):
+        now = time.monotonic()
+        if not state['first'] and now - state['last_flush'] < progress_interval:
+            return
+
+        article.content = partial
+        db.session.commit()
+
+        if state['first']:
+            log('info', f'✍️ Primi contenuti ricevuti per {match.home_team} vs {match.away_team}',
+                {'type': 'article_progress', 'match_id': match.id, 'chars': len(partial)})
+        else:
+            log('info', f'✍️ {match.home_team} vs {match.away_team}: {len(partial)} caratteri ricevuti',
+                {'type': 'article_progress', 'match_id': match.id, 'chars': len(partial)})
+
+        state['first'] = False
+        state['last_flush'] = now
+
+    # Id della riga creata qui (None in rigenerazione), da riusare se qualcosa fallisce
+    article_id = article.id if previous is None else None
+    try:
+        result = client.generate_article_with_metrics(match_data, stream=True, on_delta=on_delta)
+        if result.get('is_fallback') and (previous is not None or not save_fallback):
+            # I frammenti parziali sono già stati salvati: si torna al testo precedente
+            if previous is None:
+                db.session.delete(article)
+            else:
+                article.title, article.content = previous
+            db.session.commit()
+            raise ArticleGenerationError(result.get('error') or 'fallback del provider')
+        article.content = result['content']
+        _apply_metrics(article, result)
+        db.session.commit()
+        return article
+    except Exception as e:
+        # La riga nuova è già salvata (segnaposto o testo parziale): chi chiama
+        # la riusa per il fallback invece di aggiungere un secondo articolo
+        e.article_id = article_id
+        raise
+
+
+def _apply_metrics(article, result):
+    """Copia sull'articolo versione/dimensione del prompt e latenza della risposta."""
+    article.prompt_version = result.get('prompt_version')
+    article.prompt_tokens = result.get('prompt_tokens')
+    article.prompt_chars = result.get('prompt_chars')
+    article.generation_ms = result.get('latency_ms')
+
+
+def generate_articles(app, client, jobs, max_workers=1, stream=False, log=None):
+    """
+    Genera gli articoli per una lista di (match, match_data) con al massimo
+    max_workers richieste LLM in parallelo.
+
+    Ogni worker usa un proprio app context (e quindi una propria sessione DB):
+    ai thread passiamo solo gli id delle partite, non gli oggetti della
+    sessione chiamante. Restituisce il numero di articoli creati.
+    """
+    log = log or (lambda level, message, extra=None: None)
+    jobs = [(match.id, match_data) for match, match_data in jobs]
+
+    def run(job):
+        match_id, match_data = job
+        with app.app_context():
+            match = db.session.get(Match, match_id)
+            try:
+                generate_match_article(client, match, match_data, stream=stream, log=log)
+                db.session.commit()
+                log('success', f'✅ Articolo generato per {match.home_team} vs {match.away_team}')
+            except Exception as e:
+                db.session.rollback()
+                log('warning', f'⚠️ Errore generazione articolo per {match.home_team} vs {match.away_team}: {str(e)}')
+
+                # Fallback article: in streaming la riga esiste già, si sovrascrive quella
+                article_id = getattr(e, 'article_id', None)
+                fallback = db.session.get(Article, article_id) if article_id else None
+                if fallback is None:
+                    fallback = Article(match_id=match.id)
+                    db.session.add(fallback)
+                fallback.title = f"{match.home_team} vs {match.away_team}: Resoconto"
+                fallback.content = f"<p>Partita conclusa {match.home_score:.1f} - {match.away_score:.1f}.</p>"
+                db.session.commit()
+            return 1
+
+    if max_workers <= 1:
+        return sum(run(job) for job in jobs)
+
+    with ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='article') as executor:
+        return sum(executor.map(run, jobs))
@@ -0,0 +1,32 @@
+# utils/article_summary.py
+import html
+import math
+import re
+
+EXCERPT_LENGTH = 200
+WORDS_PER_MINUTE = 200
+
+_TAG_RE = re.compile(r'<[^>]+>')
+_SPACE_RE = re.compile(r'\s+')
+
+
+def html_to_text(content):
+    """Converte l'HTML di un articolo in testo semplice su una riga."""
+    text = _TAG_RE.sub(' ', content or '')
+    return _SPACE_RE.sub(' ', html.unescape(text)).strip()
+
+
+def summarize_html(content, excerpt_length=EXCERPT_LENGTH):
+    """
+    Restituisce (estratto, lunghezza testo, minuti di lettura) per un
+    contenuto HTML. L'estratto è tagliato sull'ultima parola intera.
+    """
+    text = html_to_text(content)
+
+    excerpt = text
+    if len(text) > excerpt_length:
+        excerpt = text[:excerpt_length].rsplit(' ', 1)[0].rstrip(' ,.;:') + '...'
+
+    words = len(text.split())
+    reading_time = max(1, math.ceil(words / WORDS_PER_MINUTE)) if words else 0
+    return excerpt, len(text), reading_time
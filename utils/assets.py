@@ -0,0 +1,164 @@
+# utils/assets.py
+"""
+Pipeline dei file statici: nomi con hash del contenuto e varianti dei loghi.
+
+'flask build-assets' copia CSS, JS e immagini in static/dist/ con l'hash
+del contenuto nel nome (custom.3f9a1c2b7d.css) e scrive il manifest
+static/dist/manifest.json. I file in dist/ non cambiano mai a parità di
+nome, quindi vengono serviti con cache "immutable" di un anno.
+
+Per ogni logo in static/images/logos/ vengono generate anche versioni
+ridotte PNG e WebP (LOGO_SIZES, a doppia densità rispetto alla misura
+nel CSS). Serve Pillow (pip install Pillow): se manca, i loghi vengono
+solo copiati con l'hash e le pagine usano l'originale.
+
+Nei template:
+    {{ asset_url('css/custom.css') }}
+    {{ logo(team.logo_url, 'sm', alt=team.name, class_='team-logo-sm') }}
+"""
+import hashlib
+import json
+import os
+from flask import request, url_for
+from markupsafe import Markup, escape
+
+DIST_DIR = 'dist'
+MANIFEST_NAME = 'manifest.json'
+ASSET_DIRS = ('css', 'js', 'images')
+ASSET_EXTENSIONS = ('.css', '.js', '.png', '.jpg', '.jpeg', '.gif', '.svg', '.webp', '.ico')
+LOGO_DIR = 'images/logos'
+
+# Lato in pixel delle varianti (2x di .team-logo-sm 28px, .team-logo-lg 64px, .team-logo 92px)
+LOGO_SIZES = {'sm': 56, 'lg': 128, 'card': 184}
+
+IMMUTABLE_CACHE = 'public, max-age=31536000, immutable'
+
+_manifest = {'files': {}, 'logos': {}}
+
+
+def _digest(data):
+    return hashlib.sha256(data).hexdigest()[:10]
+
+
+def _write_hashed(static_folder, logical_path, data, suffix=''):
+    """Scrive data in dist/ con l'hash nel nome. Restituisce il percorso relativo a static/."""
+    base, ext = os.path.splitext(logical_path)
+    relative = f"{DIST_DIR}/{base}{suffix}.{_digest(data)}{ext}"
+    target = os.path.join(static_folder, *relative.split('/'))
+    if not os.path.exists(target):
+        os.makedirs(os.path.dirname(target), exist_ok=True)
+        tmp_path = f"{target}.tmp"
+        with open(tmp_path, 'wb') as f:
+            f.write(data)
+        os.replace(tmp_path, target)
+    return relative
+
+
+def _logo_variants(static_folder, logical_path, data):
+    """Varianti PNG/WebP ridotte di un logo, o {} se Pillow non è installato."""
+    try:
+        from io import BytesIO
+        from PIL import Image
+    except ImportError:
+        return {}
+
+    variants = {}
+    with Image.open(BytesIO(data)) as image:
+        image = image.convert('RGBA')
+        base, _ = os.path.splitext(logical_path)
+        for name, size in LOGO_SIZES.items():
+            resized = image.copy()
+            resized.thumbnail((size, size), Image.LANCZOS)
+            variant = {}
+            for fmt, ext, options in (('PNG', '.png', {'optimize': True}),
+                                      ('WEBP', '.webp', {'quality': 85, 'method': 6})):
+                buffer = BytesIO()
+                resized.save(buffer, fmt, **options)
+                variant[ext[1:]] = _write_hashed(static_folder, f"{base}{ext}", buffer.getvalue(), suffix=f"-{size}")
+            variants[name] = variant
+    return variants
+
+
+def build_assets(static_folder, log=print):
+    """Genera dist/ e il manifest. Restituisce il manifest."""
+    files, logos = {}, {}
+    pillow_missing = False
+
+    for directory in ASSET_DIRS:
+        for root, _, names in os.walk(os.path.join(static_folder, directory)):
+            for name in sorted(names):
+                if not name.lower().endswith(ASSET_EXTENSIONS):
+                    continue
+                path = os.path.join(root, name)
+                logical_path = os.path.relpath(path, static_folder).replace(os.sep, '/')
+                with open(path, 'rb') as f:
+                    data = f.read()
+                files[logical_path] = _write_hashed(static_folder, logical_path, data)
+
+                if logical_path.startswith(LOGO_DIR + '/') and not name.lower().endswith('.svg'):
+                    variants = _logo_variants(static_folder, logical_path, data)
+                    if variants:
+                        logos[logical_path] = variants
+                        log(f"🖼️ {logical_path}: {', '.join(f'{k} {LOGO_SIZES[k]}px' for k in variants)}")
+                    else:
+                        pillow_missing = True
+
+    if pillow_missing:
+        log("⚠️ Pillow non installato: varianti ridotte dei loghi non generate (pip install Pillow)")
+
+    manifest = {'files': files, 'logos': logos}
+    manifest_path = os.path.join(static_folder, DIST_DIR, MANIFEST_NAME)
+    os.makedirs(os.path.dirname(manifest_path), exist_ok=True)
+    with open(f"{manifest_path}.tmp", 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, indent=2, sort_keys=True)
+    os.replace(f"{manifest_path}.tmp", manifest_path)
+    load_manifest(static_folder)
+    return manifest
+
+
+def load_manifest(static_folder):
+    """(Ri)carica il manifest; senza build i template usano i file originali."""
+    path = os.path.join(static_folder, DIST_DIR, MANIFEST_NAME)
+    data = {}
+    if os.path.exists(path):
+        with open(path, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+    _manifest['files'] = data.get('files', {})
+    _manifest['logos'] = data.get('logos', {})
+
+
+def asset_url(path):
+    """URL del file statico, con hash se presente nel manifest."""
+    return url_for('static', filename=_manifest['files'].get(path, path))
+
+
+def logo(path, size='sm', alt='', class_='', loading='lazy'):
+    """<picture> con la variante WebP/PNG del logo più adatta alla misura richiesta."""
+    if not path:
+        return Markup('')
+    attributes = f'alt="{escape(alt)}" class="{escape(class_)}" loading="{escape(loading)}"'
+    variant = _manifest['logos'].get(path, {}).get(size)
+    if not variant:
+        return Markup(f'<img src="{escape(asset_url(path))}" {attributes}>')
+    return Markup(
+        f'<picture style="display: contents">'
+        f'<source type="image/webp" srcset="{escape(url_for("static", filename=variant["webp"]))}">'
+        f'<img src="{escape(url_for("static", filename=variant["png"]))}" {attributes}>'
+        f'</picture>'
+    )
+
+
+def _immutable_cache(response):
+    if request.endpoint == 'static' and (request.view_args or {}).get('filename', '').startswith(DIST_DIR + '/'):
+        if response.status_code in (200, 304):
+            response.headers['Cache-Control'] = IMMUTABLE_CACHE
+    return response
+
+
+def init_app(app):
+    """Helper dei template e cache immutable per static/dist/."""
+    if app.has_static_folder:
+        load_manifest(app.static_folder)
+    app.add_template_global(asset_url)
+    app.add_template_global(logo)
+    app.after_request(_immutable_cache)
@@ -3,6 +3,7 @@ import os
 from app import app
 from extensions import db
 from models import Team
+from utils import data_version
 
 def assign_logos_to_teams():
     """Assegna i percorsi dei loghi alle squadre esistenti nel database."""
@@ -42,6 +43,8 @@ def assign_logos_to_teams():
             else:
                 print(f"❌ Logo non trovato per: {team.name}")
         
+        # I loghi sono nell'anagrafica in memoria dei worker: la nuova versione la invalida
+        data_version.bump()
         db.session.commit()
         print(f"\n🎉 Assegnazione completata. {updated_count} squadre aggiornate.")
 
@@ -1,14 +1,18 @@
 # utils/calculate_standings.py
-from collections import defaultdict
-from models import Team, Match
+import numpy as np
+from models import Match
 from extensions import db
+from utils import team_directory
+from utils.scoring import aggregate_table, score_matches
 
 def calculate_standings():
     """Calcola la classifica del campionato con statistiche aggiuntive."""
     try:
-        matches = Match.query.all()
+        # Solo le colonne necessarie, senza costruire oggetti ORM
+        rows = db.session.query(Match.home_team, Match.away_team, Match.home_score,
+                                Match.away_score, Match.season_id).all()
 
-        if not matches:
+        if not rows:
             return {
                 'standings': [],
                 'best_attack': None,
@@ -16,45 +20,15 @@ def calculate_standings():
                 'most_wins': None
             }
 
-        team_stats = defaultdict(lambda: {
-            'points': 0, 'matches_played': 0, 'wins': 0, 'draws': 0, 'losses': 0,
-            'goals_for': 0.0, 'goals_against': 0.0
-        })
+        home_teams, away_teams, home_scores, away_scores, season_ids = zip(*rows)
 
-        for match in matches:
-            home_team_name = match.home_team
-            away_team_name = match.away_team
-
-            # Calcola i gol fantacalcio
-            home_goals = max(0, (match.home_score - 60) // 6) if match.home_score is not None else 0
-            away_goals = max(0, (match.away_score - 60) // 6) if match.away_score is not None else 0
-
-            # Aggiorna statistiche
-            team_stats[home_team_name]['matches_played'] += 1
-            team_stats[away_team_name]['matches_played'] += 1
-
-            team_stats[home_team_name]['goals_for'] += home_goals
-            team_stats[home_team_name]['goals_against'] += away_goals
-            team_stats[away_team_name]['goals_for'] += away_goals
-            team_stats[away_team_name]['goals_against'] += home_goals
-
-            # Assegna punti, vittorie, pareggi e sconfitte
-            if home_goals > away_goals:
-                team_stats[home_team_name]['wins'] += 1
-                team_stats[home_team_name]['points'] += 3
-                team_stats[away_team_name]['losses'] += 1
-            elif away_goals > home_goals:
-                team_stats[away_team_name]['wins'] += 1
-                team_stats[away_team_name]['points'] += 3
-                team_stats[home_team_name]['losses'] += 1
-            else:
-                team_stats[home_team_name]['draws'] += 1
-                team_stats[home_team_name]['points'] += 1
-                team_stats[away_team_name]['draws'] += 1
-                team_stats[away_team_name]['points'] += 1
+        # Indici delle squadre e calcolo vettoriale di gol, esiti e punti
+        team_names, team_index = np.unique(np.array(home_teams + away_teams, dtype=object), return_inverse=True)
+        scored = score_matches(np.array(home_scores, dtype=float), np.array(away_scores, dtype=float), season_ids)
+        team_stats = aggregate_table(list(team_names), team_index[:len(rows)], team_index[len(rows):], scored)
         
-        # Mappa i nomi delle squadre agli oggetti Team per i dettagli nel template
-        teams_map = {t.name: t for t in Team.query.all()}
+        # Mappa i nomi delle squadre all'anagrafica in memoria per i dettagli nel template
+        teams_map = team_directory.teams_map()
         
         standings = []
         for name, stats in team_stats.items():
@@ -70,7 +44,7 @@ def calculate_standings():
                     'losses': stats['losses'],
                     'goals_for': stats['goals_for'],
                     'goals_against': stats['goals_against'],
-                    'goal_difference': stats['goals_for'] - stats['goals_against'],
+                    'goal_difference': stats['goal_difference'],
                     'avg_points_for': stats['goals_for'] / stats['matches_played'] if stats['matches_played'] > 0 else 0,
                 })
         
@@ -0,0 +1,115 @@
+# utils/compression.py
+"""
+Compressione gzip delle risposte e file statici precompressi.
+
+- Le risposte dinamiche (HTML, JSON, CSS, JS...) sopra COMPRESS_MIN_SIZE
+  byte vengono compresse se il client accetta gzip; gli stream SSE e i
+  file inviati con send_file sono esclusi.
+- Per i file statici, se esiste una copia .gz accanto all'originale
+  (generata con 'flask compress-static') viene servita quella.
+- La cache delle risposte (utils/response_cache) salva anche il corpo
+  compresso: ogni pagina viene compressa una volta sola per versione.
+
+Configurazione: COMPRESS_MIN_SIZE (default 1024), COMPRESS_LEVEL (default 6).
+"""
+import gzip
+import mimetypes
+import os
+from flask import request, send_from_directory
+
+MIN_SIZE = int(os.getenv('COMPRESS_MIN_SIZE', 1024))
+LEVEL = int(os.getenv('COMPRESS_LEVEL', 6))
+
+COMPRESSIBLE_MIMETYPES = {
+    'text/html', 'text/css', 'text/plain', 'text/xml', 'text/javascript',
+    'application/json', 'application/javascript', 'application/xml', 'image/svg+xml',
+}
+# Estensioni dei file statici da precomprimere (le immagini raster sono già compresse)
+STATIC_EXTENSIONS = ('.css', '.js', '.svg', '.json', '.txt', '.html', '.map')
+
+# Suffisso dell'ETag della rappresentazione compressa (un ETag forte per rappresentazione)
+ETAG_SUFFIX = '-gz'
+
+
+def accepts_gzip():
+    return request.accept_encodings['gzip'] > 0
+
+
+def compress(data):
+    return gzip.compress(data, compresslevel=LEVEL)
+
+
+def is_compressible(mimetype, size):
+    return mimetype in COMPRESSIBLE_MIMETYPES and size >= MIN_SIZE
+
+
+def _compress_response(response):
+    if response.headers.get('Content-Encoding') == 'gzip':
+        return mark_compressed(response)  # già compressa (es. dalla cache delle risposte)
+    if (response.status_code < 200 or response.status_code >= 300 or response.status_code == 204
+            or response.direct_passthrough or response.is_streamed
+            or 'Content-Encoding' in response.headers):
+        return response
+
+    response.vary.add('Accept-Encoding')
+    if not accepts_gzip() or not is_compressible(response.mimetype, response.content_length or 0):
+        return response
+
+    response.set_data(compress(response.get_data()))
+    mark_compressed(response)
+    return response
+
+
+def mark_compressed(response):
+    """Header di una risposta il cui corpo è già gzip."""
+    response.headers['Content-Encoding'] = 'gzip'
+    response.vary.add('Accept-Encoding')
+    etag, weak = response.get_etag()
+    if etag and not etag.endswith(ETAG_SUFFIX):
+        response.set_etag(etag + ETAG_SUFFIX, weak)
+    return response
+
+
+def _static_view(app):
+    def static(filename):
+        folder = app.static_folder
+        if accepts_gzip() and filename.endswith(STATIC_EXTENSIONS) and os.path.isfile(os.path.join(folder, f"{filename}.gz")):
+            mimetype = mimetypes.guess_type(filename)[0] or 'application/octet-stream'
+            response = send_from_directory(folder, f"{filename}.gz", mimetype=mimetype,
+                                           max_age=app.get_send_file_max_age(filename))
+            response.headers['Content-Encoding'] = 'gzip'
+            response.vary.add('Accept-Encoding')
+            return response
+        response = app.send_static_file(filename)
+        response.vary.add('Accept-Encoding')
+        return response
+    return static
+
+
+def compress_static(static_folder, log=print):
+    """Scrive una copia .gz (livello 9) di ogni file statico testuale. Restituisce il numero di file."""
+    count = 0
+    for root, _, files in os.walk(static_folder):
+        for name in files:
+            if not name.endswith(STATIC_EXTENSIONS):
+                continue
+            path = os.path.join(root, name)
+            target = f"{path}.gz"
+            if os.path.exists(target) and os.path.getmtime(target) >= os.path.getmtime(path):
+                continue
+            with open(path, 'rb') as f:
+                data = f.read()
+            tmp_path = f"{target}.tmp"
+            with open(tmp_path, 'wb') as f:
+                f.write(gzip.compress(data, compresslevel=9, mtime=0))
+            os.replace(tmp_path, target)
+            count += 1
+            log(f"🗜️ {os.path.relpath(path, static_folder)}: {len(data)} → {os.path.getsize(target)} byte")
+    return count
+
+
+def init_app(app):
+    """Registra la compressione delle risposte e il servizio dei file statici precompressi."""
+    app.after_request(_compress_response)
+    if app.has_static_folder:
+        app.view_functions['static'] = _static_view(app)
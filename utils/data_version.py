@@ -0,0 +1,63 @@
+# utils/data_version.py
+"""
+Versione globale dei dati (tabella DataVersion, una sola riga).
+
+Ogni ingestione la incrementa nella stessa transazione delle partite;
+le cache confrontano la versione letta con quella dei dati in memoria.
+La lettura viene tenuta in memoria per DATA_VERSION_TTL secondi (default
+1): con più worker/processi una nuova versione è visibile a tutti entro
+quel tempo, senza interrogare il database a ogni richiesta.
+"""
+import os
+import threading
+import time
+from datetime import datetime
+from sqlalchemy import update
+from extensions import db
+from models import DataVersion
+
+ROW_ID = 1
+TTL = float(os.getenv('DATA_VERSION_TTL', 1.0))
+
+_lock = threading.Lock()
+_cached = {'version': None, 'updated_at': None, 'read_at': 0.0}
+
+
+def bump():
+    """Incrementa la versione nella transazione corrente (serve un commit)."""
+    result = db.session.execute(
+        update(DataVersion)
+        .where(DataVersion.id == ROW_ID)
+        .values(version=DataVersion.version + 1, updated_at=datetime.utcnow())
+    )
+    if result.rowcount == 0:
+        db.session.add(DataVersion(id=ROW_ID, version=1, updated_at=datetime.utcnow()))
+    invalidate()
+
+
+def invalidate():
+    """Forza la prossima current_version() a rileggere dal database."""
+    with _lock:
+        _cached['read_at'] = 0.0
+
+
+def current_state():
+    """(versione, data dell'ultimo aggiornamento), letti al massimo una volta ogni TTL secondi."""
+    now = time.monotonic()
+    with _lock:
+        if _cached['version'] is not None and now - _cached['read_at'] < TTL:
+            return _cached['version'], _cached['updated_at']
+
+    row = db.session.query(DataVersion.version, DataVersion.updated_at).filter(DataVersion.id == ROW_ID).first()
+    version, updated_at = (row.version, row.updated_at) if row else (0, None)
+
+    with _lock:
+        _cached['version'] = version
+        _cached['updated_at'] = updated_at
+        _cached['read_at'] = now
+    return version, updated_at
+
+
+def current_version():
+    """Versione corrente, letta al massimo una volta ogni TTL secondi."""
+    return current_state()[0]
@@ -0,0 +1,132 @@
+# utils/elo.py
+"""
+Rating Elo delle squadre, aggiornato giornata per giornata.
+
+Ogni partita sposta i rating delle due squadre in base al risultato
+(vittoria 1, pareggio 0,5, sconfitta 0) rispetto a quello atteso dalla
+differenza di rating, con un moltiplicatore per lo scarto di gol. Le
+partite della stessa giornata usano i rating di inizio giornata, quindi
+ogni giornata è un unico passo vettoriale NumPy.
+
+La storia è nella tabella TeamRating (una riga per squadra per giornata
+giocata); il rating attuale è copiato su Standing.elo per la classifica.
+"""
+import os
+from collections import defaultdict
+import numpy as np
+from extensions import db
+from models import Match, Standing, TeamRating
+from utils import scoring
+from utils.standings_store import season_filter
+
+INITIAL_RATING = float(os.getenv('ELO_INITIAL', 1500))
+K_FACTOR = float(os.getenv('ELO_K', 20))
+
+
+def expected_score(rating, opponent_rating):
+    """Probabilità attesa di vittoria (array o scalari)."""
+    return 1.0 / (1.0 + 10 ** ((opponent_rating - rating) / 400.0))
+
+
+def gameweek_step(ratings, home, away, home_goals, away_goals, k=K_FACTOR):
+    """
+    Applica una giornata: ratings è l'array dei rating (modificato sul
+    posto), home/away gli indici delle squadre. Restituisce le variazioni
+    della squadra di casa (quella in trasferta ha la variazione opposta).
+    """
+    expected = expected_score(ratings[home], ratings[away])
+    actual = (np.sign(home_goals - away_goals) + 1) / 2.0
+    margin = np.log1p(np.abs(home_goals - away_goals)) + 1.0
+    delta = k * margin * (actual - expected)
+
+    # np.add.at gestisce anche una squadra presente due volte nella giornata
+    np.add.at(ratings, home, delta)
+    np.add.at(ratings, away, -delta)
+    return delta
+
+
+def _ratings_before(season_id, gameweek):
+    """Ultimo rating di ogni squadra prima della giornata indicata."""
+    latest = (db.session.query(TeamRating.team_name, db.func.max(TeamRating.gameweek).label('gameweek'))
+              .filter(season_filter(TeamRating.season_id, season_id), TeamRating.gameweek < gameweek)
+              .group_by(TeamRating.team_name)
+              .subquery())
+    rows = (db.session.query(TeamRating.team_name, TeamRating.rating)
+            .join(latest, (TeamRating.team_name == latest.c.team_name) & (TeamRating.gameweek == latest.c.gameweek))
+            .filter(season_filter(TeamRating.season_id, season_id)))
+    return {team_name: rating for team_name, rating in rows}
+
+
+def refresh_ratings(season_id=None, from_gameweek=1):
+    """
+    Ricalcola i rating dalla giornata from_gameweek in avanti partendo da
+    quelli salvati per la giornata precedente. Con from_gameweek=1 è il
+    ricalcolo completo della stagione.
+    """
+    current = _ratings_before(season_id, from_gameweek) if from_gameweek > 1 else {}
+
+    rows = (db.session.query(Match.gameweek, Match.home_team, Match.away_team, Match.home_score, Match.away_score)
+            .filter(season_filter(Match.season_id, season_id), Match.gameweek >= from_gameweek)
+            .order_by(Match.gameweek, Match.id)
+            .all())
+
+    (TeamRating.query
+     .filter(season_filter(TeamRating.season_id, season_id), TeamRating.gameweek >= from_gameweek)
+     .delete(synchronize_session=False))
+
+    team_names = sorted(set(current) | {r.home_team for r in rows} | {r.away_team for r in rows})
+    index = {name: i for i, name in enumerate(team_names)}
+    ratings = np.array([current.get(name, INITIAL_RATING) for name in team_names], dtype=np.float64)
+
+    if rows:
+        gameweeks = np.array([r.gameweek for r in rows])
+        home = np.array([index[r.home_team] for r in rows])
+        away = np.array([index[r.away_team] for r in rows])
+        scored = scoring.score_matches([r.home_score or 0.0 for r in rows], [r.away_score or 0.0 for r in rows],
+                                       [season_id] * len(rows))
+
+        # Confini delle giornate nell'array ordinato per giornata
+        boundaries = np.flatnonzero(np.diff(gameweeks)) + 1
+        for start, end in zip(np.r_[0, boundaries], np.r_[boundaries, len(rows)]):
+            h, a = home[start:end], away[start:end]
+            delta = gameweek_step(ratings, h, a, scored['home_goals'][start:end], scored['away_goals'][start:end])
+
+            changes = defaultdict(float)
+            for team, change in zip(np.r_[h, a], np.r_[delta, -delta]):
+                changes[int(team)] += float(change)
+            for team, change in changes.items():
+                db.session.add(TeamRating(season_id=season_id, gameweek=int(gameweeks[start]),
+                                          team_name=team_names[team], rating=float(ratings[team]),
+                                          change=change))
+
+    for row in Standing.query.filter(season_filter(Standing.season_id, season_id)):
+        row.elo = float(ratings[index[row.team_name]]) if row.team_name in index else None
+    return len(rows)
+
+
+def refresh_for_matches(matches):
+    """Aggiorna i rating delle stagioni toccate, dalla giornata più vecchia modificata."""
+    first_gameweek = {}
+    for match in matches:
+        gameweek = int(match.gameweek)
+        first_gameweek[match.season_id] = min(first_gameweek.get(match.season_id, gameweek), gameweek)
+    for season_id, gameweek in first_gameweek.items():
+        refresh_ratings(season_id, gameweek)
+
+
+def rebuild_ratings():
+    """Ricalcola da zero i rating di tutte le stagioni."""
+    TeamRating.query.delete()
+    season_ids = [season_id for (season_id,) in db.session.query(Match.season_id).distinct()]
+    matches = sum(refresh_ratings(season_id, 1) for season_id in season_ids)
+    db.session.commit()
+    return matches
+
+
+def get_rating_history(team_name, season_id=None):
+    """Rating di una squadra giornata per giornata."""
+    rows = (db.session.query(TeamRating.gameweek, TeamRating.rating, TeamRating.change)
+            .filter(season_filter(TeamRating.season_id, season_id), TeamRating.team_name == team_name)
+            .order_by(TeamRating.gameweek)
+            .all())
+    return [{'gameweek': gw, 'rating': rating, 'change': change} for gw, rating, change in rows]
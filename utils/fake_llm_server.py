@@ -0,0 +1,225 @@
+# utils/fake_llm_server.py
+"""
+Server locale che imita l'endpoint chat/completions di Perplexity (formato
+OpenAI) per test di carico offline della generazione articoli.
+
+Uso:
+    python -m utils.fake_llm_server --port 8089 --latency-mean 2.0 --error-rate 0.1
+
+poi avvia l'app con PERPLEXITY_BASE_URL=http://127.0.0.1:8089/chat/completions
+e una PERPLEXITY_API_KEY qualsiasi.
+"""
+import argparse
+import json
+import random
+import threading
+import time
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+SAMPLE_ARTICLE = (
+    "<h2>{home} vs {away}</h2>\n"
+    "<h3>Il Resoconto della Partita</h3>\n"
+    "<p>Una sfida intensa tra <strong>{home}</strong> e <strong>{away}</strong>, "
+    "decisa dai dettagli e dalle scelte degli allenatori.</p>\n"
+    "<h3>I Migliori in Campo</h3>\n"
+    "<p>Prestazioni di livello da entrambe le parti, con bonus pesanti nel finale.</p>\n"
+    "<h3>Le delusioni e i Flop</h3>\n"
+    "<p>Qualche insufficienza di troppo ha pesato sul punteggio complessivo.</p>\n"
+    "<h3>Conclusione</h3>\n"
+    "<p>Tre punti che muovono la classifica e rilanciano le ambizioni di giornata.</p>"
+)
+
+
+class FakeLLMConfig:
+    """Parametri di comportamento del server finto."""
+
+    def __init__(self, latency_mean=1.0, latency_sigma=0.5, error_rate=0.0,
+                 stall_rate=0.0, chunk_size=40, chunk_delay=0.05, seed=None):
+        self.latency_mean = latency_mean      # secondi, mediana della latenza totale
+        self.latency_sigma = latency_sigma    # dispersione della lognormale
+        self.error_rate = error_rate          # frazione di risposte 500/429
+        self.stall_rate = stall_rate          # frazione di stream che si bloccano a metà
+        self.chunk_size = chunk_size          # caratteri per frammento in streaming
+        self.chunk_delay = chunk_delay        # secondi tra un frammento e l'altro
+        self.random = random.Random(seed)
+        self.lock = threading.Lock()
+        self.requests = 0
+        self.errors = 0
+
+    def sample_latency(self):
+        if self.latency_mean <= 0:
+            return 0.0
+        with self.lock:
+            return self.random.lognormvariate(0, self.latency_sigma) * self.latency_mean
+
+    def roll(self, rate):
+        with self.lock:
+            return self.random.random() < rate
+
+
+def _article_for(payload):
+    """Costruisce un articolo plausibile leggendo le squadre dal prompt."""
+    prompt = payload.get('messages', [{}])[-1].get('content', '')
+    home, away = 'Casa', 'Trasferta'
+    for line in prompt.splitlines():
+        if line.startswith('PARTITA:') and ' vs ' in line:
+            home, away = line[len('PARTITA:'):].strip().split(' vs ', 1)
+            break
+    return SAMPLE_ARTICLE.format(home=home, away=away)
+
+
+class FakeLLMHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+    config = FakeLLMConfig()
+
+    def log_message(self, format, *args):
+        pass
+
+    def do_POST(self):
+        config = self.config
+        length = int(self.headers.get('Content-Length', 0))
+        payload = json.loads(self.rfile.read(length) or b'{}')
+
+        with config.lock:
+            config.requests += 1
+
+        if not self.path.rstrip('/').endswith('/chat/completions'):
+            return self._send_json(404, {'error': {'message': 'Not found'}})
+
+        latency = config.sample_latency()
+
+        if config.roll(config.error_rate):
+            time.sleep(latency / 4)
+            with config.lock:
+                config.errors += 1
+            status = 429 if config.roll(0.5) else 500
+            return self._send_json(status, {'error': {'message': 'Errore simulato', 'code': status}})
+
+        content = _article_for(payload)
+        completion_id = f"fake-{uuid.uuid4().hex[:12]}"
+
+        if payload.get('stream'):
+            return self._send_stream(payload, completion_id, content, latency)
+
+        time.sleep(latency)
+        self._send_json(200, {
+            'id': completion_id,
+            'object': 'chat.completion',
+            'created': int(time.time()),
+            'model': payload.get('model', 'fake'),
+            'choices': [{
+                'index': 0,
+                'message': {'role': 'assistant', 'content': content},
+                'finish_reason': 'stop'
+            }],
+            'usage': {
+                'prompt_tokens': len(json.dumps(payload)) // 4,
+                'completion_tokens': len(content) // 4,
+                'total_tokens': (len(json.dumps(payload)) + len(content)) // 4
+            }
+        })
+
+    def _send_json(self, status, body):
+        data = json.dumps(body).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def _send_stream(self, payload, completion_id, content, latency):
+        config = self.config
+        chunks = [content[i:i + config.chunk_size] for i in range(0, len(content), config.chunk_size)]
+        stall_at = config.random.randrange(len(chunks)) if config.roll(config.stall_rate) else None
+
+        # La latenza campionata diventa il tempo al primo frammento
+        time.sleep(latency)
+
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/event-stream')
+        self.send_header('Cache-Control', 'no-cache')
+        self.send_header('Connection', 'close')
+        self.end_headers()
+        self.close_connection = True
+
+        try:
+            for index, text in enumerate(chunks):
+                if index == stall_at:
+                    # Stream bloccato: nessun dato finché il client non si arrende
+                    time.sleep(3600)
+                self._write_event({
+                    'id': completion_id,
+                    'object': 'chat.completion.chunk',
+                    'created': int(time.time()),
+                    'model': payload.get('model', 'fake'),
+                    'choices': [{'index': 0, 'delta': {'content': text}, 'finish_reason': None}]
+                })
+                time.sleep(config.chunk_delay)
+
+            self._write_event({
+                'id': completion_id,
+                'object': 'chat.completion.chunk',
+                'created': int(time.time()),
+                'model': payload.get('model', 'fake'),
+                'choices': [{'index': 0, 'delta': {}, 'finish_reason': 'stop'}]
+            })
+            self.wfile.write(b"data: [DONE]\n\n")
+            self.wfile.flush()
+        except (BrokenPipeError, ConnectionResetError):
+            pass
+
+    def _write_event(self, body):
+        self.wfile.write(f"data: {json.dumps(body)}\n\n".encode('utf-8'))
+        self.wfile.flush()
+
+
+def start_fake_server(host='127.0.0.1', port=0, config=None):
+    """
+    Avvia il server in un thread daemon e restituisce (server, url).
+    Con port=0 viene scelta una porta libera.
+    """
+    handler = type('ConfiguredFakeLLMHandler', (FakeLLMHandler,), {'config': config or FakeLLMConfig()})
+    server = ThreadingHTTPServer((host, port), handler)
+    server.daemon_threads = True
+
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+
+    url = f"http://{host}:{server.server_address[1]}/chat/completions"
+    return server, url
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Server LLM finto compatibile con chat/completions')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8089)
+    parser.add_argument('--latency-mean', type=float, default=1.0, help='mediana latenza (s)')
+    parser.add_argument('--latency-sigma', type=float, default=0.5, help='sigma della lognormale')
+    parser.add_argument('--error-rate', type=float, default=0.0, help='frazione di errori 429/500')
+    parser.add_argument('--stall-rate', type=float, default=0.0, help='frazione di stream bloccati')
+    parser.add_argument('--chunk-size', type=int, default=40)
+    parser.add_argument('--chunk-delay', type=float, default=0.05)
+    parser.add_argument('--seed', type=int, default=None)
+    args = parser.parse_args()
+
+    config = FakeLLMConfig(
+        latency_mean=args.latency_mean,
+        latency_sigma=args.latency_sigma,
+        error_rate=args.error_rate,
+        stall_rate=args.stall_rate,
+        chunk_size=args.chunk_size,
+        chunk_delay=args.chunk_delay,
+        seed=args.seed
+    )
+    server, url = start_fake_server(args.host, args.port, config)
+    print(f"🤖 Fake LLM in ascolto su {url} (Ctrl+C per uscire)")
+
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        server.shutdown()
+
+
+if __name__ == '__main__':
+    main()
@@ -1,26 +1,23 @@
 # utils/fantacalcio_utils.py
-def points_to_goals(points):
+from utils import scoring
+
+def points_to_goals(points, rules=scoring.DEFAULT_RULES):
     """
     Converte punteggio fantacalcio in gol
-    66+ punti = 1 gol, poi +1 gol ogni 6 punti
+    66+ punti = 1 gol, poi +1 gol ogni 6 punti (vedi utils/scoring.py)
     """
-    if points < 66:
-        return 0
-    
-    # Formula: gol = 1 + ((punti - 66) // 6)
-    goals = 1 + int((points - 66) // 6)
-    return goals
+    return scoring.points_to_goals(points, rules)
 
-def goals_to_points_range(goals):
+def goals_to_points_range(goals, rules=scoring.DEFAULT_RULES):
     """
     Converte gol in range di punti
     Utile per capire il range di punteggio
     """
     if goals == 0:
-        return (0, 65.99)
+        return (0, rules.first_goal - 0.01)
     
-    min_points = 66 + (goals - 1) * 6
-    max_points = min_points + 5.99
+    min_points = rules.first_goal + (goals - 1) * rules.goal_step
+    max_points = min_points + rules.goal_step - 0.01
     
     return (min_points, max_points)
 
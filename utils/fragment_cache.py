@@ -0,0 +1,101 @@
+# utils/fragment_cache.py
+"""
+Cache dei blocchi di template che si ripetono tra più pagine.
+
+Nei template:
+    {% cache 'matchday', gw %} ... {% endcache %}
+
+Il primo argomento è il nome del frammento, gli altri completano la
+chiave; la versione dei dati (utils/data_version) è aggiunta in
+automatico, quindi dopo un'ingestione i frammenti vengono rigenerati.
+Per invalidare a mano: fragment_cache.invalidate('matchday') oppure
+fragment_cache.invalidate('matchday', 12).
+
+Configurazione: FRAGMENT_CACHE_BYTES (default 16 MB).
+"""
+import os
+import threading
+from collections import defaultdict
+from cachetools import LRUCache
+from jinja2 import nodes
+from jinja2.ext import Extension
+from markupsafe import Markup
+from utils import data_version
+
+
+class FragmentCache:
+
+    def __init__(self, max_bytes=16 * 1024 * 1024):
+        self._cache = LRUCache(maxsize=max_bytes, getsizeof=len)
+        self._version = None
+        self._lock = threading.Lock()
+        self.hits = defaultdict(int)
+        self.misses = defaultdict(int)
+
+    @classmethod
+    def from_env(cls):
+        return cls(max_bytes=int(os.getenv('FRAGMENT_CACHE_BYTES', 16 * 1024 * 1024)))
+
+    def get_or_render(self, name, args, render):
+        """HTML del frammento per (nome, argomenti, versione), renderizzato con render() se manca."""
+        version = data_version.current_version()
+        key = (name, args, version)
+        with self._lock:
+            if version != self._version:
+                self._cache.clear()
+                self._version = version
+            html = self._cache.get(key)
+        if html is not None:
+            self.hits[name] += 1
+            return Markup(html)
+
+        self.misses[name] += 1
+        html = str(render())
+        with self._lock:
+            if version == self._version:
+                try:
+                    self._cache[key] = html
+                except ValueError:
+                    pass  # frammento più grande dell'intera cache
+        return Markup(html)
+
+    def invalidate(self, name, *args):
+        """Rimuove il frammento name (solo quelli con questi argomenti, se indicati)."""
+        with self._lock:
+            for key in [key for key in self._cache if key[0] == name and (not args or key[1] == args)]:
+                del self._cache[key]
+
+    def clear(self):
+        with self._lock:
+            self._cache.clear()
+
+    def stats(self):
+        with self._lock:
+            entries, size = len(self._cache), self._cache.currsize
+        return {
+            'entries': entries,
+            'bytes': size,
+            'max_bytes': self._cache.maxsize,
+            'fragments': {name: {'hits': self.hits[name], 'misses': self.misses[name]}
+                          for name in sorted(set(self.hits) | set(self.misses))},
+        }
+
+
+fragment_cache = FragmentCache.from_env()
+
+
+class FragmentCacheExtension(Extension):
+    """Tag {% cache nome, arg1, ... %}...{% endcache %}."""
+    tags = {'cache'}
+
+    def parse(self, parser):
+        lineno = next(parser.stream).lineno
+        args = [parser.parse_expression()]
+        while parser.stream.skip_if('comma'):
+            args.append(parser.parse_expression())
+        body = parser.parse_statements(('name:endcache',), drop_needle=True)
+        call = self.call_method('_render_fragment', [args[0], nodes.Tuple(args[1:], 'load')])
+        return nodes.CallBlock(call, [], [], body).set_lineno(lineno)
+
+    def _render_fragment(self, name, args, caller):
+        return fragment_cache.get_or_render(name, args, caller)
@@ -0,0 +1,108 @@
+# utils/gameweek_rollup.py
+"""
+Totali per giornata (tabella GameweekRollup) usati dalla pagina /stats.
+
+In ingestione si ricalcola solo la riga delle giornate toccate (poche
+partite, lette con l'indice su stagione/giornata): /stats legge quindi
+una riga per giornata invece di scorrere tutte le partite.
+"""
+from extensions import db
+from models import GameweekRollup, Match
+from utils import scoring
+from utils.standings_store import season_filter
+
+
+def refresh_gameweek(season_id, gameweek):
+    """Ricalcola la riga di una giornata dalle sue partite."""
+    matches = (Match.query
+               .filter(season_filter(Match.season_id, season_id), Match.gameweek == gameweek)
+               .all())
+
+    rollup = (GameweekRollup.query
+              .filter(season_filter(GameweekRollup.season_id, season_id), GameweekRollup.gameweek == gameweek)
+              .first())
+
+    if not matches:
+        if rollup is not None:
+            db.session.delete(rollup)
+        return None
+
+    if rollup is None:
+        rollup = GameweekRollup(season_id=season_id, gameweek=gameweek)
+        db.session.add(rollup)
+
+    home_scores = [m.home_score or 0.0 for m in matches]
+    away_scores = [m.away_score or 0.0 for m in matches]
+    scored = scoring.score_matches(home_scores, away_scores, [season_id] * len(matches))
+    totals = [h + a for h, a in zip(home_scores, away_scores)]
+    best = max(range(len(matches)), key=lambda i: totals[i])
+
+    rollup.matches = len(matches)
+    rollup.points_sum = float(sum(totals))
+    rollup.goals_sum = int(scored['home_goals'].sum() + scored['away_goals'].sum())
+    rollup.max_points = float(totals[best])
+    rollup.max_match_id = matches[best].id
+    return rollup
+
+
+def refresh_for_matches(matches):
+    """Aggiorna le giornate toccate da un insieme di partite salvate."""
+    keys = {(match.season_id, int(match.gameweek)) for match in matches}
+    for season_id, gameweek in sorted(keys, key=lambda k: (k[0] or 0, k[1])):
+        refresh_gameweek(season_id, gameweek)
+    return len(keys)
+
+
+def rebuild_rollups():
+    """Ricostruisce da zero tutte le righe. Restituisce il numero di giornate."""
+    GameweekRollup.query.delete()
+    keys = db.session.query(Match.season_id, Match.gameweek).distinct().all()
+    for season_id, gameweek in keys:
+        refresh_gameweek(season_id, gameweek)
+    db.session.commit()
+    return len(keys)
+
+
+def get_stats_summary():
+    """
+    Totali del campionato e statistiche per giornata (tutte le stagioni),
+    nel formato atteso da stats.html.
+    """
+    gameweek_stats = {}
+    for rollup in GameweekRollup.query.order_by(GameweekRollup.gameweek).all():
+        st = gameweek_stats.setdefault(rollup.gameweek, {
+            "matches": 0, "total_points": 0.0, "total_goals": 0.0, "top_match": None, "top_points": None,
+        })
+        st["matches"] += rollup.matches
+        st["total_points"] += rollup.points_sum
+        st["total_goals"] += rollup.goals_sum
+        if rollup.max_match is not None and (st["top_points"] is None or rollup.max_points > st["top_points"]):
+            st["top_match"] = {
+                "id": rollup.max_match.id,
+                "home_team": rollup.max_match.home_team,
+                "away_team": rollup.max_match.away_team,
+            }
+            st["top_points"] = rollup.max_points
+
+    for st in gameweek_stats.values():
+        st["avg_points"] = st["total_points"] / st["matches"] if st["matches"] else 0.0
+        st["avg_goals"] = st["total_goals"] / st["matches"] if st["matches"] else 0.0
+
+    total_matches = sum(st["matches"] for st in gameweek_stats.values())
+    total_points = sum(st["total_points"] for st in gameweek_stats.values())
+    total_goals = sum(st["total_goals"] for st in gameweek_stats.values())
+
+    return {
+        'total_matches': total_matches,
+        'avg_points_per_match': total_points / total_matches if total_matches else 0.0,
+        'avg_goals_per_match': total_goals / total_matches if total_matches else 0.0,
+        'gameweek_stats': gameweek_stats,
+    }
+
+
+def top_scoring_matches(limit=5):
+    """Partite con il punteggio totale più alto (usa l'indice ix_match_total_score)."""
+    return (Match.query
+            .order_by((Match.home_score + Match.away_score).desc())
+            .limit(limit)
+            .all())
@@ -0,0 +1,64 @@
+# utils/http_cache.py
+"""
+Risposte condizionali (ETag) per le pagine pubbliche.
+
+Il contenuto delle pagine cambia solo quando un'ingestione incrementa la
+versione dei dati (utils/data_version): l'ETag è quindi ricavato da
+versione, release dell'applicazione e URL, e una richiesta con
+If-None-Match ancora valido riceve 304 prima di eseguire query o
+template. Cambiando APP_RELEASE a ogni deploy gli ETag cambiano anche
+quando cambiano solo i template.
+
+Last-Modified non viene inviato: dipenderebbe solo dalla data dei dati e
+dopo un deploy senza nuove giornate un If-Modified-Since darebbe 304 su
+una pagina vecchia.
+"""
+import hashlib
+import os
+from functools import wraps
+from flask import make_response, request
+from utils import data_version
+from utils.compression import ETAG_SUFFIX
+
+APP_RELEASE = os.getenv('APP_RELEASE', '')
+
+# Il browser rivalida sempre: con il 304 il costo è quasi nullo
+CACHE_CONTROL = 'public, no-cache'
+
+
+def compute_etag(version, url=None):
+    """ETag forte per la versione dei dati e l'URL (path + query string)."""
+    url = url if url is not None else request.full_path
+    digest = hashlib.sha1(f"{APP_RELEASE}|{url}".encode('utf-8')).hexdigest()[:12]
+    return f"v{version}-{digest}"
+
+
+def _not_modified(etag):
+    # Vale anche l'ETag della rappresentazione compressa (utils/compression)
+    return request.if_none_match.contains(etag) or request.if_none_match.contains(etag + ETAG_SUFFIX)
+
+
+def _set_validators(response, etag):
+    response.set_etag(etag)
+    response.headers['Cache-Control'] = CACHE_CONTROL
+    return response
+
+
+def conditional(view):
+    """Decoratore: aggiunge l'ETag e risponde 304 senza eseguire la vista."""
+    @wraps(view)
+    def decorated(*args, **kwargs):
+        if request.method not in ('GET', 'HEAD'):
+            return view(*args, **kwargs)
+
+        etag = compute_etag(data_version.current_version())
+        if _not_modified(etag):
+            if request.if_none_match.contains(etag + ETAG_SUFFIX):
+                etag += ETAG_SUFFIX
+            return _set_validators(make_response('', 304), etag)
+
+        response = make_response(view(*args, **kwargs))
+        if response.status_code == 200:
+            _set_validators(response, etag)
+        return response
+    return decorated
@@ -0,0 +1,102 @@
+# utils/keyset.py
+"""
+Paginazione a cursore (keyset) per le liste di articoli e partite.
+
+Invece di OFFSET + COUNT, ogni pagina parte dall'ultima chiave di quella
+precedente: WHERE (created_at, id) < (:created_at, :id) ORDER BY ... DESC
+LIMIT n. Con un indice sulle colonne della chiave ogni pagina costa uguale,
+anche in fondo all'archivio. I cursori sono le chiavi codificate in base64
+(JSON) e restano validi anche se nel frattempo arrivano nuovi elementi.
+"""
+import base64
+import binascii
+import json
+from datetime import datetime
+from sqlalchemy import func, select, text, tuple_
+from extensions import db
+from utils import data_version
+from utils.versioned_cache import VersionedCache
+
+_count_cache = VersionedCache()
+
+
+def encode_cursor(values):
+    """Cursore opaco per una tupla di valori della chiave."""
+    raw = json.dumps([v.isoformat() if isinstance(v, datetime) else v for v in values], separators=(',', ':'))
+    return base64.urlsafe_b64encode(raw.encode('utf-8')).decode('ascii').rstrip('=')
+
+
+def decode_cursor(cursor, columns):
+    """Valori della chiave dal cursore, o None se mancante o non valido."""
+    if not cursor:
+        return None
+    try:
+        raw = base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4))
+        values = json.loads(raw)
+        if not isinstance(values, list) or len(values) != len(columns):
+            return None
+        return [datetime.fromisoformat(v) if column.type.python_type is datetime else v
+                for v, column in zip(values, columns)]
+    except (binascii.Error, ValueError, TypeError, NotImplementedError):
+        return None
+
+
+class KeysetPage:
+    """Una pagina di risultati con i cursori per la successiva e la precedente."""
+
+    def __init__(self, items, keys, has_next, has_prev, total=None):
+        self.items = items
+        self.has_next = has_next
+        self.has_prev = has_prev
+        self.next_cursor = encode_cursor(keys[-1]) if has_next and keys else None
+        self.prev_cursor = encode_cursor(keys[0]) if has_prev and keys else None
+        self.total = total
+
+
+def paginate(query, columns, per_page, after=None, before=None, key=None, total=None):
+    """
+    Pagina di query ordinata per columns decrescenti (la chiave deve essere
+    univoca, es. (created_at, id)). after/before sono cursori: con after
+    si va avanti (elementi più vecchi), con before si torna indietro.
+    key(item) restituisce la tupla della chiave di un elemento.
+    """
+    key = key or (lambda item: tuple(getattr(item, column.key) for column in columns))
+    after_values = decode_cursor(after, columns)
+    before_values = decode_cursor(before, columns) if after_values is None else None
+
+    if before_values is not None:
+        rows = (query.filter(tuple_(*columns) > tuple_(*before_values))
+                .order_by(*[column.asc() for column in columns])
+                .limit(per_page + 1)
+                .all())
+        has_more = len(rows) > per_page
+        items = list(reversed(rows[:per_page]))
+        keys = [key(item) for item in items]
+        # Il cursore può essere vecchio (elementi cancellati nel frattempo):
+        # come per after, c'è una pagina successiva solo se esiste una riga
+        # oltre l'ultima chiave
+        has_next = bool(keys) and query.filter(tuple_(*columns) < tuple_(*keys[-1])).first() is not None
+        return KeysetPage(items, keys, has_next=has_next, has_prev=has_more, total=total)
+
+    if after_values is not None:
+        query = query.filter(tuple_(*columns) < tuple_(*after_values))
+    rows = query.order_by(*[column.desc() for column in columns]).limit(per_page + 1).all()
+    items = rows[:per_page]
+    return KeysetPage(items, [key(item) for item in items], has_next=len(rows) > per_page,
+                      has_prev=after_values is not None, total=total)
+
+
+def approximate_count(model):
+    """
+    Numero (approssimato) di righe della tabella: su PostgreSQL la stima
+    delle statistiche (pg_class.reltuples), altrove un COUNT tenuto in
+    cache fino alla prossima versione dei dati.
+    """
+    table = model.__table__.name
+    if db.engine.dialect.name == 'postgresql':
+        estimate = db.session.execute(text('SELECT reltuples FROM pg_class WHERE relname = :table'),
+                                      {'table': table}).scalar()
+        if estimate is not None and estimate >= 0:
+            return int(estimate)
+    return _count_cache.get_or_build(table, data_version.current_version(),
+                                     lambda: db.session.execute(select(func.count()).select_from(model)).scalar())
@@ -1,61 +1,9 @@
 import os
+import json
+import time
 import requests
 import re
-
-TEAM_CUSTOMIZATIONS = {
-    '21 CANNELLONI FC' : {
-        'stadio': 'Merisacchio Stadium',
-        'allenatore': 'Giovanni',
-        'nomignolo': 'il principe ereditiero',
-    },
-    'L SGARRUPATI' : {
-        'stadio': 'UK Arena',
-        'allenatore': 'Antonio Pot',
-        'direttore sportivo': 'Michele',
-        'nomignolo': 'Sir Antonio D\'Inghilterra'
-    },
-    'SPARTAK J&N' : {
-        'stadio': 'Malito Stadium',
-        'allenatore': 'Luigi',
-        'nomignolo': 'u putigaru'
-    },
-    'MANCHESTORS CITY' : {
-        'stadio': 'Montebeltrano Stadium',
-        'allenatore': 'Carmelo',
-        'nomignolo': 'Orso'
-    },
-    'ESTATHEO' : {
-        'stadio': 'Comunale di Grimaldi',
-        'allenatore': 'Bruno',
-        'nomignolo': 'Mister Bruno'
-    },
-    'FC CELL-TIC GLASGOW' : {
-        'stadio': 'Vasciuta UPower',
-        'allenatore': 'Gaetano',
-        'nomignolo': 'Tano'
-    },
-    'A.S. DONALD DUCK' : {
-        'stadio': 'Paperopoli Stadium',
-        'allenatore': 'Antonio Pucci',
-        'nomignolo': 'il professore'
-    },
-    'MBARCATURA © FC' : {
-        'stadio': 'Stadio Mbarcatura',
-        'allenatore': 'Riccardo',
-        'nomignolo': 'Rick'
-    },
-    'EPICTOMINELLO' : {
-        'stadio': 'BarberShop Stadium',
-        'allenatore': 'Giovanni',
-        'nomignolo': 'Mozzo'
-    },
-    'NK MAURIBOR'   : {
-        'stadio': 'Peroni Arena',
-        'allenatore': 'Mauro',
-        'nomignolo': 'il catanzarese'
-    },
-  
- }
+from utils.prompt_builder import PromptBuilder, PROMPT_VERSION
 
 class PerplexityClient:
     def __init__(self):
@@ -63,21 +11,55 @@ class PerplexityClient:
         self.api_key = os.getenv('PERPLEXITY_API_KEY')
         if not self.api_key:
             raise ValueError("PERPLEXITY_API_KEY non trovata nelle variabili d'ambiente")
-        self.base_url = "https://api.perplexity.ai/chat/completions"
+        self.base_url = os.getenv('PERPLEXITY_BASE_URL', "https://api.perplexity.ai/chat/completions")
+        self.model = os.getenv('PERPLEXITY_MODEL', "sonar-pro")
+        self.timeout = float(os.getenv('PERPLEXITY_TIMEOUT', 45))
+        # Tentativi aggiuntivi su errori di rete, 429 e 5xx (backoff esponenziale)
+        self.max_retries = int(os.getenv('PERPLEXITY_MAX_RETRIES', 2))
+        self.retry_backoff = float(os.getenv('PERPLEXITY_RETRY_BACKOFF', 1.0))
         self.headers = {
             "Authorization": f"Bearer {self.api_key}",
             "Content-Type": "application/json"
         }
+        # Secondi senza nuovi token dopo i quali uno stream viene considerato bloccato
+        self.stream_stall_timeout = float(os.getenv('PERPLEXITY_STREAM_STALL_TIMEOUT', 15))
+        self.prompt_builder = PromptBuilder()
         print("✅ PerplexityClient inizializzato con successo")
 
-    def generate_article(self, match_data):
+    def generate_article(self, match_data, stream=False, on_delta=None):
         """
         Genera un articolo sportivo dettagliato usando i dati match_data.
+
+        Con stream=True consuma lo stream SSE del provider e chiama
+        on_delta(testo_parziale) ad ogni nuovo frammento ricevuto.
+        """
+        return self.generate_article_with_metrics(match_data, stream, on_delta)['content']
+
+    def generate_article_with_metrics(self, match_data, stream=False, on_delta=None):
         """
+        Come generate_article, ma restituisce un dizionario con il contenuto e
+        le metriche della richiesta: versione e dimensione del prompt, latenza
+        della risposta in millisecondi e se è stato usato il fallback.
+        """
+        result = {
+            'prompt_version': PROMPT_VERSION,
+            'prompt_tokens': None,
+            'prompt_chars': None,
+            'latency_ms': None,
+            'is_fallback': False,
+            'error': None,
+        }
+
+        start = time.perf_counter()
         try:
-            prompt = self._build_prompt(match_data)
+            prompt, metrics = self.prompt_builder.build(match_data)
+            result['prompt_tokens'] = metrics['prompt_tokens']
+            result['prompt_chars'] = metrics['prompt_chars']
+            if metrics['dropped_sections']:
+                print(f"✂️ Prompt ridotto per budget ({metrics['token_budget']} token): {', '.join(metrics['dropped_sections'])}")
+
             payload = {
-                "model": "sonar-pro",
+                "model": self.model,
                 "messages": [
                     {
                         "role": "system",
@@ -95,172 +77,119 @@ class PerplexityClient:
                 ],
                 "max_tokens": 1500,
                 "temperature": 0.6,
-                "stream": False
+                "stream": stream
             }
 
-            response = requests.post(self.base_url, json=payload, headers=self.headers, timeout=45)
-            response.raise_for_status()
+            content = self._with_retries(payload, stream, on_delta)
 
-            result = response.json()
-            content = result['choices'][0]['message']['content'].strip()
-            content = re.sub(r"^\s*```(?:html)?\s*", "", content, flags=re.IGNORECASE)
-            content = re.sub(r"\s*```\s*$", "", content).strip()
+            content = self._clean_content(content)
+            if not content:
+                raise ValueError("Risposta vuota dal provider")
 
-            print(f"✅ Articolo generato - lunghezza: {len(content)} caratteri")
-            return content
+            print(f"✅ Articolo generato - lunghezza: {len(content)} caratteri, prompt ~{result['prompt_tokens']} token")
+            result['content'] = content
 
         except requests.exceptions.RequestException as req_err:
             print(f"❌ Errore nella chiamata API: {req_err}")
-            return self._fallback_article(match_data, f"Errore API: {req_err}")
+            result['content'] = self._fallback_article(match_data, f"Errore API: {req_err}")
+            result['is_fallback'] = True
+            result['error'] = f"Errore API: {req_err}"
         except Exception as e:
             print(f"💥 Errore inatteso: {e}")
-            return self._fallback_article(match_data, str(e))
+            result['content'] = self._fallback_article(match_data, str(e))
+            result['is_fallback'] = True
+            result['error'] = str(e)
 
-    def _build_prompt(self, match_data):
+        result['latency_ms'] = int((time.perf_counter() - start) * 1000)
+        return result
+
+    def _with_retries(self, payload, stream, on_delta):
         """
-        Costruisce prompt dettagliato e strutturato usando i dati di partita estratti.
+        Esegue la richiesta ritentando gli errori transitori. Uno stream che ha
+        già prodotto testo non viene ritentato, per non duplicare il contenuto
+        parziale già mostrato.
         """
-        home_team = match_data.get('home_team', 'Casa')
-        away_team = match_data.get('away_team', 'Trasferta')
+        received = {'any': False}
 
-        # ✅ Usa il punteggio reale per determinare il risultato della partita
-        real_home_score = match_data.get('home_score', 0)
-        real_away_score = match_data.get('away_score', 0)
+        def track(partial):
+            received['any'] = True
+            if on_delta:
+                on_delta(partial)
 
-        # ✅ Usa il punteggio fantacalcio per il riepilogo
-        try:
-            fantasy_home_score = float(match_data.get('home_total', 0))
-        except (ValueError, TypeError):
-            fantasy_home_score = 0.0
+        attempt = 0
+        while True:
+            try:
+                if stream:
+                    return self._stream_completion(payload, track)
 
-        try:
-            fantasy_away_score = float(match_data.get('away_total', 0))
-        except (ValueError, TypeError):
-            fantasy_away_score = 0.0
-            
-        gameweek = match_data.get('gameweek', 'N/A')
+                response = requests.post(self.base_url, json=payload, headers=self.headers, timeout=self.timeout)
+                response.raise_for_status()
 
-        players_info = self._format_players_info(match_data)
+                result = response.json()
+                return result['choices'][0]['message']['content']
 
-        summary = (
-            f"**RIEPILOGO PARTITA DAL PARSER:** 🏠 Casa: {len(match_data.get('home_players', []))} titolari + "
-            f"{len(match_data.get('home_bench', []))} panchina = {fantasy_home_score:.1f} punti totali ✈️ Trasferta: "
-            f"{len(match_data.get('away_players', []))} titolari + {len(match_data.get('away_bench', []))} panchina = "
-            f"{fantasy_away_score:.1f} punti totali"
-        )
+            except requests.exceptions.RequestException as req_err:
+                status = getattr(req_err.response, 'status_code', None)
+                retryable = status is None or status == 429 or status >= 500
+                if not retryable or received['any'] or attempt >= self.max_retries:
+                    raise
 
-        # Determina il risultato basato sul punteggio reale
-        if real_home_score > real_away_score:
-            result = f"vittoria di {home_team}"
-        elif real_away_score > real_home_score:
-            result = f"vittoria di {away_team}"
-        else:
-            result = "pareggio"
+                attempt += 1
+                delay = self.retry_backoff * (2 ** (attempt - 1))
+                print(f"🔁 Tentativo {attempt}/{self.max_retries} tra {delay:.1f}s dopo errore: {req_err}")
+                time.sleep(delay)
 
-        # Recupera personalizzazioni squadra
-        home_custom = TEAM_CUSTOMIZATIONS.get(home_team, {})
-        stadio_home = home_custom.get('stadio', 'Stadio Sconosciuto')
-        allenatore_home = home_custom.get('allenatore', 'Allenatore Sconosciuto')
-        nomignolo_home = home_custom.get('nomignolo', '')
-
-        # Recupera personalizzazioni squadra ospite
-        away_custom = TEAM_CUSTOMIZATIONS.get(away_team, {})
-        stadio_away = away_custom.get('stadio', 'Stadio Sconosciuto')
-        allenatore_away = away_custom.get('allenatore', 'Allenatore Sconosciuto')
-        nomignolo_away = away_custom.get('nomignolo', '')
-        # Istruzioni fondamentali per l'AI
-        base_instructions = (
-            f"Sei un giornalista sportivo esperto di fantacalcio italiano. "
-            f"Scrivi articoli che non superino i 2000 caratteri. "
-            f"Devi scrivere un articolo di cronaca sportiva usando ESCLUSIVAMENTE i dati reali che ti fornirò. "
-            f"Enfatizza nomi, punteggi e statistiche e scrivili sempre in grassetto"
-            f"Segui rigidamente la struttura HTML e le sezioni che ti indico. "
-            f"NON inventare mai nomi, punteggi o formazioni. "
-            f"Includi sempre i nomi dei giocatori forniti. L'articolo deve essere completo e non interrotto."
-        )
-
-        # Prompt con struttura rigida
-        prompt = (
-            f"{base_instructions}\n\n"
-            f"DATI PARTITA:\n"
-            f"PARTITA: {home_team} vs {away_team}\n"
-            f"RISULTATO: {home_team} {real_home_score} - {real_away_score} {away_team}\n" # ✅ Usa punteggio reale qui
-            f"GIORNATA: {gameweek}\n"
-            f"RIEPILOGO STATISTICHE: {summary}\n"
-            f"GIOCATORI E PUNTI FANTACALCIO REALI: {players_info}\n\n"
-            f"STRUTTURA ARTICOLO (FORMATO HTML):\n\n"
-            f"<h2>{home_team} vs {away_team}</h2>\n\n"
-            f"<h3>Il Resoconto della Partita</h3>\n"
-            f"<p>La partita si è giocata al <strong>{stadio_home}</strong>. Analizza il match e commenta il risultato finale di <strong>{real_home_score}</strong>-<strong>{real_away_score}</strong>.</p>\n\n"
-            f"<p>Descrivi l'andamento del match. Commenta i punteggi totali e il risultato finale.</p>\n\n"
-            f"<p>Commenta le scelte tattiche di <strong>{allenatore_home}</strong> e <strong>{allenatore_away}</strong>.Utilizza spesso ma non sempre <strong>{nomignolo_home}</strong> e ,<strong>{nomignolo_away}</strong>.</p>\n\n"
-            f"<h3>I Migliori in Campo</h3>\n"
-            f"<p>Analizza le prestazioni dei giocatori che hanno ottenuto i punteggi più alti (>8.0). Menziona almeno 3-4 nomi e il loro contributo.</p>\n\n"
-            f"<h3>Le delusioni e i Flop</h3>\n"
-            f"<p>Identifica i giocatori che hanno avuto un rendimento deludente (<6.0). Commenta il loro punteggio e come ha influenzato il risultato della loro squadra.</p>\n\n"
-            f"<h3>Conclusione</h3>\n"
-            f"<p>Riassumi i punti salienti della partita e le sue implicazioni per la classifica. Chiudi con una frase d'impatto.</p>"
-        )
-
-        return prompt
-
-    def _format_players_info(self, match_data):
+    def _stream_completion(self, payload, on_delta=None):
         """
-        Format info giocatori dal dizionario match_data in testo leggibile per prompt.
+        Consuma lo stream SSE (chat completions) e restituisce il testo completo.
+        Il timeout di lettura vale tra un frammento e l'altro: uno stream fermo
+        viene interrotto dopo stream_stall_timeout secondi invece di attendere
+        la fine della richiesta.
         """
-        lines = []
-
-        def format_players(title, players):
-            lines.append(f"\n**{title}:**")
-            for p in players[:11]:  # solo titolari o primi 11
-                name = p.get('name', 'Sconosciuto')
-                role = p.get('role', 'N/A')
-
-                fv = p.get('fanta_vote')
-                if fv is None:
-                    fv_str = "N/A"
-                else:
-                    fv_str = f"{fv:.1f}"
-
-                v = p.get('vote')
-                if v is None:
-                    v_str = ""
-                else:
-                    v_str = f"{v:.1f}"
+        parts = []
+        with requests.post(self.base_url, json=payload, headers=self.headers,
+                           timeout=(10, self.stream_stall_timeout), stream=True) as response:
+            response.raise_for_status()
+            # text/event-stream senza charset verrebbe decodificato come ISO-8859-1:
+            # lo stream è sempre UTF-8 (accenti italiani)
+            response.encoding = 'utf-8'
 
-                played = p.get('played', False)
-                if not played:
-                    line = f"- {name} ({role}) - NON SCHIERATO"
-                else:
-                    line = f"- {name} ({role}) - Voto: {v_str}, FantaVoto: {fv_str}"
+            for line in response.iter_lines(decode_unicode=True):
+                if not line or not line.startswith('data:'):
+                    continue
 
-                lines.append(line)
+                data = line[len('data:'):].strip()
+                if data == '[DONE]':
+                    break
 
-        home_players = match_data.get('home_players', [])
-        away_players = match_data.get('away_players', [])
-        home_bench = match_data.get('home_bench', [])
-        away_bench = match_data.get('away_bench', [])
+                chunk = json.loads(data)
+                choices = chunk.get('choices') or [{}]
+                delta = choices[0].get('delta', {}).get('content')
+                if not delta:
+                    continue
 
-        format_players(f"{match_data.get('home_team', 'Casa')} (TITOLARI)", home_players)
-        format_players(f"{match_data.get('away_team', 'Trasferta')} (TITOLARI)", away_players)
+                parts.append(delta)
+                if on_delta:
+                    on_delta(self._clean_content("".join(parts)))
 
-        # Opzionale: aggiungi info panchina se vuoi
-        # lines.append("\n**Panchina Casa:**")
-        # for p in home_bench:
-        #     lines.append(f"- {p.get('name', 'Sconosciuto')} ({p.get('role', 'N/A')})")
+                if choices[0].get('finish_reason'):
+                    break
 
-        # lines.append("\n**Panchina Trasferta:**")
-        # for p in away_bench:
-        #     lines.append(f"- {p.get('name', 'Sconosciuto')} ({p.get('role', 'N/A')})")
+        return "".join(parts)
 
-        # Migliori performance (opzionale)
-        top_performers = match_data.get('player_analysis', {}).get('top_performers', [])
-        if top_performers:
-            lines.append("\nMigliori prestazioni:")
-            for performer in top_performers[:5]:
-                lines.append(f"- {performer}")
+    def _clean_content(self, content):
+        """Rimuove eventuali blocchi ```html ... ``` attorno all'articolo."""
+        content = (content or "").strip()
+        content = re.sub(r"^\s*```(?:html)?\s*", "", content, flags=re.IGNORECASE)
+        content = re.sub(r"\s*```\s*$", "", content).strip()
+        return content
 
-        return "\n".join(lines)
+    def _build_prompt(self, match_data):
+        """
+        Costruisce il prompt strutturato entro il budget di token configurato.
+        """
+        prompt, _ = self.prompt_builder.build(match_data)
+        return prompt
 
     def _fallback_article(self, match_data, error_message):
         """
@@ -0,0 +1,241 @@
+# utils/prompt_builder.py
+"""
+Costruzione del prompt per gli articoli con budget di token.
+
+Il prompt è composto da sezioni con priorità: istruzioni, dati partita e
+struttura HTML sono sempre incluse; totali, migliori, flop, bonus/malus e
+infine le formazioni complete vengono aggiunte in ordine di priorità finché
+la stima dei token resta entro il budget.
+"""
+import os
+
+# Versione del formato prompt, salvata su ogni articolo generato
+PROMPT_VERSION = 2
+
+# Stima grossolana: ~4 caratteri per token per testo italiano con markup
+CHARS_PER_TOKEN = 4
+
+DEFAULT_TOKEN_BUDGET = int(os.getenv('PROMPT_TOKEN_BUDGET', 1200))
+
+TEAM_CUSTOMIZATIONS = {
+    '21 CANNELLONI FC' : {
+        'stadio': 'Merisacchio Stadium',
+        'allenatore': 'Giovanni',
+        'nomignolo': 'il principe ereditiero',
+    },
+    'L SGARRUPATI' : {
+        'stadio': 'UK Arena',
+        'allenatore': 'Antonio Pot',
+        'direttore sportivo': 'Michele',
+        'nomignolo': 'Sir Antonio D\'Inghilterra'
+    },
+    'SPARTAK J&N' : {
+        'stadio': 'Malito Stadium',
+        'allenatore': 'Luigi',
+        'nomignolo': 'u putigaru'
+    },
+    'MANCHESTORS CITY' : {
+        'stadio': 'Montebeltrano Stadium',
+        'allenatore': 'Carmelo',
+        'nomignolo': 'Orso'
+    },
+    'ESTATHEO' : {
+        'stadio': 'Comunale di Grimaldi',
+        'allenatore': 'Bruno',
+        'nomignolo': 'Mister Bruno'
+    },
+    'FC CELL-TIC GLASGOW' : {
+        'stadio': 'Vasciuta UPower',
+        'allenatore': 'Gaetano',
+        'nomignolo': 'Tano'
+    },
+    'A.S. DONALD DUCK' : {
+        'stadio': 'Paperopoli Stadium',
+        'allenatore': 'Antonio Pucci',
+        'nomignolo': 'il professore'
+    },
+    'MBARCATURA © FC' : {
+        'stadio': 'Stadio Mbarcatura',
+        'allenatore': 'Riccardo',
+        'nomignolo': 'Rick'
+    },
+    'EPICTOMINELLO' : {
+        'stadio': 'BarberShop Stadium',
+        'allenatore': 'Giovanni',
+        'nomignolo': 'Mozzo'
+    },
+    'NK MAURIBOR'   : {
+        'stadio': 'Peroni Arena',
+        'allenatore': 'Mauro',
+        'nomignolo': 'il catanzarese'
+    },
+  
+ }
+
+
+def estimate_tokens(text):
+    """Stima il numero di token di un testo (senza tokenizer)."""
+    if not text:
+        return 0
+    return (len(text) + CHARS_PER_TOKEN - 1) // CHARS_PER_TOKEN
+
+
+def _to_float(value):
+    try:
+        return float(value)
+    except (ValueError, TypeError):
+        return 0.0
+
+
+def _format_player(p):
+    name = p.get('name', 'Sconosciuto')
+    role = p.get('role', 'N/A')
+
+    if not p.get('played', False):
+        return f"- {name} ({role}) - NON SCHIERATO"
+
+    v = p.get('vote')
+    fv = p.get('fanta_vote')
+    v_str = f"{v:.1f}" if v is not None else ""
+    fv_str = f"{fv:.1f}" if fv is not None else "N/A"
+    return f"- {name} ({role}) - Voto: {v_str}, FantaVoto: {fv_str}"
+
+
+class PromptBuilder:
+    """Costruisce il prompt di un articolo entro un budget di token stimati."""
+
+    def __init__(self, token_budget=None):
+        self.token_budget = token_budget or DEFAULT_TOKEN_BUDGET
+
+    def build(self, match_data):
+        """
+        Restituisce (prompt, metriche). Le metriche contengono la stima dei
+        token, i caratteri e le sezioni escluse per stare nel budget.
+        """
+        home_team = match_data.get('home_team', 'Casa')
+        away_team = match_data.get('away_team', 'Trasferta')
+
+        # Punteggio reale (gol) per il risultato, punteggio fantacalcio per il riepilogo
+        real_home_score = match_data.get('home_score', 0)
+        real_away_score = match_data.get('away_score', 0)
+        fantasy_home_score = _to_float(match_data.get('home_total', 0))
+        fantasy_away_score = _to_float(match_data.get('away_total', 0))
+        gameweek = match_data.get('gameweek', 'N/A')
+
+        home_custom = TEAM_CUSTOMIZATIONS.get(home_team, {})
+        away_custom = TEAM_CUSTOMIZATIONS.get(away_team, {})
+        stadio_home = home_custom.get('stadio', 'Stadio Sconosciuto')
+        allenatore_home = home_custom.get('allenatore', 'Allenatore Sconosciuto')
+        allenatore_away = away_custom.get('allenatore', 'Allenatore Sconosciuto')
+        nomignolo_home = home_custom.get('nomignolo', '')
+        nomignolo_away = away_custom.get('nomignolo', '')
+
+        # Istruzioni fondamentali per l'AI
+        head = (
+            "Sei un giornalista sportivo esperto di fantacalcio italiano. "
+            "Scrivi articoli che non superino i 2000 caratteri. "
+            "Devi scrivere un articolo di cronaca sportiva usando ESCLUSIVAMENTE i dati reali che ti fornirò. "
+            "Enfatizza nomi, punteggi e statistiche e scrivili sempre in grassetto. "
+            "Segui rigidamente la struttura HTML e le sezioni che ti indico. "
+            "NON inventare mai nomi, punteggi o formazioni. "
+            "Includi sempre i nomi dei giocatori forniti. L'articolo deve essere completo e non interrotto.\n\n"
+            "DATI PARTITA:\n"
+            f"PARTITA: {home_team} vs {away_team}\n"
+            f"RISULTATO: {home_team} {real_home_score} - {real_away_score} {away_team}\n"
+            f"GIORNATA: {gameweek}\n"
+        )
+
+        structure = (
+            "\nSTRUTTURA ARTICOLO (FORMATO HTML):\n\n"
+            f"<h2>{home_team} vs {away_team}</h2>\n\n"
+            "<h3>Il Resoconto della Partita</h3>\n"
+            f"<p>La partita si è giocata al <strong>{stadio_home}</strong>. Analizza il match e commenta il risultato finale di <strong>{real_home_score}</strong>-<strong>{real_away_score}</strong>.</p>\n\n"
+            "<p>Descrivi l'andamento del match. Commenta i punteggi totali e il risultato finale.</p>\n\n"
+            f"<p>Commenta le scelte tattiche di <strong>{allenatore_home}</strong> e <strong>{allenatore_away}</strong>. Utilizza spesso ma non sempre <strong>{nomignolo_home}</strong> e <strong>{nomignolo_away}</strong>.</p>\n\n"
+            "<h3>I Migliori in Campo</h3>\n"
+            "<p>Analizza le prestazioni dei giocatori che hanno ottenuto i punteggi più alti (>8.0). Menziona almeno 3-4 nomi e il loro contributo.</p>\n\n"
+            "<h3>Le delusioni e i Flop</h3>\n"
+            "<p>Identifica i giocatori che hanno avuto un rendimento deludente (<6.0). Commenta il loro punteggio e come ha influenzato il risultato della loro squadra.</p>\n\n"
+            "<h3>Conclusione</h3>\n"
+            "<p>Riassumi i punti salienti della partita e le sue implicazioni per la classifica. Chiudi con una frase d'impatto.</p>"
+        )
+
+        home_players = match_data.get('home_players', [])
+        away_players = match_data.get('away_players', [])
+        home_bench = match_data.get('home_bench', [])
+        away_bench = match_data.get('away_bench', [])
+
+        totals = (
+            f"RIEPILOGO STATISTICHE: {home_team}: {len(home_players)} titolari + {len(home_bench)} panchina = "
+            f"{fantasy_home_score:.1f} punti totali | {away_team}: {len(away_players)} titolari + "
+            f"{len(away_bench)} panchina = {fantasy_away_score:.1f} punti totali\n"
+        )
+
+        played = [p for p in home_players + away_players + home_bench + away_bench
+                  if p.get('played') and p.get('fanta_vote') is not None]
+        analysis = match_data.get('player_analysis', {})
+
+        if played:
+            by_score = sorted(played, key=lambda p: p['fanta_vote'], reverse=True)
+            top = [f"{p['name']} ({p.get('role', 'N/A')}) - {p['fanta_vote']:.1f}" for p in by_score[:5]]
+            flops = [f"{p['name']} ({p.get('role', 'N/A')}) - {p['fanta_vote']:.1f}"
+                     for p in by_score[::-1][:3] if p['fanta_vote'] <= 5.5]
+        else:
+            top = analysis.get('top_performers', [])[:5]
+            flops = analysis.get('poor_performers', [])[:3]
+
+        # Sezioni opzionali in ordine di priorità
+        sections = [
+            ('totals', totals),
+            ('top_performers', self._list_section("MIGLIORI PRESTAZIONI", top)),
+            ('flops', self._list_section("PRESTAZIONI DELUDENTI", flops)),
+            ('bonus_malus', self._list_section(
+                "BONUS/MALUS", analysis.get('bonus_players', [])[:3] + analysis.get('malus_players', [])[:3])),
+        ]
+
+        budget = self.token_budget - estimate_tokens(head) - estimate_tokens(structure)
+        body = []
+        dropped = []
+
+        for name, text in sections:
+            if not text:
+                continue
+            cost = estimate_tokens(text)
+            if cost <= budget:
+                body.append(text)
+                budget -= cost
+            else:
+                dropped.append(name)
+
+        # Formazioni titolari: riga per riga finché c'è budget
+        for team, players in ((home_team, home_players), (away_team, away_players)):
+            if not players:
+                continue
+            header = f"\nGIOCATORI {team} (TITOLARI):"
+            lines = []
+            for p in players[:11]:
+                line = _format_player(p)
+                # L'intestazione si paga solo insieme alla prima riga che entra
+                cost = estimate_tokens(line) + 1 + (0 if lines else estimate_tokens(header))
+                if cost > budget:
+                    dropped.append(f"lineup:{team}")
+                    break
+                lines.append(line)
+                budget -= cost
+            if lines:
+                body.append("\n".join([header] + lines) + "\n")
+
+        prompt = head + "".join(body) + structure
+        metrics = {
+            'prompt_version': PROMPT_VERSION,
+            'prompt_tokens': estimate_tokens(prompt),
+            'prompt_chars': len(prompt),
+            'token_budget': self.token_budget,
+            'dropped_sections': dropped,
+        }
+        return prompt, metrics
+
+    def _list_section(self, title, items):
+        if not items:
+            return ""
+        return f"\n{title}:\n" + "\n".join(f"- {item}" for item in items) + "\n"
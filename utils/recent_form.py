@@ -0,0 +1,196 @@
+# utils/recent_form.py
+"""
+Forma recente ("ultime 5") di squadre e giocatori.
+
+Le ultime FORM_WINDOW partite di ogni squadra/giocatore vengono scelte con
+una window function (ROW_NUMBER() OVER (PARTITION BY ... ORDER BY giornata
+DESC)), insieme alla media complessiva (AVG() OVER) per calcolare il trend.
+Il risultato è salvato in TeamForm/PlayerForm e ricalcolato in ingestione
+solo per le squadre e i giocatori toccati: le pagine fanno una sola lettura.
+"""
+import os
+from collections import defaultdict
+from sqlalchemy import and_, func, select
+from extensions import db
+from models import Match, PlayerForm, PlayerStat, TeamForm
+from utils.scoring import DRAW, LOSS, WIN, outcome
+from utils.standings_sql import match_perspectives
+
+FORM_WINDOW = int(os.getenv('FORM_WINDOW', 5))
+
+RESULT_LETTERS = {WIN: 'V', DRAW: 'N', LOSS: 'P'}
+
+
+def _team_window_query(team_names=None):
+    """Ultime FORM_WINDOW partite di ogni (stagione, squadra), con la media stagionale."""
+    p = match_perspectives()
+    partition = (p.c.season_id, p.c.team_name)
+    ranked = select(
+        p.c.season_id,
+        p.c.team_name,
+        p.c.gameweek,
+        p.c.points_for,
+        p.c.goals_for,
+        p.c.goals_against,
+        func.row_number().over(partition_by=partition,
+                               order_by=(p.c.gameweek.desc(), p.c.match_id.desc())).label('rn'),
+        func.avg(p.c.points_for).over(partition_by=partition).label('season_avg'),
+    )
+    if team_names is not None:
+        ranked = ranked.where(p.c.team_name.in_(team_names))
+    ranked = ranked.subquery('ranked')
+    return (select(ranked)
+            .where(ranked.c.rn <= FORM_WINDOW)
+            .order_by(ranked.c.season_id, ranked.c.team_name, ranked.c.rn.desc()))
+
+
+def _player_window_query(player_ids=None):
+    """Ultime FORM_WINDOW presenze con voto di ogni giocatore, con la fantamedia complessiva."""
+    # In ingestione i voti mancanti vengono salvati come 0.0: contano solo le presenze a voto
+    played = and_(PlayerStat.vote > 0, PlayerStat.fanta_vote > 0)
+    ranked = (
+        select(
+            PlayerStat.player_id,
+            PlayerStat.vote,
+            PlayerStat.fanta_vote,
+            PlayerStat.goals,
+            PlayerStat.assists,
+            func.row_number().over(partition_by=PlayerStat.player_id,
+                                   order_by=(Match.gameweek.desc(), Match.id.desc())).label('rn'),
+            func.avg(PlayerStat.fanta_vote).over(partition_by=PlayerStat.player_id).label('overall_avg'),
+        )
+        .join(Match, Match.id == PlayerStat.match_id)
+        .where(played)
+    )
+    if player_ids is not None:
+        ranked = ranked.where(PlayerStat.player_id.in_(player_ids))
+    ranked = ranked.subquery('ranked')
+    return (select(ranked)
+            .where(ranked.c.rn <= FORM_WINDOW)
+            .order_by(ranked.c.player_id, ranked.c.rn.desc()))
+
+
+def refresh_team_forms(team_names=None):
+    """Ricalcola TeamForm per le squadre indicate (tutte se None)."""
+    groups = defaultdict(list)
+    for row in db.session.execute(_team_window_query(team_names)).mappings():
+        groups[(row['season_id'], row['team_name'])].append(row)
+
+    existing = TeamForm.query
+    if team_names is not None:
+        existing = existing.filter(TeamForm.team_name.in_(team_names))
+    existing.delete(synchronize_session=False)
+
+    for (season_id, team_name), rows in groups.items():
+        avg_points = sum(r['points_for'] or 0.0 for r in rows) / len(rows)
+        db.session.add(TeamForm(
+            season_id=season_id,
+            team_name=team_name,
+            matches=len(rows),
+            results=''.join(RESULT_LETTERS[outcome(r['goals_for'], r['goals_against'])] for r in rows),
+            avg_points=avg_points,
+            goals_for=sum(int(r['goals_for']) for r in rows),
+            goals_against=sum(int(r['goals_against']) for r in rows),
+            trend=avg_points - float(rows[0]['season_avg'] or 0.0),
+        ))
+    return len(groups)
+
+
+def refresh_player_forms(player_ids=None):
+    """Ricalcola PlayerForm per i giocatori indicati (tutti se None)."""
+    groups = defaultdict(list)
+    for row in db.session.execute(_player_window_query(player_ids)).mappings():
+        groups[row['player_id']].append(row)
+
+    existing = PlayerForm.query
+    if player_ids is not None:
+        existing = existing.filter(PlayerForm.player_id.in_(player_ids))
+    existing.delete(synchronize_session=False)
+
+    for player_id, rows in groups.items():
+        avg_fanta_vote = sum(r['fanta_vote'] for r in rows) / len(rows)
+        db.session.add(PlayerForm(
+            player_id=player_id,
+            matches=len(rows),
+            avg_vote=sum(r['vote'] for r in rows) / len(rows),
+            avg_fanta_vote=avg_fanta_vote,
+            goals=sum(r['goals'] or 0 for r in rows),
+            assists=sum(r['assists'] or 0 for r in rows),
+            fanta_votes=';'.join(f"{r['fanta_vote']:g}" for r in rows),
+            trend=avg_fanta_vote - float(rows[0]['overall_avg']),
+        ))
+    return len(groups)
+
+
+def refresh_teams_for(matches):
+    """Aggiorna la forma delle squadre delle partite indicate."""
+    team_names = {match.home_team for match in matches} | {match.away_team for match in matches}
+    refresh_team_forms(sorted(team_names))
+
+
+def refresh_players_for(matches):
+    """Aggiorna la forma dei giocatori con statistiche nelle partite indicate."""
+    match_ids = [match.id for match in matches]
+    player_ids = [player_id for (player_id,) in (db.session.query(PlayerStat.player_id)
+                                                 .filter(PlayerStat.match_id.in_(match_ids))
+                                                 .distinct())]
+    if player_ids:
+        refresh_player_forms(player_ids)
+
+
+def refresh_for_matches(matches):
+    """Aggiorna la forma di squadre e giocatori delle partite indicate."""
+    refresh_teams_for(matches)
+    refresh_players_for(matches)
+
+
+def rebuild_forms():
+    """Ricalcola da zero la forma di tutte le squadre e di tutti i giocatori."""
+    teams = refresh_team_forms()
+    players = refresh_player_forms()
+    db.session.commit()
+    return teams, players
+
+
+def get_team_form(team_name, season_id=None):
+    """Forma della squadra come dizionario (None se non ha ancora giocato)."""
+    query = TeamForm.query.filter_by(team_name=team_name)
+    if season_id is not None:
+        query = query.filter_by(season_id=season_id)
+    row = query.order_by(TeamForm.season_id.desc()).first()
+    if row is None:
+        return None
+    return {
+        'matches': row.matches,
+        'results': list(row.results),
+        'avg_points': row.avg_points,
+        'goals_for': row.goals_for,
+        'goals_against': row.goals_against,
+        'trend': row.trend,
+    }
+
+
+def _player_form_dict(row):
+    return {
+        'matches': row.matches,
+        'avg_vote': row.avg_vote,
+        'avg_fanta_vote': row.avg_fanta_vote,
+        'goals': row.goals,
+        'assists': row.assists,
+        'fanta_votes': [float(v) for v in row.fanta_votes.split(';') if v],
+        'trend': row.trend,
+    }
+
+
+def get_player_form(player_id):
+    """Forma del giocatore come dizionario (None se non ha presenze a voto)."""
+    row = PlayerForm.query.filter_by(player_id=player_id).first()
+    return _player_form_dict(row) if row else None
+
+
+def get_player_forms(player_ids):
+    """{player_id: forma} per più giocatori in una sola query (es. la rosa di una squadra)."""
+    if not player_ids:
+        return {}
+    rows = PlayerForm.query.filter(PlayerForm.player_id.in_(player_ids))
+    return {row.player_id: _player_form_dict(row) for row in rows}
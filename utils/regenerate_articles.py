@@ -0,0 +1,188 @@
+# utils/regenerate_articles.py
+"""
+Rigenerazione selettiva degli articoli a partire dai dati già salvati.
+
+match_data viene ricostruito da Match/PlayerStat, quindi non serve
+ricaricare i tabellini. L'avanzamento è salvato in un file di checkpoint:
+un'esecuzione interrotta riparte saltando gli articoli già rigenerati.
+"""
+import json
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from sqlalchemy import or_
+from sqlalchemy.orm import joinedload
+from extensions import db
+from models import Article, Match, Player, PlayerStat
+from utils.article_generator import generate_match_article
+
+# Testi che identificano un articolo di fallback (client AI e pipeline admin)
+FALLBACK_MARKERS = [
+    'Articolo generato automaticamente',
+    '<p>Partita conclusa',
+]
+
+
+def build_match_data(match):
+    """Ricostruisce il dizionario match_data usato dal prompt da Match/PlayerStat."""
+    stats = (PlayerStat.query
+             .options(joinedload(PlayerStat.player).joinedload(Player.team))
+             .filter_by(match_id=match.id)
+             .order_by(PlayerStat.id)
+             .all())
+
+    lineups = {
+        match.home_team: {'players': [], 'bench': []},
+        match.away_team: {'players': [], 'bench': []},
+    }
+
+    for stat in stats:
+        team_name = stat.player.team.name if stat.player and stat.player.team else None
+        if team_name not in lineups:
+            continue
+
+        # In ingestione i voti mancanti vengono salvati come 0.0
+        played = bool(stat.vote) and bool(stat.fanta_vote)
+        player = {
+            'name': stat.player.name,
+            'role': stat.player.role or 'N/A',
+            'vote': stat.vote if played else None,
+            'fanta_vote': stat.fanta_vote if played else None,
+            'played': played,
+        }
+        lineups[team_name]['players' if stat.is_starter else 'bench'].append(player)
+
+    return {
+        'home_team': match.home_team,
+        'away_team': match.away_team,
+        'home_score': match.home_goals,
+        'away_score': match.away_goals,
+        'home_total': match.home_score,
+        'away_total': match.away_score,
+        'gameweek': match.gameweek,
+        'home_players': lineups[match.home_team]['players'],
+        'away_players': lineups[match.away_team]['players'],
+        'home_bench': lineups[match.home_team]['bench'],
+        'away_bench': lineups[match.away_team]['bench'],
+        'player_analysis': {},
+    }
+
+
+def select_articles(prompt_version=None, outdated=False, since=None, until=None,
+                    gameweek=None, fallback_only=False):
+    """
+    Restituisce la query degli articoli da rigenerare.
+
+    prompt_version: solo articoli generati con quella versione del prompt
+    outdated: articoli senza versione o con versione precedente a current
+    since/until: intervallo su created_at (datetime)
+    gameweek: solo articoli di quella giornata
+    fallback_only: solo articoli di fallback (generazione AI fallita)
+    """
+    query = Article.query.join(Match, Article.match_id == Match.id)
+
+    if prompt_version is not None:
+        query = query.filter(Article.prompt_version == prompt_version)
+    if outdated:
+        from utils.prompt_builder import PROMPT_VERSION
+        query = query.filter(or_(Article.prompt_version.is_(None), Article.prompt_version < PROMPT_VERSION))
+    if since is not None:
+        query = query.filter(Article.created_at >= since)
+    if until is not None:
+        query = query.filter(Article.created_at < until)
+    if gameweek is not None:
+        query = query.filter(Match.gameweek == gameweek)
+    if fallback_only:
+        query = query.filter(or_(*[Article.content.contains(marker) for marker in FALLBACK_MARKERS]))
+
+    return query.order_by(Article.id)
+
+
+def matches_without_article(gameweek=None):
+    """Partite che non hanno ancora nessun articolo."""
+    query = Match.query.outerjoin(Article, Article.match_id == Match.id).filter(Article.id.is_(None))
+    if gameweek is not None:
+        query = query.filter(Match.gameweek == gameweek)
+    return query.order_by(Match.id)
+
+
+class Checkpoint:
+    """File JSON con i filtri della selezione e le chiavi già completate."""
+
+    def __init__(self, path, selection):
+        self.path = path
+        self.selection = selection
+        self.done = set()
+        self.lock = threading.Lock()
+
+    def load(self):
+        if not os.path.exists(self.path):
+            return False
+        with open(self.path, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+        if data.get('selection') != self.selection:
+            raise ValueError(
+                f"Il checkpoint {self.path} appartiene a una selezione diversa: "
+                f"usa --restart o un altro --checkpoint"
+            )
+        self.done = set(data.get('done', []))
+        return True
+
+    def mark(self, key):
+        with self.lock:
+            self.done.add(key)
+            self._write()
+
+    def _write(self):
+        # Scrittura atomica: un'interruzione non lascia il file a metà
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump({'selection': self.selection, 'done': sorted(self.done)}, f)
+        os.replace(tmp_path, self.path)
+
+    def clear(self):
+        if os.path.exists(self.path):
+            os.remove(self.path)
+
+
+def regenerate_articles(app, client, jobs, checkpoint, max_workers=1, log=print):
+    """
+    Rigenera gli articoli in parallelo. jobs è una lista di (chiave, match_id,
+    article_id) dove article_id è None per le partite senza articolo.
+    Restituisce (rigenerati, falliti).
+    """
+    pending = [job for job in jobs if job[0] not in checkpoint.done]
+    log(f"📋 {len(jobs)} articoli selezionati, {len(jobs) - len(pending)} già completati nel checkpoint")
+
+    def run(job):
+        key, match_id, article_id = job
+        with app.app_context():
+            match = db.session.get(Match, match_id)
+            article = db.session.get(Article, article_id) if article_id else None
+            try:
+                # Con il fallback del provider l'articolo resta com'era e il job
+                # fallisce: non entra nel checkpoint e verrà ritentato
+                generate_match_article(client, match, build_match_data(match), article=article,
+                                       save_fallback=False)
+                db.session.commit()
+            except Exception:
+                db.session.rollback()
+                raise
+            return key, f"{match.home_team} vs {match.away_team}"
+
+    regenerated = failed = 0
+    with ThreadPoolExecutor(max_workers=max(1, max_workers), thread_name_prefix='regen') as executor:
+        futures = {executor.submit(run, job): job for job in pending}
+        for future in as_completed(futures):
+            try:
+                key, label = future.result()
+            except Exception as e:
+                failed += 1
+                log(f"⚠️ Errore rigenerazione {futures[future][0]}: {e}")
+                continue
+
+            checkpoint.mark(key)
+            regenerated += 1
+            log(f"✅ [{regenerated}/{len(pending)}] Rigenerato: {label}")
+
+    return regenerated, failed
@@ -0,0 +1,141 @@
+# utils/response_cache.py
+"""
+Cache delle pagine pubbliche già renderizzate (cachetools).
+
+La chiave è (endpoint, path, query string normalizzata, versione dei dati):
+dopo la pubblicazione di una giornata la prima richiesta di ogni URL
+rigenera la pagina e tutte le successive ricevono il corpo salvato senza
+passare da SQLAlchemy o Jinja. Il limite è in byte (LRUCache con
+getsizeof), non in numero di pagine. Accanto al corpo viene salvata la
+versione gzip (utils/compression), così ogni pagina è compressa una volta.
+
+Si salvano solo le risposte 200: le viste che intercettano un errore del
+database rispondono 503, così una pagina vuota non resta in cache per
+tutta la versione.
+
+Configurazione da variabili d'ambiente:
+    RESPONSE_CACHE_ENABLED=false          disattiva la cache
+    RESPONSE_CACHE_BYTES=67108864         dimensione massima (default 64 MB)
+    RESPONSE_CACHE_DISABLED_ROUTES=stats  endpoint esclusi, separati da virgola
+"""
+import os
+import threading
+from collections import defaultdict, namedtuple
+from functools import wraps
+from urllib.parse import urlencode
+from cachetools import LRUCache
+from flask import Response, make_response, request
+from utils import compression, data_version
+
+CachedResponse = namedtuple('CachedResponse', 'status content_type body gzip_body')
+
+# Costo fisso stimato di una voce (chiave, tupla, header) oltre al corpo
+ENTRY_OVERHEAD = 512
+
+
+def _entry_size(entry):
+    return len(entry.body) + len(entry.gzip_body or b'') + ENTRY_OVERHEAD
+
+
+def _to_response(entry):
+    if entry.gzip_body is not None and compression.accepts_gzip():
+        return compression.mark_compressed(
+            Response(entry.gzip_body, status=entry.status, content_type=entry.content_type))
+    return Response(entry.body, status=entry.status, content_type=entry.content_type)
+
+
+class ResponseCache:
+
+    def __init__(self, max_bytes=64 * 1024 * 1024, enabled=True, disabled_routes=()):
+        self.enabled = enabled
+        self.routes = {}  # endpoint -> abilitato
+        self._disabled_routes = set(disabled_routes)
+        self._cache = LRUCache(maxsize=max_bytes, getsizeof=_entry_size)
+        self._version = None
+        self._lock = threading.Lock()
+        self.hits = defaultdict(int)
+        self.misses = defaultdict(int)
+
+    @classmethod
+    def from_env(cls):
+        disabled = [name.strip() for name in os.getenv('RESPONSE_CACHE_DISABLED_ROUTES', '').split(',') if name.strip()]
+        return cls(
+            max_bytes=int(os.getenv('RESPONSE_CACHE_BYTES', 64 * 1024 * 1024)),
+            enabled=os.getenv('RESPONSE_CACHE_ENABLED', 'True').lower() == 'true',
+            disabled_routes=disabled,
+        )
+
+    def set_enabled(self, endpoint, enabled=True):
+        """Abilita o disabilita la cache per un singolo endpoint."""
+        self.routes[endpoint] = enabled
+        if not enabled:
+            self.clear()
+
+    def _key(self, endpoint, version):
+        query = urlencode(sorted(request.args.items(multi=True)))
+        return endpoint, request.path, query, version
+
+    def get(self, key):
+        with self._lock:
+            # Alla prima richiesta di una nuova versione le pagine vecchie non servono più
+            if key[-1] != self._version:
+                self._cache.clear()
+                self._version = key[-1]
+                return None
+            return self._cache.get(key)
+
+    def put(self, key, entry):
+        with self._lock:
+            if key[-1] != self._version:
+                return
+            try:
+                self._cache[key] = entry
+            except ValueError:
+                pass  # pagina più grande dell'intera cache: non si salva
+
+    def clear(self):
+        with self._lock:
+            self._cache.clear()
+
+    def cached(self, view):
+        """Decoratore per le viste pubbliche in sola lettura (GET)."""
+        endpoint = view.__name__
+        self.routes.setdefault(endpoint, endpoint not in self._disabled_routes)
+
+        @wraps(view)
+        def decorated(*args, **kwargs):
+            if not (self.enabled and self.routes.get(endpoint)) or request.method not in ('GET', 'HEAD'):
+                return view(*args, **kwargs)
+
+            key = self._key(endpoint, data_version.current_version())
+            entry = self.get(key)
+            if entry is not None:
+                self.hits[endpoint] += 1
+                return _to_response(entry)
+
+            self.misses[endpoint] += 1
+            response = make_response(view(*args, **kwargs))
+            if response.status_code == 200 and not response.is_streamed and 'Set-Cookie' not in response.headers:
+                body = response.get_data()
+                gzip_body = compression.compress(body) if compression.is_compressible(response.mimetype, len(body)) else None
+                entry = CachedResponse(response.status_code, response.content_type, body, gzip_body)
+                self.put(key, entry)
+                return _to_response(entry)
+            return response
+        return decorated
+
+    def stats(self):
+        """Contatori per endpoint e occupazione attuale."""
+        with self._lock:
+            entries, size = len(self._cache), self._cache.currsize
+        return {
+            'enabled': self.enabled,
+            'entries': entries,
+            'bytes': size,
+            'max_bytes': self._cache.maxsize,
+            'version': self._version,
+            'routes': {
+                endpoint: {'enabled': enabled, 'hits': self.hits[endpoint], 'misses': self.misses[endpoint]}
+                for endpoint, enabled in sorted(self.routes.items())
+            },
+        }
@@ -0,0 +1,186 @@
+# utils/scoring.py
+"""
+Regole di punteggio del fantacalcio in un unico posto.
+
+- conversione punti fantacalcio → gol (soglia del primo gol e ampiezza
+  di ogni gol successivo, configurabili per lega/stagione)
+- esito della partita (V/N/P) e punti in classifica
+
+Ogni funzione ha una versione scalare (per la singola partita) e una
+vettoriale NumPy che lavora su array di punteggi, usata da
+classifica e statistiche.
+
+Le regole per stagione si configurano con la variabile d'ambiente
+SCORING_RULES, un JSON {id_stagione: {campo: valore}}, ad esempio:
+    SCORING_RULES='{"2": {"first_goal": 70, "goal_step": 5}}'
+"""
+import json
+import os
+from collections import namedtuple
+import numpy as np
+
+ScoringRules = namedtuple('ScoringRules', 'first_goal goal_step win draw loss')
+
+# 66 punti = 1 gol, poi +1 gol ogni 6 punti; 3 punti vittoria, 1 pareggio
+DEFAULT_RULES = ScoringRules(first_goal=66.0, goal_step=6.0, win=3, draw=1, loss=0)
+
+# Esiti restituiti da outcome()/outcomes()
+WIN, DRAW, LOSS = 1, 0, -1
+
+
+def _load_league_rules():
+    raw = os.getenv('SCORING_RULES')
+    if not raw:
+        return {}
+    rules = {}
+    for season_id, overrides in json.loads(raw).items():
+        rules[int(season_id)] = DEFAULT_RULES._replace(**overrides)
+    return rules
+
+
+LEAGUE_RULES = _load_league_rules()
+
+
+def get_rules(season_id=None):
+    """Regole della stagione indicata (o quelle di default)."""
+    return LEAGUE_RULES.get(season_id, DEFAULT_RULES)
+
+
+# ===== VERSIONE SCALARE =====
+
+def points_to_goals(points, rules=DEFAULT_RULES):
+    """Converte un punteggio fantacalcio in gol."""
+    if points is None or points < rules.first_goal:
+        return 0
+    return 1 + int((points - rules.first_goal) // rules.goal_step)
+
+
+def outcome(goals_for, goals_against):
+    """WIN, DRAW o LOSS dal punto di vista di chi ha segnato goals_for."""
+    if goals_for > goals_against:
+        return WIN
+    if goals_for < goals_against:
+        return LOSS
+    return DRAW
+
+
+def outcome_points(result, rules=DEFAULT_RULES):
+    """Punti in classifica per un esito."""
+    if result == WIN:
+        return rules.win
+    if result == LOSS:
+        return rules.loss
+    return rules.draw
+
+
+# ===== VERSIONE VETTORIALE =====
+
+def goals_array(points, first_goal=DEFAULT_RULES.first_goal, goal_step=DEFAULT_RULES.goal_step):
+    """
+    Versione vettoriale di points_to_goals. first_goal e goal_step possono
+    essere scalari o array della stessa lunghezza (regole diverse per
+    stagione). I punteggi mancanti (NaN) valgono 0 gol.
+    """
+    goals = np.array(points, dtype=np.float64)
+    goals_inplace(goals, first_goal, goal_step)
+    return np.nan_to_num(goals).astype(np.int64)
+
+
+def goals_inplace(points, first_goal=DEFAULT_RULES.first_goal, goal_step=DEFAULT_RULES.goal_step):
+    """
+    Converte in gol un array float sovrascrivendolo, senza allocazioni
+    (per array molto grandi, ad es. le simulazioni). Sotto la soglia
+    floor((p - first_goal + step) / step) è < 1, quindi basta limitarlo a 0.
+    """
+    points -= first_goal - goal_step
+    points /= goal_step
+    np.floor(points, out=points)
+    np.maximum(points, 0, out=points)
+    return points
+
+
+def rules_arrays(season_ids):
+    """(first_goal, goal_step) per ogni partita, secondo la stagione."""
+    if not LEAGUE_RULES:
+        return DEFAULT_RULES.first_goal, DEFAULT_RULES.goal_step
+    rules = [get_rules(season_id) for season_id in season_ids]
+    return (np.array([r.first_goal for r in rules], dtype=np.float64),
+            np.array([r.goal_step for r in rules], dtype=np.float64))
+
+
+def outcomes(goals_for, goals_against):
+    """Array di WIN/DRAW/LOSS dal punto di vista di goals_for."""
+    return np.sign(np.asarray(goals_for) - np.asarray(goals_against)).astype(np.int64)
+
+
+def outcome_points_array(results, rules=DEFAULT_RULES):
+    """Punti in classifica per un array di esiti."""
+    return np.select([results == WIN, results == DRAW], [rules.win, rules.draw], default=rules.loss)
+
+
+def score_matches(home_scores, away_scores, season_ids=None):
+    """
+    Gol, esito e punti di un insieme di partite in un colpo solo.
+    Restituisce un dizionario di array allineati alle partite.
+    """
+    home_scores = np.asarray(home_scores, dtype=np.float64)
+    away_scores = np.asarray(away_scores, dtype=np.float64)
+    first_goal, goal_step = rules_arrays(season_ids) if season_ids is not None else (
+        DEFAULT_RULES.first_goal, DEFAULT_RULES.goal_step)
+
+    home_goals = goals_array(home_scores, first_goal, goal_step)
+    away_goals = goals_array(away_scores, first_goal, goal_step)
+    home_outcome = outcomes(home_goals, away_goals)
+
+    # Con regole per stagione anche i punti per esito cambiano partita per partita
+    if season_ids is None or not LEAGUE_RULES:
+        home_points = outcome_points_array(home_outcome)
+        away_points = outcome_points_array(-home_outcome)
+    else:
+        rules = [get_rules(season_id) for season_id in season_ids]
+        win = np.array([r.win for r in rules])
+        draw = np.array([r.draw for r in rules])
+        loss = np.array([r.loss for r in rules])
+        home_points = np.select([home_outcome == WIN, home_outcome == DRAW], [win, draw], default=loss)
+        away_points = np.select([home_outcome == LOSS, home_outcome == DRAW], [win, draw], default=loss)
+
+    return {
+        'home_goals': home_goals,
+        'away_goals': away_goals,
+        'home_outcome': home_outcome,
+        'home_points': home_points,
+        'away_points': away_points,
+    }
+
+
+def aggregate_table(team_names, home_teams, away_teams, scored):
+    """
+    Somma per squadra i risultati di score_matches(). home_teams/away_teams
+    sono array di indici in team_names. Restituisce {squadra: statistiche}.
+    """
+    n = len(team_names)
+    home_teams = np.asarray(home_teams, dtype=np.int64)
+    away_teams = np.asarray(away_teams, dtype=np.int64)
+
+    def per_team(home_values, away_values):
+        return (np.bincount(home_teams, weights=home_values, minlength=n)
+                + np.bincount(away_teams, weights=away_values, minlength=n))
+
+    ones = np.ones(len(home_teams))
+    home_outcome = scored['home_outcome']
+    columns = {
+        'points': per_team(scored['home_points'], scored['away_points']),
+        'matches_played': per_team(ones, ones),
+        'wins': per_team(home_outcome == WIN, home_outcome == LOSS),
+        'draws': per_team(home_outcome == DRAW, home_outcome == DRAW),
+        'losses': per_team(home_outcome == LOSS, home_outcome == WIN),
+        'goals_for': per_team(scored['home_goals'], scored['away_goals']),
+        'goals_against': per_team(scored['away_goals'], scored['home_goals']),
+    }
+
+    table = {}
+    for index, name in enumerate(team_names):
+        stats = {field: int(values[index]) for field, values in columns.items()}
+        stats['goal_difference'] = stats['goals_for'] - stats['goals_against']
+        table[name] = stats
+    return table
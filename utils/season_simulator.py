@@ -0,0 +1,219 @@
+# utils/season_simulator.py
+"""
+Simulazione Monte Carlo del resto della stagione.
+
+Per ogni squadra si stima media e deviazione standard del punteggio
+fantacalcio dalle partite giocate (con un po' di "shrinkage" verso la media
+del campionato per chi ha giocato poco). Le partite mancanti vengono
+estratte tutte insieme come array NumPy (simulazioni × partite), convertite
+in gol e punti con utils/scoring e sommate alla classifica attuale.
+
+Il calendario reale non è salvato nel database: le giornate mancanti fino a
+SEASON_GAMEWEEKS vengono generate con un girone all'italiana (metodo del
+cerchio), alternando casa/trasferta a ogni ciclo.
+"""
+import os
+import numpy as np
+from extensions import db
+from models import Match, Standing
+from utils import scoring
+from utils.standings_store import season_filter
+
+SEASON_GAMEWEEKS = int(os.getenv('SEASON_GAMEWEEKS', 38))
+CHAMPIONS_SPOTS = int(os.getenv('CHAMPIONS_SPOTS', 4))
+DEFAULT_SIMULATIONS = int(os.getenv('SIMULATIONS', 100000))
+
+# Partite "virtuali" di media campionato aggiunte a ogni squadra nella stima
+SHRINKAGE_MATCHES = 5
+CHUNK_SIZE = 10000
+
+
+def round_robin(n_teams):
+    """Giornate di un girone all'italiana: lista di liste di (casa, trasferta)."""
+    teams = list(range(n_teams))
+    if n_teams % 2:
+        teams.append(None)  # riposo
+    n = len(teams)
+
+    rounds = []
+    for r in range(n - 1):
+        pairs = []
+        for i in range(n // 2):
+            home, away = teams[i], teams[n - 1 - i]
+            if home is not None and away is not None:
+                pairs.append((home, away) if (r + i) % 2 == 0 else (away, home))
+        rounds.append(pairs)
+        teams = [teams[0]] + [teams[-1]] + teams[1:-1]
+    return rounds
+
+
+def remaining_fixtures(n_teams, played_gameweeks, total_gameweeks=SEASON_GAMEWEEKS):
+    """Array (casa, trasferta) delle partite delle giornate ancora da giocare."""
+    rounds = round_robin(n_teams)
+    home, away = [], []
+    for gameweek in range(played_gameweeks + 1, total_gameweeks + 1):
+        cycle, index = divmod(gameweek - 1, len(rounds))
+        for h, a in rounds[index]:
+            if cycle % 2:
+                h, a = a, h
+            home.append(h)
+            away.append(a)
+    return np.array(home, dtype=np.int64), np.array(away, dtype=np.int64)
+
+
+def fit_distributions(team_names, season_id=None):
+    """Media e deviazione standard del punteggio di ogni squadra (con shrinkage)."""
+    index = {name: i for i, name in enumerate(team_names)}
+    rows = (db.session.query(Match.home_team, Match.away_team, Match.home_score, Match.away_score)
+            .filter(season_filter(Match.season_id, season_id))
+            .all())
+
+    scores = [[] for _ in team_names]
+    for home_team, away_team, home_score, away_score in rows:
+        if home_team in index:
+            scores[index[home_team]].append(home_score or 0.0)
+        if away_team in index:
+            scores[index[away_team]].append(away_score or 0.0)
+
+    all_scores = np.array([s for team_scores in scores for s in team_scores], dtype=np.float64)
+    league_mean = all_scores.mean() if all_scores.size else 70.0
+    league_var = all_scores.var() if all_scores.size > 1 else 36.0
+
+    k = SHRINKAGE_MATCHES
+    means = np.empty(len(team_names))
+    stds = np.empty(len(team_names))
+    for i, team_scores in enumerate(scores):
+        values = np.array(team_scores, dtype=np.float64)
+        n = values.size
+        mean = values.mean() if n else league_mean
+        var = values.var() if n > 1 else league_var
+        means[i] = (n * mean + k * league_mean) / (n + k)
+        stds[i] = np.sqrt((n * var + k * league_var) / (n + k))
+    return means, np.maximum(stds, 1.0)
+
+
+class _Fixtures:
+    """Dati costanti delle partite da simulare, preparati una volta sola."""
+
+    def __init__(self, home, away, means, stds, n_teams, rules):
+        n_matches = home.size
+        self.n_matches = n_matches
+        self.rules = rules
+        # Colonne [partite in casa | partite in trasferta]
+        self.means = np.concatenate([means[home], means[away]]).astype(np.float32)
+        self.stds = np.concatenate([stds[home], stds[away]]).astype(np.float32)
+        # Matrici partita → squadra: la somma per squadra diventa un prodotto matriciale
+        self.home_onehot = np.zeros((n_matches, n_teams), dtype=np.float32)
+        self.away_onehot = np.zeros((n_matches, n_teams), dtype=np.float32)
+        self.home_onehot[np.arange(n_matches), home] = 1
+        self.away_onehot[np.arange(n_matches), away] = 1
+        # Punti per esito indicizzati da sign(gol casa - gol trasferta) + 1
+        self.home_points = np.array([rules.loss, rules.draw, rules.win], dtype=np.float32)
+        self.away_points = np.array([rules.win, rules.draw, rules.loss], dtype=np.float32)
+
+
+def _simulate_chunk(rng, buffer, fixtures, base):
+    """Simula len(buffer) stagioni: restituisce (punti, differenza reti, gol fatti) simulazioni × squadre."""
+    m = fixtures.n_matches
+
+    # Punteggi a multipli di 0,5 come nel fantacalcio, calcolati sul buffer senza copie
+    rng.standard_normal(out=buffer, dtype=np.float32)
+    buffer *= fixtures.stds
+    buffer += fixtures.means
+    buffer *= 2
+    np.rint(buffer, out=buffer)
+    buffer *= 0.5
+    goals = scoring.goals_inplace(buffer, fixtures.rules.first_goal, fixtures.rules.goal_step)
+    home_goals, away_goals = goals[:, :m], goals[:, m:]
+
+    results = np.sign(home_goals - away_goals).astype(np.int8)
+    results += 1
+    home_points = fixtures.home_points[results]
+    away_points = fixtures.away_points[results]
+
+    points = base['points'] + home_points @ fixtures.home_onehot + away_points @ fixtures.away_onehot
+    goals_for = base['goals_for'] + home_goals @ fixtures.home_onehot + away_goals @ fixtures.away_onehot
+    goals_against = base['goals_against'] + away_goals @ fixtures.home_onehot + home_goals @ fixtures.away_onehot
+    return points, goals_for - goals_against, goals_for
+
+
+def simulate_season(season_id=None, simulations=DEFAULT_SIMULATIONS, seed=None,
+                    total_gameweeks=SEASON_GAMEWEEKS, champions_spots=CHAMPIONS_SPOTS):
+    """
+    Probabilità di fine stagione per ogni squadra della classifica attuale.
+    Restituisce None se non ci sono ancora partite.
+    """
+    rows = (Standing.query
+            .filter(season_filter(Standing.season_id, season_id), Standing.matches_played > 0)
+            .order_by(Standing.team_name)
+            .all())
+    if not rows:
+        return None
+
+    team_names = [row.team_name for row in rows]
+    n_teams = len(team_names)
+    base = {
+        'points': np.array([row.points for row in rows], dtype=np.float32),
+        'goals_for': np.array([row.goals_for for row in rows], dtype=np.float32),
+        'goals_against': np.array([row.goals_against for row in rows], dtype=np.float32),
+    }
+
+    played = (db.session.query(db.func.max(Match.gameweek))
+              .filter(season_filter(Match.season_id, season_id))
+              .scalar()) or 0
+    home, away = remaining_fixtures(n_teams, played, total_gameweeks)
+    means, stds = fit_distributions(team_names, season_id)
+    fixtures = _Fixtures(home, away, means, stds, n_teams, scoring.get_rules(season_id))
+    buffer = np.empty((min(CHUNK_SIZE, simulations), 2 * home.size), dtype=np.float32)
+    rng = np.random.default_rng(seed)
+    champions_spots = min(champions_spots, n_teams)
+
+    title = np.zeros(n_teams)
+    top = np.zeros(n_teams)
+    last = np.zeros(n_teams)
+    position_sum = np.zeros(n_teams)
+    points_sum = np.zeros(n_teams)
+
+    done = 0
+    while done < simulations:
+        size = min(CHUNK_SIZE, simulations - done)
+        if home.size:
+            points, goal_difference, goals_for = _simulate_chunk(rng, buffer[:size], fixtures, base)
+        else:
+            points = np.broadcast_to(base['points'], (size, n_teams))
+            goals_for = np.broadcast_to(base['goals_for'], (size, n_teams))
+            goal_difference = goals_for - base['goals_against']
+
+        # Ordinamento: punti, differenza reti, gol fatti; le parità esatte si sorteggiano
+        key = (points.astype(np.float64) * 1e6 + goal_difference * 1e2 + goals_for * 1e-1
+               + rng.random((size, n_teams)) * 1e-2)
+        order = np.argsort(-key, axis=1)
+        positions = np.argsort(order, axis=1)
+
+        title += np.bincount(order[:, 0], minlength=n_teams)
+        top += np.bincount(order[:, :champions_spots].ravel(), minlength=n_teams)
+        last += np.bincount(order[:, -1], minlength=n_teams)
+        position_sum += positions.sum(axis=0) + size
+        points_sum += points.sum(axis=0)
+        done += size
+
+    teams = {}
+    for i, name in enumerate(team_names):
+        teams[name] = {
+            'title': float(title[i] / simulations),
+            'champions': float(top[i] / simulations),
+            'last': float(last[i] / simulations),
+            'expected_position': float(position_sum[i] / simulations),
+            'expected_points': float(points_sum[i] / simulations),
+            'score_mean': float(means[i]),
+            'score_std': float(stds[i]),
+        }
+
+    return {
+        'simulations': simulations,
+        'played_gameweeks': played,
+        'total_gameweeks': total_gameweeks,
+        'remaining_matches': int(home.size),
+        'champions_spots': champions_spots,
+        'teams': teams,
+    }
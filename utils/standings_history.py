@@ -0,0 +1,143 @@
+# utils/standings_history.py
+"""
+Classifiche storiche giornata per giornata (tabella StandingSnapshot).
+
+Dopo ogni ingestione si ricalcolano solo le giornate a partire da quella
+modificata: si parte dalla fotografia della giornata precedente e si
+applicano le partite giornata per giornata. Normalmente è una sola
+giornata (l'ultima caricata). Le posizioni usano la classifica avulsa con
+gli scontri diretti fino a quella giornata, tenuti in memoria.
+"""
+from collections import defaultdict
+from extensions import db
+from models import Match, StandingSnapshot, Team
+from utils.standings_store import (H2H_FIELDS, STAT_FIELDS, MatchResult, h2h_deltas, match_deltas,
+                                   season_filter, snapshot)
+from utils.tiebreak import rank_teams
+
+
+def _add(target, key, delta, fields):
+    current = target.setdefault(key, {field: 0 for field in fields})
+    for field in fields:
+        current[field] += delta[field]
+
+
+def _head_to_head_before(season_id, gameweek):
+    """Scontri diretti delle partite giocate prima della giornata indicata (solo colonne necessarie)."""
+    head_to_head = {}
+    rows = (db.session.query(Match.season_id, Match.home_team, Match.away_team, Match.home_score, Match.away_score)
+            .filter(season_filter(Match.season_id, season_id), Match.gameweek < gameweek))
+    for row in rows:
+        result = MatchResult(row.season_id, row.home_team, row.away_team, row.home_score or 0.0, row.away_score or 0.0)
+        for key, delta in h2h_deltas(result).items():
+            _add(head_to_head, key, delta, H2H_FIELDS)
+    return head_to_head
+
+
+def refresh_snapshots(season_id=None, from_gameweek=1):
+    """Riscrive le fotografie di classifica dalla giornata from_gameweek in avanti."""
+    previous_gw = (db.session.query(db.func.max(StandingSnapshot.gameweek))
+                   .filter(season_filter(StandingSnapshot.season_id, season_id),
+                           StandingSnapshot.gameweek < from_gameweek)
+                   .scalar())
+
+    totals = {}
+    if previous_gw is not None:
+        for row in StandingSnapshot.query.filter(season_filter(StandingSnapshot.season_id, season_id),
+                                                 StandingSnapshot.gameweek == previous_gw):
+            totals[row.team_name] = {field: getattr(row, field) for field in STAT_FIELDS}
+
+    matches_by_gw = defaultdict(list)
+    for match in (Match.query
+                  .filter(season_filter(Match.season_id, season_id), Match.gameweek >= from_gameweek)
+                  .order_by(Match.gameweek, Match.id)):
+        matches_by_gw[match.gameweek].append(match)
+
+    (StandingSnapshot.query
+     .filter(season_filter(StandingSnapshot.season_id, season_id),
+             StandingSnapshot.gameweek >= from_gameweek)
+     .delete(synchronize_session=False))
+
+    head_to_head = _head_to_head_before(season_id, from_gameweek) if matches_by_gw else {}
+
+    written = 0
+    for gameweek in sorted(matches_by_gw):
+        for match in matches_by_gw[gameweek]:
+            result = snapshot(match)
+            for team_name, delta in match_deltas(result).items():
+                _add(totals, team_name, delta, STAT_FIELDS)
+            for key, delta in h2h_deltas(result).items():
+                _add(head_to_head, key, delta, H2H_FIELDS)
+
+        for position, team_name in enumerate(rank_teams(totals, head_to_head), start=1):
+            db.session.add(StandingSnapshot(season_id=season_id, gameweek=gameweek, team_name=team_name,
+                                            position=position, **totals[team_name]))
+            written += 1
+
+    return written
+
+
+def refresh_for_matches(matches):
+    """Aggiorna le fotografie delle stagioni toccate, dalla giornata più vecchia modificata."""
+    first_gameweek = {}
+    for match in matches:
+        gameweek = int(match.gameweek)
+        first_gameweek[match.season_id] = min(first_gameweek.get(match.season_id, gameweek), gameweek)
+    return sum(refresh_snapshots(season_id, gameweek) for season_id, gameweek in first_gameweek.items())
+
+
+def rebuild_snapshots():
+    """Ricostruisce da zero le fotografie di tutte le stagioni."""
+    StandingSnapshot.query.delete()
+    season_ids = [season_id for (season_id,) in db.session.query(Match.season_id).distinct()]
+    written = sum(refresh_snapshots(season_id, 1) for season_id in season_ids)
+    db.session.commit()
+    return written
+
+
+def latest_snapshot_gameweek(season_id=None):
+    return (db.session.query(db.func.max(StandingSnapshot.gameweek))
+            .filter(season_filter(StandingSnapshot.season_id, season_id))
+            .scalar())
+
+
+def get_standings_at(gameweek, season_id=None):
+    """Classifica alla giornata N, nello stesso formato di get_standings()."""
+    rows = (db.session.query(StandingSnapshot, Team.id)
+            .join(Team, Team.name == StandingSnapshot.team_name)
+            .filter(season_filter(StandingSnapshot.season_id, season_id),
+                    StandingSnapshot.gameweek == gameweek)
+            .order_by(StandingSnapshot.position)
+            .all())
+
+    standings = [{
+        'id': team_id,
+        'name': row.team_name,
+        'position': row.position,
+        'points': row.points,
+        'matches_played': row.matches_played,
+        'wins': row.wins,
+        'draws': row.draws,
+        'losses': row.losses,
+        'goals_for': row.goals_for,
+        'goals_against': row.goals_against,
+        'goal_difference': row.goal_difference,
+        'avg_points_for': row.goals_for / row.matches_played if row.matches_played > 0 else 0,
+    } for row, team_id in rows]
+
+    return {
+        'standings': standings,
+        'best_attack': max(standings, key=lambda x: x['goals_for']) if standings else None,
+        'best_defense': min(standings, key=lambda x: x['goals_against']) if standings else None,
+        'most_wins': max(standings, key=lambda x: x['wins']) if standings else None,
+    }
+
+
+def get_team_trajectory(team_name, season_id=None):
+    """Posizione e punti di una squadra giornata per giornata."""
+    rows = (db.session.query(StandingSnapshot.gameweek, StandingSnapshot.position, StandingSnapshot.points)
+            .filter(season_filter(StandingSnapshot.season_id, season_id),
+                    StandingSnapshot.team_name == team_name)
+            .order_by(StandingSnapshot.gameweek)
+            .all())
+    return [{'gameweek': gw, 'position': position, 'points': points} for gw, position, points in rows]
@@ -0,0 +1,227 @@
+# utils/standings_sql.py
+"""
+Classifica calcolata interamente dal database con una sola query.
+
+Ogni partita viene letta due volte (prospettiva di casa e di trasferta,
+unite con UNION ALL), i gol vengono ricavati dal punteggio fantacalcio con
+un'espressione SQL e l'aggregato per squadra restituisce direttamente
+punti, V/N/P, gol e differenza reti. Funziona su SQLite e PostgreSQL.
+"""
+from sqlalchemy import Integer, case, desc, func, select, union_all
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.sql.functions import FunctionElement
+from extensions import db
+from models import Match, Team
+from utils.scoring import DEFAULT_RULES, LEAGUE_RULES
+
+
+class floor_int(FunctionElement):
+    """Parte intera inferiore di un'espressione numerica, come intero."""
+    type = Integer()
+    name = 'floor_int'
+    inherit_cache = True
+
+
+@compiles(floor_int)
+def _compile_floor_int(element, compiler, **kw):
+    return f"CAST(FLOOR({compiler.process(element.clauses, **kw)}) AS INTEGER)"
+
+
+@compiles(floor_int, 'sqlite')
+def _compile_floor_int_sqlite(element, compiler, **kw):
+    # FLOOR esiste in SQLite solo se compilato con le funzioni matematiche:
+    # usiamo CAST, che tronca verso zero ed è corretto per valori non negativi
+    return f"CAST({compiler.process(element.clauses, **kw)} AS INTEGER)"
+
+
+def goals_expression(points, rules=DEFAULT_RULES):
+    """Espressione SQL equivalente a scoring.points_to_goals() su una colonna di punteggio."""
+    return case(
+        (points >= rules.first_goal,
+         1 + floor_int((points - rules.first_goal) / float(rules.goal_step))),
+        else_=0,
+    )
+
+
+def _match_goals(points):
+    """Gol di una colonna di Match, con le regole della stagione della partita."""
+    if not LEAGUE_RULES:
+        return goals_expression(points)
+    return case(
+        *[(Match.season_id == season_id, goals_expression(points, rules))
+          for season_id, rules in LEAGUE_RULES.items()],
+        else_=goals_expression(points),
+    )
+
+
+def _points_expression(season_id, won, drawn):
+    """Punti in classifica della riga, con le regole della stagione."""
+    def by_rules(rules):
+        return case((won, rules.win), (drawn, rules.draw), else_=rules.loss)
+
+    if not LEAGUE_RULES:
+        return by_rules(DEFAULT_RULES)
+    return case(
+        *[(season_id == league_season, by_rules(rules)) for league_season, rules in LEAGUE_RULES.items()],
+        else_=by_rules(DEFAULT_RULES),
+    )
+
+
+def match_perspectives():
+    """Una riga per squadra per partita: (partita, stagione, giornata, squadra, avversaria, punti fatti/subiti, gol fatti/subiti)."""
+    home_goals = _match_goals(Match.home_score)
+    away_goals = _match_goals(Match.away_score)
+
+    home = select(
+        Match.id.label('match_id'),
+        Match.season_id.label('season_id'),
+        Match.gameweek.label('gameweek'),
+        Match.home_team.label('team_name'),
+        Match.away_team.label('opponent_name'),
+        Match.home_score.label('points_for'),
+        Match.away_score.label('points_against'),
+        home_goals.label('goals_for'),
+        away_goals.label('goals_against'),
+    )
+    away = select(
+        Match.id.label('match_id'),
+        Match.season_id.label('season_id'),
+        Match.gameweek.label('gameweek'),
+        Match.away_team.label('team_name'),
+        Match.home_team.label('opponent_name'),
+        Match.away_score.label('points_for'),
+        Match.home_score.label('points_against'),
+        away_goals.label('goals_for'),
+        home_goals.label('goals_against'),
+    )
+    return union_all(home, away).subquery('perspective')
+
+
+def aggregate_query(by_season=True):
+    """
+    Query aggregata della classifica. Con by_season=True raggruppa per
+    (stagione, squadra), altrimenti somma tutte le stagioni come
+    calculate_standings().
+    """
+    p = match_perspectives()
+    won = p.c.goals_for > p.c.goals_against
+    drawn = p.c.goals_for == p.c.goals_against
+    lost = p.c.goals_for < p.c.goals_against
+
+    columns = [
+        p.c.team_name,
+        func.sum(_points_expression(p.c.season_id, won, drawn)).label('points'),
+        func.count().label('matches_played'),
+        func.sum(case((won, 1), else_=0)).label('wins'),
+        func.sum(case((drawn, 1), else_=0)).label('draws'),
+        func.sum(case((lost, 1), else_=0)).label('losses'),
+        func.sum(p.c.goals_for).label('goals_for'),
+        func.sum(p.c.goals_against).label('goals_against'),
+        func.sum(p.c.goals_for - p.c.goals_against).label('goal_difference'),
+        func.sum(p.c.points_for).label('points_for'),
+        func.sum(p.c.points_against).label('points_against'),
+    ]
+    group_by = [p.c.team_name]
+    if by_season:
+        columns.insert(0, p.c.season_id)
+        group_by.insert(0, p.c.season_id)
+
+    return select(*columns).group_by(*group_by)
+
+
+def head_to_head_query():
+    """Scontri diretti aggregati per (stagione, squadra, avversaria)."""
+    p = match_perspectives()
+    won = p.c.goals_for > p.c.goals_against
+    drawn = p.c.goals_for == p.c.goals_against
+    return (
+        select(
+            p.c.season_id,
+            p.c.team_name,
+            p.c.opponent_name,
+            func.count().label('matches_played'),
+            func.sum(_points_expression(p.c.season_id, won, drawn)).label('points'),
+            func.sum(p.c.goals_for).label('goals_for'),
+            func.sum(p.c.goals_against).label('goals_against'),
+            func.sum(p.c.points_for).label('points_for'),
+            func.sum(p.c.points_against).label('points_against'),
+        )
+        .group_by(p.c.season_id, p.c.team_name, p.c.opponent_name)
+    )
+
+
+def compute_head_to_head():
+    """{(season_id, squadra, avversaria): statistiche} calcolato dal database (per il rebuild)."""
+    totals = {}
+    for row in db.session.execute(head_to_head_query()).mappings():
+        totals[(row['season_id'], row['team_name'], row['opponent_name'])] = {
+            'matches_played': int(row['matches_played']),
+            'points': int(row['points']),
+            'goals_for': int(row['goals_for']),
+            'goals_against': int(row['goals_against']),
+            'points_for': float(row['points_for']),
+            'points_against': float(row['points_against']),
+        }
+    return totals
+
+
+def compute_totals():
+    """{(season_id, squadra): statistiche} calcolato dal database (per il rebuild)."""
+    totals = {}
+    for row in db.session.execute(aggregate_query(by_season=True)).mappings():
+        totals[(row['season_id'], row['team_name'])] = {
+            'points': int(row['points']),
+            'matches_played': int(row['matches_played']),
+            'wins': int(row['wins']),
+            'draws': int(row['draws']),
+            'losses': int(row['losses']),
+            'goals_for': int(row['goals_for']),
+            'goals_against': int(row['goals_against']),
+            'goal_difference': int(row['goal_difference']),
+            'points_for': float(row['points_for']),
+            'points_against': float(row['points_against']),
+        }
+    return totals
+
+
+def calculate_standings_sql():
+    """Classifica completa dal database, nello stesso formato di calculate_standings()."""
+    totals = aggregate_query(by_season=False).subquery('totals')
+    query = (
+        select(totals, Team.id.label('team_id'))
+        .join(Team, Team.name == totals.c.team_name)
+        .order_by(desc(totals.c.points), desc(totals.c.goal_difference),
+                  desc(totals.c.goals_for), totals.c.team_name)
+    )
+
+    standings = []
+    for row in db.session.execute(query).mappings():
+        matches_played = int(row['matches_played'])
+        goals_for = int(row['goals_for'])
+        standings.append({
+            'id': row['team_id'],
+            'name': row['team_name'],
+            'points': int(row['points']),
+            'matches_played': matches_played,
+            'wins': int(row['wins']),
+            'draws': int(row['draws']),
+            'losses': int(row['losses']),
+            'goals_for': goals_for,
+            'goals_against': int(row['goals_against']),
+            'goal_difference': int(row['goal_difference']),
+            'avg_points_for': goals_for / matches_played if matches_played > 0 else 0,
+        })
+
+    return {
+        'standings': standings,
+        'best_attack': max(standings, key=lambda x: x['goals_for']) if standings else None,
+        'best_defense': min(standings, key=lambda x: x['goals_against']) if standings else None,
+        'most_wins': max(standings, key=lambda x: x['wins']) if standings else None,
+    }
+
+
+def render(dialect_name='sqlite'):
+    """SQL generato per un dialetto (utile per verificare la query su PostgreSQL)."""
+    from sqlalchemy.dialects import postgresql, sqlite
+    dialect = postgresql.dialect() if dialect_name == 'postgresql' else sqlite.dialect()
+    return str(aggregate_query().compile(dialect=dialect, compile_kwargs={'literal_binds': True}))
@@ -0,0 +1,245 @@
+# utils/standings_store.py
+"""
+Classifica materializzata (tabella Standing).
+
+Ogni partita inserita, sovrascritta o cancellata applica alla tabella il
+proprio delta (+1 / -1) per le due squadre coinvolte, nella stessa
+transazione della partita, e lo stesso vale per gli scontri diretti
+(tabella HeadToHead). Dopo ogni ingestione refresh_positions() salva la
+posizione di ogni squadra con la classifica avulsa, così la pagina
+/standings legge le righe già ordinate con una sola query; rebuild_standings() ricostruisce tutto da Match
+con l'aggregato SQL di standings_sql, mentre check_standings() confronta la
+tabella con il ricalcolo Python partita per partita.
+"""
+from collections import namedtuple
+from sqlalchemy import desc
+from extensions import db
+from models import HeadToHead, Match, Standing, Team
+from utils.scoring import DRAW, LOSS, WIN, get_rules, outcome, outcome_points, points_to_goals
+from utils.tiebreak import rank_teams
+
+# Istantanea dei campi di una partita che contano per la classifica
+MatchResult = namedtuple('MatchResult', 'season_id home_team away_team home_score away_score')
+
+STAT_FIELDS = ['points', 'matches_played', 'wins', 'draws', 'losses',
+               'goals_for', 'goals_against', 'goal_difference', 'points_for', 'points_against']
+
+H2H_FIELDS = ['matches_played', 'points', 'goals_for', 'goals_against', 'points_for', 'points_against']
+
+
+def snapshot(match):
+    """Copia i valori correnti di una partita, da usare prima di modificarla."""
+    return MatchResult(match.season_id, match.home_team, match.away_team,
+                       match.home_score or 0.0, match.away_score or 0.0)
+
+
+def match_deltas(result):
+    """Restituisce {squadra: delta statistiche} per una singola partita."""
+    rules = get_rules(result.season_id)
+    home_goals = points_to_goals(result.home_score, rules)
+    away_goals = points_to_goals(result.away_score, rules)
+    home_outcome = outcome(home_goals, away_goals)
+
+    home = {'matches_played': 1, 'goals_for': home_goals, 'goals_against': away_goals,
+            'goal_difference': home_goals - away_goals,
+            'points_for': result.home_score, 'points_against': result.away_score,
+            'wins': int(home_outcome == WIN), 'draws': int(home_outcome == DRAW),
+            'losses': int(home_outcome == LOSS), 'points': outcome_points(home_outcome, rules)}
+    away = {'matches_played': 1, 'goals_for': away_goals, 'goals_against': home_goals,
+            'goal_difference': away_goals - home_goals,
+            'points_for': result.away_score, 'points_against': result.home_score,
+            'wins': int(home_outcome == LOSS), 'draws': int(home_outcome == DRAW),
+            'losses': int(home_outcome == WIN), 'points': outcome_points(-home_outcome, rules)}
+
+    return {result.home_team: home, result.away_team: away}
+
+
+def h2h_deltas(result):
+    """Restituisce {(squadra, avversaria): delta scontri diretti} per una singola partita."""
+    deltas = match_deltas(result)
+    return {
+        (result.home_team, result.away_team): {field: deltas[result.home_team][field] for field in H2H_FIELDS},
+        (result.away_team, result.home_team): {field: deltas[result.away_team][field] for field in H2H_FIELDS},
+    }
+
+
+def season_filter(column, season_id):
+    """Condizione sulla stagione: season_id None indica le righe senza stagione."""
+    return column.is_(None) if season_id is None else column == season_id
+
+
+def _get_or_create(season_id, team_name):
+    row = (Standing.query
+           .filter(season_filter(Standing.season_id, season_id), Standing.team_name == team_name)
+           .first())
+    if row is None:
+        row = Standing(season_id=season_id, team_name=team_name,
+                       **{field: 0 for field in STAT_FIELDS})
+        db.session.add(row)
+    return row
+
+
+def _get_or_create_h2h(season_id, team_name, opponent_name):
+    row = (HeadToHead.query
+           .filter(season_filter(HeadToHead.season_id, season_id),
+                   HeadToHead.team_name == team_name, HeadToHead.opponent_name == opponent_name)
+           .first())
+    if row is None:
+        row = HeadToHead(season_id=season_id, team_name=team_name, opponent_name=opponent_name,
+                         **{field: 0 for field in H2H_FIELDS})
+        db.session.add(row)
+    return row
+
+
+def apply_match(match, sign=1):
+    """
+    Applica (sign=1) o annulla (sign=-1) una partita sulla classifica
+    materializzata e sugli scontri diretti. Le posizioni vanno poi
+    ricalcolate con refresh_positions().
+    """
+    result = match if isinstance(match, MatchResult) else snapshot(match)
+    for team_name, delta in match_deltas(result).items():
+        row = _get_or_create(result.season_id, team_name)
+        for field in STAT_FIELDS:
+            setattr(row, field, (getattr(row, field) or 0) + sign * delta[field])
+
+    for (team_name, opponent_name), delta in h2h_deltas(result).items():
+        row = _get_or_create_h2h(result.season_id, team_name, opponent_name)
+        for field in H2H_FIELDS:
+            setattr(row, field, (getattr(row, field) or 0) + sign * delta[field])
+
+
+def revert_match(match):
+    """Toglie dalla classifica il contributo di una partita (da usare con snapshot())."""
+    apply_match(match, sign=-1)
+
+
+def load_head_to_head(season_id=None):
+    """{(squadra, avversaria): statistiche} degli scontri diretti della stagione."""
+    return {(row.team_name, row.opponent_name): {field: getattr(row, field) for field in H2H_FIELDS}
+            for row in HeadToHead.query.filter(season_filter(HeadToHead.season_id, season_id))}
+
+
+def refresh_positions(season_id=None):
+    """Ricalcola la posizione (con classifica avulsa) di ogni squadra della stagione."""
+    db.session.flush()
+    rows = {row.team_name: row for row in
+            Standing.query.filter(season_filter(Standing.season_id, season_id), Standing.matches_played > 0)}
+    stats = {name: {field: getattr(row, field) for field in STAT_FIELDS} for name, row in rows.items()}
+
+    for position, team_name in enumerate(rank_teams(stats, load_head_to_head(season_id)), start=1):
+        rows[team_name].position = position
+
+    # Squadre rimaste senza partite (ad es. dopo una correzione)
+    (Standing.query
+     .filter(season_filter(Standing.season_id, season_id), Standing.matches_played <= 0)
+     .update({Standing.position: None}, synchronize_session=False))
+
+
+def refresh_positions_for(matches):
+    """refresh_positions() per ogni stagione toccata da un insieme di partite."""
+    for season_id in {match.season_id for match in matches}:
+        refresh_positions(season_id)
+
+
+def _as_dict(row, team_id):
+    return {
+        'id': team_id,
+        'name': row.team_name,
+        'points': row.points,
+        'matches_played': row.matches_played,
+        'wins': row.wins,
+        'draws': row.draws,
+        'losses': row.losses,
+        'goals_for': row.goals_for,
+        'goals_against': row.goals_against,
+        'goal_difference': row.goal_difference,
+        'avg_points_for': row.goals_for / row.matches_played if row.matches_played > 0 else 0,
+        'elo': row.elo,
+    }
+
+
+def get_standings(season_id=None):
+    """
+    Legge la classifica materializzata con una sola query ordinata.
+    Restituisce lo stesso formato di calculate_standings().
+    """
+    rows = (db.session.query(Standing, Team.id)
+            .join(Team, Team.name == Standing.team_name)
+            .filter(season_filter(Standing.season_id, season_id), Standing.matches_played > 0)
+            .order_by(Standing.position.is_(None), Standing.position,
+                      desc(Standing.points), desc(Standing.goal_difference),
+                      desc(Standing.goals_for), Standing.team_name)
+            .all())
+
+    standings = [_as_dict(row, team_id) for row, team_id in rows]
+
+    return {
+        'standings': standings,
+        'best_attack': max(standings, key=lambda x: x['goals_for']) if standings else None,
+        'best_defense': min(standings, key=lambda x: x['goals_against']) if standings else None,
+        'most_wins': max(standings, key=lambda x: x['wins']) if standings else None,
+    }
+
+
+def compute_from_matches():
+    """Ricalcola da zero {(season_id, squadra): statistiche} leggendo tutte le partite."""
+    totals = {}
+    for match in Match.query.order_by(Match.id).all():
+        result = snapshot(match)
+        for team_name, delta in match_deltas(result).items():
+            current = totals.setdefault((result.season_id, team_name), {field: 0 for field in STAT_FIELDS})
+            for field in STAT_FIELDS:
+                current[field] += delta[field]
+    return totals
+
+
+def rebuild_standings():
+    """Svuota e ricostruisce la tabella Standing da Match. Restituisce le righe scritte."""
+    # Aggregati calcolati dal database (classifica e scontri diretti)
+    from utils.standings_sql import compute_head_to_head, compute_totals
+    totals = compute_totals()
+    Standing.query.delete()
+    HeadToHead.query.delete()
+    for (season_id, team_name), stats in totals.items():
+        db.session.add(Standing(season_id=season_id, team_name=team_name, **stats))
+    for (season_id, team_name, opponent_name), stats in compute_head_to_head().items():
+        db.session.add(HeadToHead(season_id=season_id, team_name=team_name,
+                                  opponent_name=opponent_name, **stats))
+    for season_id in {season_id for season_id, _ in totals}:
+        refresh_positions(season_id)
+    db.session.commit()
+    return len(totals)
+
+
+def check_standings():
+    """
+    Confronta la tabella materializzata con il ricalcolo completo.
+    Restituisce una lista di differenze (vuota se coerente).
+    """
+    expected = compute_from_matches()
+    actual = {(row.season_id, row.team_name): {field: getattr(row, field) for field in STAT_FIELDS}
+              for row in Standing.query.all()}
+
+    differences = _compare(expected, actual, STAT_FIELDS)
+
+    # Scontri diretti: incrementali contro l'aggregato SQL
+    from utils.standings_sql import compute_head_to_head
+    expected_h2h = {(season_id, f"{team} vs {opponent}"): stats
+                    for (season_id, team, opponent), stats in compute_head_to_head().items()}
+    actual_h2h = {(row.season_id, f"{row.team_name} vs {row.opponent_name}"):
+                  {field: getattr(row, field) for field in H2H_FIELDS}
+                  for row in HeadToHead.query.all()}
+    differences.extend(_compare(expected_h2h, actual_h2h, H2H_FIELDS))
+    return differences
+
+
+def _compare(expected, actual, fields):
+    differences = []
+    for key in sorted(set(expected) | set(actual), key=lambda k: (k[0] or 0, k[1])):
+        exp = expected.get(key, {field: 0 for field in fields})
+        act = actual.get(key, {field: 0 for field in fields})
+        for field in fields:
+            if abs((exp[field] or 0) - (act[field] or 0)) > 1e-6:
+                differences.append((key, field, exp[field], act[field]))
+    return differences
@@ -0,0 +1,143 @@
+# utils/static_export.py
+"""
+Esportazione del sito pubblico in file HTML statici.
+
+Ogni pagina pubblica viene renderizzata con il test client di Flask e
+scritta in STATIC_EXPORT_DIR insieme a una copia .gz (per gzip_static di
+nginx). Le scritture sono atomiche (file temporaneo + os.replace): nginx
+non serve mai un file a metà.
+
+Mappatura URL → file:
+    /                    index.html
+    /matches/12          matches/12/index.html
+    /matches?after=Mjk   matches/index-after=Mjk.html
+
+Configurazione nginx di esempio (Flask resta solo per admin e pagine mancanti):
+    location /static/ { alias /percorso/app/static/; gzip_static on; }
+    location / {
+        root /percorso/export;
+        gzip_static on;
+        try_files $uri/index-$args.html $uri/index.html @flask;
+    }
+
+L'esportazione incrementale (dopo un'ingestione) rigenera solo le pagine
+toccate dalle partite caricate: liste, classifiche, statistiche, le
+partite e i loro articoli, le squadre e i giocatori coinvolti. La
+barra laterale "ultimi articoli" delle pagine articolo più vecchie si
+aggiorna alla successiva esportazione completa.
+"""
+import gzip
+import os
+import tempfile
+from urllib.parse import urlencode
+from extensions import db
+from models import Article, Match, Player, PlayerStat, Team
+from utils import keyset
+
+
+def export_path(url, root):
+    """Percorso del file per un URL (path + query string)."""
+    path, _, query = url.partition('?')
+    directory = os.path.join(root, *[part for part in path.split('/') if part])
+    return os.path.join(directory, f"index-{query}.html" if query else 'index.html')
+
+
+def write_atomic(path, data):
+    """Scrive data in path (e path.gz) passando da un file temporaneo nella stessa cartella."""
+    directory = os.path.dirname(path)
+    os.makedirs(directory, exist_ok=True)
+    for target, content in ((path, data), (f"{path}.gz", gzip.compress(data, compresslevel=9, mtime=0))):
+        fd, tmp_path = tempfile.mkstemp(dir=directory, prefix='.export-')
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                f.write(content)
+            os.chmod(tmp_path, 0o644)
+            os.replace(tmp_path, target)
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+
+
+def _url(path, **params):
+    return f"{path}?{urlencode(params)}" if params else path
+
+
+def _keyset_urls(path, query, columns, per_page):
+    """URL di tutte le pagine di una lista a cursore, con i link "successiva" e "precedente"."""
+    urls = [path]
+    after = None
+    while True:
+        page = keyset.paginate(query, columns, per_page, after=after)
+        if page.has_prev:
+            urls.append(_url(path, before=page.prev_cursor))
+        if not page.has_next:
+            return urls
+        after = page.next_cursor
+        urls.append(_url(path, after=after))
+
+
+def list_urls(app):
+    """Liste paginate, classifiche e statistiche: cambiano a ogni ingestione."""
+    gameweeks = [gw for (gw,) in db.session.query(Match.gameweek).distinct().order_by(Match.gameweek)]
+    urls = ['/', '/standings', '/stats', '/teams']
+    urls += _keyset_urls('/matches', db.session.query(Match.gameweek).distinct(), [Match.gameweek],
+                         app.config.get('GAMEWEEKS_PER_PAGE', 4))
+    urls += _keyset_urls('/articles', db.session.query(Article.created_at, Article.id),
+                         [Article.created_at, Article.id], app.config['ARTICLES_PER_PAGE'])
+    urls += [_url('/standings', gameweek=gw) for gw in gameweeks]
+    return urls
+
+
+def all_urls(app):
+    """Tutte le pagine pubbliche."""
+    urls = list_urls(app)
+    gameweeks = [gw for (gw,) in db.session.query(Match.gameweek).distinct().order_by(Match.gameweek)]
+    urls += [_url('/matches', gameweek=gw) for gw in gameweeks]
+    urls += [f'/matches/{id}' for (id,) in db.session.query(Match.id)]
+    urls += [f'/articles/{id}' for (id,) in db.session.query(Article.id)]
+    urls += [f'/teams/{id}' for (id,) in db.session.query(Team.id)]
+    urls += [f'/player/{id}' for (id,) in db.session.query(Player.id)]
+    return urls
+
+
+def urls_for_matches(app, match_ids):
+    """Pagine toccate dalle partite indicate (per l'esportazione incrementale)."""
+    matches = Match.query.filter(Match.id.in_(match_ids)).all()
+    team_names = {m.home_team for m in matches} | {m.away_team for m in matches}
+
+    urls = list_urls(app)
+    urls += [_url('/matches', gameweek=gw) for gw in sorted({m.gameweek for m in matches})]
+    urls += [f'/matches/{m.id}' for m in matches]
+    urls += [f'/articles/{id}' for (id,) in db.session.query(Article.id).filter(Article.match_id.in_(match_ids))]
+    urls += [f'/teams/{id}' for (id,) in db.session.query(Team.id).filter(Team.name.in_(team_names))]
+    urls += [f'/player/{id}' for (id,) in (db.session.query(PlayerStat.player_id)
+                                           .filter(PlayerStat.match_id.in_(match_ids))
+                                           .distinct())]
+    return urls
+
+
+def export_urls(app, urls, root=None, log=print):
+    """Renderizza e scrive gli URL indicati. Restituisce (scritti, falliti)."""
+    root = root or app.config['STATIC_EXPORT_DIR']
+    written = failed = 0
+    client = app.test_client()
+    for url in dict.fromkeys(urls):  # senza duplicati, nell'ordine dato
+        response = client.get(url)
+        if response.status_code != 200:
+            failed += 1
+            log(f"⚠️ {url}: HTTP {response.status_code}")
+            continue
+        write_atomic(export_path(url, root), response.get_data())
+        written += 1
+    return written, failed
+
+
+def export_site(app, root=None, log=print):
+    """Esportazione completa."""
+    return export_urls(app, all_urls(app), root, log)
+
+
+def export_matches(app, match_ids, root=None, log=print):
+    """Esportazione incrementale delle pagine toccate da un'ingestione."""
+    return export_urls(app, urls_for_matches(app, match_ids), root, log)
@@ -0,0 +1,50 @@
+# utils/team_directory.py
+"""
+Anagrafica delle squadre in memoria, condivisa da tutte le richieste del worker.
+
+Le pagine delle partite e la classifica servono solo nome, id e logo
+delle squadre: invece di Team.query.all() a ogni richiesta si tiene una
+copia di sola lettura (TeamRecord) legata alla versione dei dati. Quando
+l'ingestione crea squadre o cambiano i loghi, data_version.bump() la
+invalida e la prima richiesta successiva la ricarica con una sola query.
+"""
+from collections import namedtuple
+from types import MappingProxyType
+from extensions import db
+from models import Team
+from utils import data_version
+from utils.versioned_cache import VersionedCache
+
+TeamRecord = namedtuple('TeamRecord', 'id name logo_url')
+TeamDirectory = namedtuple('TeamDirectory', 'by_name by_id')
+
+_cache = VersionedCache()
+
+
+def _load():
+    records = [TeamRecord(id, name, logo_url)
+               for id, name, logo_url in db.session.query(Team.id, Team.name, Team.logo_url)]
+    return TeamDirectory(
+        by_name=MappingProxyType({record.name: record for record in records}),
+        by_id=MappingProxyType({record.id: record for record in records}),
+    )
+
+
+def get_directory():
+    """Anagrafica per la versione dei dati corrente (ricaricata solo se è cambiata)."""
+    return _cache.get_or_build('teams', data_version.current_version(), _load)
+
+
+def teams_map():
+    """{nome squadra: TeamRecord}, la stessa interfaccia usata dai template (teams_map.get(nome).logo_url)."""
+    return get_directory().by_name
+
+
+def get_team(team_id):
+    """TeamRecord per id, o None."""
+    return get_directory().by_id.get(team_id)
+
+
+def clear():
+    """Svuota la cache del worker (es. dopo una modifica fatta fuori da data_version)."""
+    _cache.clear()
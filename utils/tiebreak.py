@@ -0,0 +1,54 @@
+# utils/tiebreak.py
+"""
+Ordinamento della classifica con la classifica avulsa.
+
+A parità di punti si considerano solo gli scontri diretti tra le squadre
+a pari merito (punti, differenza reti e gol fatti negli scontri diretti),
+poi differenza reti e gol fatti generali e infine il nome.
+
+Gli scontri diretti arrivano già aggregati (tabella HeadToHead o
+dizionario costruito in memoria): nessuna query per i gruppi a pari punti.
+"""
+from itertools import groupby
+
+
+def mini_league(group, head_to_head):
+    """Punti e gol di ogni squadra del gruppo contando solo le partite tra di loro."""
+    table = {}
+    for team in group:
+        points = goals_for = goals_against = 0
+        for opponent in group:
+            if opponent == team:
+                continue
+            h2h = head_to_head.get((team, opponent))
+            if h2h:
+                points += h2h['points']
+                goals_for += h2h['goals_for']
+                goals_against += h2h['goals_against']
+        table[team] = {'points': points, 'goal_difference': goals_for - goals_against, 'goals_for': goals_for}
+    return table
+
+
+def rank_teams(stats, head_to_head):
+    """
+    Restituisce i nomi delle squadre in ordine di classifica.
+
+    stats: {squadra: {'points', 'goal_difference', 'goals_for', ...}}
+    head_to_head: {(squadra, avversaria): {'points', 'goals_for', 'goals_against'}}
+    """
+    by_points = sorted(stats, key=lambda name: -stats[name]['points'])
+    ranking = []
+    for _, tied in groupby(by_points, key=lambda name: stats[name]['points']):
+        group = list(tied)
+        if len(group) > 1:
+            avulsa = mini_league(group, head_to_head)
+            group.sort(key=lambda name: (
+                -avulsa[name]['points'],
+                -avulsa[name]['goal_difference'],
+                -avulsa[name]['goals_for'],
+                -stats[name]['goal_difference'],
+                -stats[name]['goals_for'],
+                name,
+            ))
+        ranking.extend(group)
+    return ranking
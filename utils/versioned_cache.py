@@ -0,0 +1,69 @@
+# utils/versioned_cache.py
+"""
+Cache in memoria legata alla versione dei dati (vedi utils/data_version).
+
+Ogni chiave conserva un solo valore con la versione per cui è stato
+calcolato. Quando la versione cambia, il primo richiedente ricalcola il
+valore e gli altri thread che chiedono la stessa versione nel frattempo
+aspettano il suo risultato invece di ripetere il calcolo (single-flight).
+"""
+import threading
+
+
+class _Pending:
+    """Calcolo in corso per (chiave, versione)."""
+
+    def __init__(self):
+        self.event = threading.Event()
+        self.value = None
+        self.error = None
+
+
+class VersionedCache:
+
+    def __init__(self):
+        self._entries = {}      # chiave -> (versione, valore)
+        self._inflight = {}     # (chiave, versione) -> _Pending
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get_or_build(self, key, version, builder):
+        """Restituisce il valore di key per version, calcolandolo con builder() una sola volta."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] == version:
+                self.hits += 1
+                return entry[1]
+
+            pending = self._inflight.get((key, version))
+            owner = pending is None
+            if owner:
+                pending = self._inflight[(key, version)] = _Pending()
+                self.misses += 1
+
+        if not owner:
+            pending.event.wait()
+            if pending.error is not None:
+                raise pending.error
+            return pending.value
+
+        try:
+            pending.value = builder()
+        except Exception as e:
+            pending.error = e
+            raise
+        finally:
+            with self._lock:
+                self._inflight.pop((key, version), None)
+                entry = self._entries.get(key)
+                # Non sovrascrivere un valore già calcolato per una versione più recente
+                if pending.error is None and (entry is None or entry[0] <= version):
+                    self._entries[key] = (version, pending.value)
+            pending.event.set()
+
+        return pending.value
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()